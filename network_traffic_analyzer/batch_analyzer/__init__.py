@@ -0,0 +1 @@
+from .batch_analyzer import BatchAnalyzer
\ No newline at end of file
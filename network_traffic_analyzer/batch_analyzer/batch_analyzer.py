@@ -0,0 +1,195 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import Counter
+import argparse
+import glob
+import json
+import os
+import sys
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
+from network_traffic_analyzer.tcp_analyzer import TcpAnalyzer
+from network_traffic_analyzer.icmp_analyzer import IcmpAnalyzer
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+from network_traffic_analyzer.running_stats import RunningStats
+from network_traffic_analyzer.table_cache import TableCache
+
+# extensões reconhecidas ao receber um diretório de capturas
+CAPTURE_EXTENSIONS = (".pcap", ".pcapng", ".cap", ".dump")
+
+# retorna lista ordenada de capturas a partir de diretório, padrão glob ou caminho de arquivo
+def findCaptures(source):
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source) if name.endswith(CAPTURE_EXTENSIONS)]
+    else:
+        paths = glob.glob(source)
+
+    return sorted(path for path in paths if os.path.isfile(path))
+
+# analisa uma captura em um processo de trabalho e retorna resumo compacto; erros ficam isolados no resumo
+def analyzeCapture(path, packetsMargin=None, decoder="fast", tableCache=None):
+    summary = {"path": path, "error": None}
+
+    try:
+        tcp = TcpAnalyzer(id=os.path.basename(path), packetsMargin=packetsMargin, path=path, streaming=True, decoder=decoder, tableCache=tableCache)
+        icmp = IcmpAnalyzer(id=os.path.basename(path), packetsMargin=packetsMargin, path=path, streaming=True, decoder=decoder)
+        icmp.setCaptureTable(tcp.getCaptureTable()) # mesma captura, decodificada uma vez
+
+        layers = tcp.getLayers()
+        tcpRtt = tcp.getRttStats()
+        icmpRtt = icmp.getRttStats()
+        tcpLoss = tcp.getLossStats()
+        icmpLoss = icmp.getLossStats()
+
+        summary.update({
+            "totalPackets": tcp.getTotalPackets(),
+            "totalBytes": tcp.getTotalBytes(),
+            "totalTime": tcp.getTotalTime(),
+            "throughput": tcp.getThroughput(),
+            "layers": dict(zip(layers.get("layers"), layers.get("nLayers"))),
+            "tcpRtt": tcpRtt.get("runningStats").getState(), # estado do acumulador, combinado sem as amostras
+            "icmpRtt": icmpRtt.get("runningStats").getState(),
+            "tcpRttSketch": tcpRtt.get("sketch").getState(),
+            "icmpRttSketch": icmpRtt.get("sketch").getState(),
+            "tcpRttHistogram": tcpRtt.get("histogram").getState(),
+            "icmpRttHistogram": icmpRtt.get("histogram").getState(),
+            "tcpLoss": {"totalPackets": tcpLoss.get("totalPackets"), "retransmissions": tcpLoss.get("retransmissions")},
+            "icmpLoss": {"sent": icmpLoss.get("sent"), "received": icmpLoss.get("received"), "lost": icmpLoss.get("lost")}
+        })
+
+    except SystemExit: # PacketAnalyzer encerra com sys.exit para capturas inválidas
+        summary["error"] = "invalid capture"
+
+    except Exception as e:
+        summary["error"] = str(e) or type(e).__name__
+
+    return summary
+
+# combina resumos de várias capturas em um relatório único
+def mergeSummaries(summaries):
+    report = {"captures": len(summaries),
+              "failed": [s["path"] for s in summaries if s["error"] is not None],
+              "totalPackets": 0,
+              "totalBytes": 0,
+              "totalTime": 0,
+              "layers": Counter(),
+              "tcpRtt": RunningStats(),
+              "icmpRtt": RunningStats(),
+              "tcpRttSketch": QuantileSketch(),
+              "icmpRttSketch": QuantileSketch(),
+              "tcpRttHistogram": BinnedHistogram(),
+              "icmpRttHistogram": BinnedHistogram(),
+              "tcpLoss": Counter(),
+              "icmpLoss": Counter(),
+              "files": summaries
+              }
+
+    for summary in summaries:
+        if summary["error"] is not None:
+            continue
+
+        report["totalPackets"] += summary["totalPackets"]
+        report["totalBytes"] += summary["totalBytes"]
+        report["totalTime"] += summary["totalTime"]
+        report["layers"].update(summary["layers"])
+        report["tcpRtt"].merge(RunningStats.fromState(summary["tcpRtt"]))
+        report["icmpRtt"].merge(RunningStats.fromState(summary["icmpRtt"]))
+        report["tcpRttSketch"].merge(QuantileSketch.fromState(summary["tcpRttSketch"]))
+        report["icmpRttSketch"].merge(QuantileSketch.fromState(summary["icmpRttSketch"]))
+        report["tcpRttHistogram"].merge(BinnedHistogram.fromState(summary["tcpRttHistogram"]))
+        report["icmpRttHistogram"].merge(BinnedHistogram.fromState(summary["icmpRttHistogram"]))
+        report["tcpLoss"].update(summary["tcpLoss"])
+        report["icmpLoss"].update(summary["icmpLoss"])
+
+    report["tcpRtt"] = report["tcpRtt"].getStats()
+    report["icmpRtt"] = report["icmpRtt"].getStats()
+    report["tcpRtt"]["percentiles"] = report.pop("tcpRttSketch").getPercentiles()
+    report["icmpRtt"]["percentiles"] = report.pop("icmpRttSketch").getPercentiles()
+    report["tcpRtt"]["histogram"] = report.pop("tcpRttHistogram").getState() # BinnedHistogram.fromState recria o histograma
+    report["icmpRtt"]["histogram"] = report.pop("icmpRttHistogram").getState()
+    report["throughput"] = (report["totalBytes"] * 8 / report["totalTime"]) / 1000 if report["totalTime"] > 0 else 0
+
+    return report
+
+# analisador em lote: distribui capturas entre processos e combina os resumos
+class BatchAnalyzer():
+    def __init__(self, source, workers=None, packetsMargin=None, decoder="fast", progress=True, tableCache=None):
+        self.paths = findCaptures(source) if isinstance(source, str) else sorted(source)
+        self.workers = workers or os.cpu_count() # número de processos de trabalho
+        self.packetsMargin = packetsMargin
+        self.decoder = decoder
+        self.progress = progress # imprime contador de progresso em stderr
+        self.tableCache = tableCache # TableCache compartilhado pelos processos, None desativa o cache de tabelas
+
+    # analisa todas as capturas e retorna relatório combinado
+    def run(self):
+        summaries = []
+        total = len(self.paths)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(analyzeCapture, path, self.packetsMargin, self.decoder, self.tableCache): path for path in self.paths}
+
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    summary = future.result()
+                except Exception as e: # falha do processo de trabalho, não da análise
+                    summary = {"path": futures[future], "error": str(e) or type(e).__name__}
+
+                summaries.append(summary)
+
+                if self.progress:
+                    status = "ok" if summary["error"] is None else f"error: {summary['error']}"
+                    print(f"[{done}/{total}] {summary['path']} {status}", file=sys.stderr)
+
+        summaries.sort(key=lambda s: s["path"])
+        return mergeSummaries(summaries)
+
+    # imprime relatório combinado
+    @staticmethod
+    def printReport(report):
+        print(f"Captures: {report['captures']} ({len(report['failed'])} failed)")
+        print(f"Total packets: {report['totalPackets']}")
+        print(f"Total bytes: {report['totalBytes']} bytes")
+        print(f"Layers: {dict(report['layers'])}")
+        print(f"Throughput: {report['throughput']:.4f} Mbps")
+        for layer, name in (("TCP handshakes", "tcpRtt"), ("ICMP replies", "icmpRtt")):
+            percentiles = ", ".join(f"p{percentile:g} {value:.4f}" for percentile, value in report[name]["percentiles"].items())
+            print(f"{layer}: {report[name]['count']}, mean RTT: {report[name]['mean']:.4f} ms ({percentiles} ms)")
+        print(f"TCP retransmissions: {report['tcpLoss']['retransmissions']} of {report['tcpLoss']['totalPackets']} packets")
+        print(f"ICMP lost packets: {report['icmpLoss']['lost']} of {report['icmpLoss']['sent']} sent\n")
+
+        for path in report["failed"]:
+            print(f"Failed: {path}")
+
+# uso: python batch_analyzer.py <diretório|padrão glob> [--workers N] [--margin N] [--decoder fast|scapy] [--json relatorio.json]
+#      [--cache-dir DIR] [--cache-size MB] [--no-cache] [--refresh-cache]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Analyze a directory or glob of captures in parallel")
+    parser.add_argument("source", help="directory or glob pattern of capture files")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--margin", type=int, default=None, help="packets dropped at the start and end of each capture")
+    parser.add_argument("--decoder", choices=["fast", "scapy"], default="fast", help="packet decoder backend")
+    parser.add_argument("--json", default=None, help="write the combined report to a JSON file")
+    parser.add_argument("--cache-dir", default=None, help="directory for decoded table caches (default: next to each capture)")
+    parser.add_argument("--cache-size", type=float, default=None, help="maximum size of the cache directory in MB")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write decoded table caches")
+    parser.add_argument("--refresh-cache", action="store_true", help="ignore existing caches and decode captures again")
+    args = parser.parse_args(args)
+
+    tableCache = None
+    if not args.no_cache:
+        maxBytes = int(args.cache_size * 1024 * 1024) if args.cache_size is not None else None
+        tableCache = TableCache(args.cache_dir, maxBytes, args.refresh_cache)
+
+    batch = BatchAnalyzer(args.source, args.workers, args.margin, args.decoder, tableCache=tableCache)
+    if not batch.paths:
+        print(f"No captures found in {args.source}")
+        sys.exit(1)
+
+    report = batch.run()
+    BatchAnalyzer.printReport(report)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
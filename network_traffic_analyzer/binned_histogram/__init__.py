@@ -0,0 +1 @@
+from .binned_histogram import BinnedHistogram
\ No newline at end of file
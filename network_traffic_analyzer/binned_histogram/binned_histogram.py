@@ -0,0 +1,78 @@
+import numpy as np
+
+# histograma de bins fixos, lineares ou logarítmicos, entre low e high: as bordas dependem só dos parâmetros, então
+# histogramas de capturas ou partes diferentes com os mesmos parâmetros são combinados somando as contagens, sem as amostras
+# valores abaixo de low ou acima de high são contados no primeiro ou no último bin e também em underflow ou overflow
+# os padrões cobrem tempos em ms de 1 µs (resolução do pcap) a 1000 s, com 10 bins por década
+class BinnedHistogram():
+    def __init__(self, low=0.001, high=1000000, bins=90, scale="log"):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.scale = scale # "log" ou "linear"
+        self.edges = np.geomspace(low, high, bins + 1) if scale == "log" else np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.count = 0
+
+    # acrescenta uma amostra
+    def update(self, value):
+        return self.updateBatch([value])
+
+    # acrescenta um array de amostras; valores NaN são ignorados
+    def updateBatch(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        self.underflow += int(np.count_nonzero(values < self.low))
+        self.overflow += int(np.count_nonzero(values > self.high))
+        self.count += values.size
+
+        # high entra no último bin, como em np.histogram
+        index = np.clip(np.searchsorted(self.edges, values, side="right") - 1, 0, self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+        return self
+
+    # retorna True se o outro histograma tem as mesmas bordas
+    def isCompatible(self, other):
+        return (self.low, self.high, self.bins, self.scale) == (other.low, other.high, other.bins, other.scale)
+
+    # combina outro histograma com as mesmas bordas neste
+    def merge(self, other):
+        if not self.isCompatible(other):
+            print("There is no way to merge histograms with different bins")
+            return self
+
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.count += other.count
+
+        return self
+
+    # retorna estado serializável (JSON) do histograma
+    def getState(self):
+        return {"low": self.low,
+                "high": self.high,
+                "bins": self.bins,
+                "scale": self.scale,
+                "counts": self.counts.tolist(),
+                "underflow": self.underflow,
+                "overflow": self.overflow,
+                "count": self.count
+                }
+
+    # cria histograma a partir de estado salvo com getState
+    @classmethod
+    def fromState(cls, state):
+        histogram = cls(state["low"], state["high"], state["bins"], state["scale"])
+        histogram.counts = np.asarray(state["counts"], dtype=np.int64)
+        histogram.underflow = state["underflow"]
+        histogram.overflow = state["overflow"]
+        histogram.count = state["count"]
+
+        return histogram
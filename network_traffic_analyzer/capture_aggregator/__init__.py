@@ -0,0 +1 @@
+from .capture_aggregator import CaptureAggregator
\ No newline at end of file
@@ -0,0 +1,87 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# agregações sobre tabelas Arrow de capturas convertidas (ParquetConverter, CaptureQuery), calculadas com pyarrow.compute
+# sem passar por pandas; os resultados são arrays NumPy obtidos sem cópia quando a coluna Arrow permite
+class CaptureAggregator():
+    def __init__(self, table):
+        self.table = table # tabela Arrow com as colunas "timestamp", "size" e "type"
+
+    # retorna coluna como array contíguo único
+    def getColumn(self, name):
+        column = self.table.column(name)
+        return column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+
+    # converte array Arrow numérico sem nulos em array NumPy, sem cópia
+    @staticmethod
+    def toNumpy(values):
+        return values.to_numpy(zero_copy_only=values.null_count == 0 and pa.types.is_primitive(values.type))
+
+    # retorna quantidade de pacotes e bytes por protocolo, em ordem decrescente de pacotes
+    def getProtocolCounts(self):
+        types = self.getColumn("type")
+        if pa.types.is_dictionary(types.type):
+            types = types.dictionary_decode()
+
+        grouped = pa.table({"type": types, "size": self.getColumn("size")}).group_by("type").aggregate([("size", "count"), ("size", "sum")])
+        grouped = grouped.sort_by([("size_count", "descending")])
+
+        return {"protocols": grouped.column("type").to_pylist(),
+                "packets": self.toNumpy(grouped.column("size_count").combine_chunks()),
+                "bytes": self.toNumpy(grouped.column("size_sum").combine_chunks())
+                }
+
+    # retorna estatísticas dos tamanhos de pacote
+    def getSizeStats(self):
+        sizes = self.getColumn("size")
+        if len(sizes) == 0:
+            return None
+
+        minMax = pc.min_max(sizes)
+        return {"count": len(sizes),
+                "mean": pc.mean(sizes).as_py(),
+                "std": pc.stddev(sizes).as_py(),
+                "max": minMax["max"].as_py(),
+                "min": minMax["min"].as_py(),
+                "totalBytes": pc.sum(sizes).as_py()
+                }
+
+    # retorna histograma dos tamanhos de pacote: bordas dos bins e contagem em cada bin
+    # contagens e bordas podem ser passadas a GraphPlotter.plotHistogram(edges[:-1], edges, weights=counts)
+    def getSizeHistogram(self, bins=50):
+        sizes = self.getColumn("size")
+        if len(sizes) == 0:
+            return None
+
+        minMax = pc.min_max(sizes)
+        low, high = minMax["min"].as_py(), minMax["max"].as_py()
+        edges = np.linspace(low, high if high > low else low + 1, bins + 1)
+        width = (edges[-1] - edges[0]) / bins
+
+        index = pc.floor(pc.divide(pc.subtract(pc.cast(sizes, pa.float64()), low), width))
+        index = pc.min_element_wise(pc.cast(index, pa.int32()), bins - 1) # valor máximo fica no último bin, como em np.histogram
+        binCounts = pc.value_counts(index)
+
+        counts = np.zeros(bins, dtype=np.int64)
+        counts[self.toNumpy(binCounts.field("values"))] = self.toNumpy(binCounts.field("counts"))
+
+        return {"edges": edges, "counts": counts}
+
+    # retorna pacotes e bytes por intervalo de tempo de bucket segundos, apenas intervalos com pacotes
+    # times: início de cada intervalo em segundos desde a época
+    def getBytesPerBucket(self, bucket=1.0):
+        timestamps = self.getColumn("timestamp")
+        if len(timestamps) == 0:
+            return None
+
+        bucketNs = int(bucket * 1000000000)
+        index = pc.divide(timestamps.cast(pa.int64()), bucketNs)
+
+        grouped = pa.table({"bucket": index, "size": self.getColumn("size")}).group_by("bucket").aggregate([("size", "count"), ("size", "sum")])
+        grouped = grouped.sort_by("bucket")
+
+        return {"times": self.toNumpy(grouped.column("bucket").combine_chunks()) * bucket,
+                "packets": self.toNumpy(grouped.column("size_count").combine_chunks()),
+                "bytes": self.toNumpy(grouped.column("size_sum").combine_chunks())
+                }
@@ -0,0 +1,2 @@
+from .capture_pipeline import CapturePipeline
+from .pipeline_stages import PipelineStage, LayerStage, GroupBytesStage, ThroughputStage, TcpRttStage, IntervalStage, TcpLossStage, IcmpEchoStage, AnalyzerStage
\ No newline at end of file
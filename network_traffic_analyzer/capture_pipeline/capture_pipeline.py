@@ -0,0 +1,132 @@
+from scapy.all import PcapReader
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from itertools import islice
+import asyncio
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.pcap_decoder import PcapDecoder
+from network_traffic_analyzer.pcap_decoder.pcap_decoder import GLOBAL_HEADER_LEN
+
+# decodifica um lote de registros em um processo de trabalho, reabrindo o arquivo mapeado em memória
+def decodeRecords(path, records):
+    with PcapDecoder(path) as decoder:
+        return decoder.decode(records)
+
+# pipeline assíncrono em etapas: leitor -> decodificador -> agregadores
+# o leitor percorre os cabeçalhos de registro em regiões de batchBytes bytes, o decodificador converte cada lote em
+# PacketTable em um executor de threads ou processos, e cada agregador (PipelineStage) consome a mesma sequência de tabelas
+# filas limitadas a queueSize lotes entre as etapas aplicam contrapressão: o leitor espera quando a decodificação ou o
+# agregador mais lento ficam para trás, então a leitura do disco se sobrepõe à decodificação sem acumular a captura
+# capturas não suportadas pelo decodificador rápido são lidas com PcapReader em lotes de batchPackets pacotes
+class CapturePipeline():
+    def __init__(self, path, stages, batchBytes=8 * 1024 * 1024, batchPackets=4096, queueSize=4, executor="thread", workers=None):
+        self.path = path
+        self.stages = stages # etapas agregadoras, com nomes distintos
+        self.batchBytes = batchBytes
+        self.batchPackets = batchPackets
+        self.queueSize = queueSize
+        self.executor = executor # "thread" ou "process"
+        self.workers = workers or 1 # lotes decodificados ao mesmo tempo
+
+    # executa o pipeline e retorna dicionário nome da etapa -> resultado, ou None se a captura não pode ser aberta
+    def run(self):
+        return asyncio.run(self.runAsync())
+
+    # versão assíncrona de run, para uso dentro de um laço de eventos existente
+    async def runAsync(self):
+        if self.executor not in ("thread", "process"):
+            print(f"Unknown pipeline executor: {self.executor}")
+            return None
+
+        try:
+            decoder = PcapDecoder(self.path)
+        except OSError as e:
+            print(f"Capture path is wrong or not specified: {e}")
+            return None
+
+        records = asyncio.Queue(self.queueSize)
+        queues = [asyncio.Queue(self.queueSize) for _ in self.stages]
+        pool = ProcessPoolExecutor(self.workers) if self.executor == "process" else ThreadPoolExecutor(self.workers)
+
+        with decoder, pool:
+            tasks = [asyncio.ensure_future(self.read(decoder, records)),
+                     asyncio.ensure_future(self.decode(decoder, records, queues, pool))]
+            tasks += [asyncio.ensure_future(self.aggregate(stage, queue)) for stage, queue in zip(self.stages, queues)]
+
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+        return {stage.name: stage.getResult() for stage in self.stages}
+
+    # etapa leitora: coloca na fila lotes de registros (decodificador rápido) ou de pacotes scapy, e None no fim
+    async def read(self, decoder, records):
+        loop = asyncio.get_running_loop()
+
+        if decoder.isSupported():
+            size = len(decoder.map)
+            start = GLOBAL_HEADER_LEN
+            while start < size:
+                batch = await loop.run_in_executor(None, decoder.getRecords, start, start + self.batchBytes)
+                if len(batch["offsets"]) == 0: # registro truncado no fim do arquivo
+                    break
+
+                await records.put(batch)
+                start = batch["end"]
+        else:
+            with PcapReader(self.path) as reader:
+                while True:
+                    batch = await loop.run_in_executor(None, lambda: list(islice(reader, self.batchPackets)))
+                    if not batch:
+                        break
+
+                    await records.put(batch)
+
+        await records.put(None)
+
+    # retorna função e argumentos que decodificam um lote no executor
+    def getDecodeCall(self, decoder, batch):
+        if isinstance(batch, list):
+            return PacketTable.fromPackets, batch
+
+        if self.executor == "process":
+            return decodeRecords, self.path, batch
+
+        return decoder.decode, batch
+
+    # etapa decodificadora: até workers lotes em decodificação, entregues aos agregadores em ordem de captura
+    async def decode(self, decoder, records, queues, pool):
+        loop = asyncio.get_running_loop()
+        pending = deque()
+
+        while True:
+            batch = await records.get()
+            if batch is not None:
+                pending.append(loop.run_in_executor(pool, *self.getDecodeCall(decoder, batch)))
+
+            while pending and (batch is None or len(pending) >= self.workers):
+                table = await pending.popleft()
+                for queue in queues:
+                    await queue.put(table)
+
+            if batch is None:
+                break
+
+        for queue in queues:
+            await queue.put(None)
+
+    # etapa agregadora: atualiza a etapa com cada tabela em uma thread, sem bloquear o laço de eventos
+    async def aggregate(self, stage, queue):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            table = await queue.get()
+            if table is None:
+                break
+
+            await loop.run_in_executor(None, stage.update, table)
+
+        stage.finish()
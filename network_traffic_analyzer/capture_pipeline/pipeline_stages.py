@@ -0,0 +1,30 @@
+from network_traffic_analyzer.icmp_analyzer.icmp_stages import IcmpEchoStage
+from network_traffic_analyzer.packet_analyzer.table_stages import PipelineStage, LayerStage, GroupBytesStage, ThroughputStage, IntervalStage, getSampleStats
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.tcp_analyzer.tcp_stages import TcpRttStage, TcpLossStage
+
+# etapas gerais (table_stages) e de cada analisador (tcp_stages, icmp_stages) ficam junto dos analisadores, que as usam
+# para calcular métricas lote a lote no modo streaming; aqui fica só a etapa que adapta um analisador inteiro
+
+# adapta métodos de um analisador existente (TcpAnalyzer, IcmpAnalyzer, ...) como etapa: os lotes são concatenados
+# e entregues ao analisador com setCaptureTable, então a captura é lida uma vez mesmo para métricas que não são
+# calculadas em uma passagem; diferente das demais etapas, guarda a tabela completa
+class AnalyzerStage(PipelineStage):
+    def __init__(self, analyzer, methods, name=None):
+        self.analyzer = analyzer
+        self.methods = methods # nomes dos métodos get* chamados sem argumentos
+        self.name = name or type(analyzer).__name__
+        self.tables = []
+
+    # override
+    def update(self, table):
+        self.tables.append(table)
+
+    # override
+    def finish(self):
+        self.analyzer.setCaptureTable(PacketTable.concatenate(self.tables))
+        self.tables = []
+
+    # override
+    def getResult(self):
+        return {method: getattr(self.analyzer, method)() for method in self.methods}
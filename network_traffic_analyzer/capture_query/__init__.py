@@ -0,0 +1 @@
+from .capture_query import CaptureQuery
\ No newline at end of file
@@ -0,0 +1,81 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import os
+from network_traffic_analyzer.parquet_converter.parquet_converter import PARTITION_SCHEMA
+
+# consultas sobre capturas convertidas para Parquet (arquivo único ou diretório particionado por hora e protocolo)
+# os predicados são enviados ao pyarrow.dataset: partições fora do filtro não são abertas, row groups são descartados
+# pelas estatísticas de mínimo e máximo, e só as colunas pedidas são lidas
+class CaptureQuery():
+    def __init__(self, source):
+        self.source = source
+        self.partitioned = os.path.isdir(source)
+
+        try:
+            partitioning = ds.partitioning(PARTITION_SCHEMA, flavor="hive") if self.partitioned else None
+            self.dataset = ds.dataset(source, format="parquet", partitioning=partitioning)
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"Parquet path is wrong or not specified: {e}")
+            self.dataset = None
+
+    # converte datetime, string ISO ou datetime64 para timestamp em ns
+    @staticmethod
+    def toTimestamp(value):
+        return pa.scalar(np.datetime64(value, "ns"), type=pa.timestamp("ns"))
+
+    # retorna hora ISO usada nas partições ("2007-01-01T18")
+    @staticmethod
+    def toHour(value):
+        return np.datetime_as_string(np.datetime64(value, "h"), unit="h")
+
+    # monta expressão de filtro: protocolos, intervalo de tempo [start, stop) e tamanho [minSize, maxSize]
+    def getFilter(self, protocols=None, start=None, stop=None, minSize=None, maxSize=None):
+        conditions = []
+
+        if protocols is not None:
+            conditions.append(ds.field("type").isin(list(protocols)))
+
+        if start is not None:
+            conditions.append(ds.field("timestamp") >= self.toTimestamp(start))
+            if self.partitioned:
+                conditions.append(ds.field("hour") >= self.toHour(start)) # descarta partições antes do intervalo
+
+        if stop is not None:
+            conditions.append(ds.field("timestamp") < self.toTimestamp(stop))
+            if self.partitioned:
+                conditions.append(ds.field("hour") <= self.toHour(stop))
+
+        if minSize is not None:
+            conditions.append(ds.field("size") >= minSize)
+
+        if maxSize is not None:
+            conditions.append(ds.field("size") <= maxSize)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        return expression
+
+    # lê tabela Arrow com as colunas pedidas e os pacotes que satisfazem os predicados
+    def read(self, columns=None, protocols=None, start=None, stop=None, minSize=None, maxSize=None):
+        if self.dataset is None:
+            return None
+
+        return self.dataset.to_table(columns=columns, filter=self.getFilter(protocols, start, stop, minSize, maxSize))
+
+    # retorna quantidade de pacotes que satisfazem os predicados
+    def count(self, protocols=None, start=None, stop=None, minSize=None, maxSize=None):
+        if self.dataset is None:
+            return None
+
+        return self.dataset.count_rows(filter=self.getFilter(protocols, start, stop, minSize, maxSize))
+
+    # retorna arquivos que precisam ser abertos para os predicados, depois do descarte de partições
+    def getFiles(self, protocols=None, start=None, stop=None, minSize=None, maxSize=None):
+        if self.dataset is None:
+            return []
+
+        fragments = self.dataset.get_fragments(filter=self.getFilter(protocols, start, stop, minSize, maxSize))
+        return [fragment.path for fragment in fragments]
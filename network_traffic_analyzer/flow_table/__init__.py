@@ -0,0 +1 @@
+from .flow_table import FlowTable
\ No newline at end of file
@@ -0,0 +1,212 @@
+from collections import OrderedDict
+from array import array
+import numpy as np
+from network_traffic_analyzer.packet_table.packet_table import FLAG_FIN, FLAG_SYN, FLAG_RST, FLAG_PSH, FLAG_ACK, FLAG_URG, PROTO_TCP
+
+# campos de cada fluxo e tipos NumPy correspondentes
+FIELDS = {
+    "src": np.uint32,
+    "dst": np.uint32,
+    "sport": np.uint16,
+    "dport": np.uint16,
+    "proto": np.int16,
+    "packets": np.int64,
+    "bytes": np.int64,
+    "firstTime": np.float64, # tempo do primeiro pacote em ms
+    "lastTime": np.float64, # tempo do último pacote em ms
+    "finCount": np.int64,
+    "synCount": np.int64,
+    "rstCount": np.int64,
+    "pshCount": np.int64,
+    "ackCount": np.int64,
+    "urgCount": np.int64,
+    "state": np.int8
+}
+
+# contadores de flags TCP
+FLAG_COUNTS = ((FLAG_FIN, "finCount"), (FLAG_SYN, "synCount"), (FLAG_RST, "rstCount"), (FLAG_PSH, "pshCount"),
+               (FLAG_ACK, "ackCount"), (FLAG_URG, "urgCount"))
+
+# estados do fluxo; fluxos não TCP permanecem em STATE_ACTIVE
+STATE_ACTIVE = 0
+STATE_SYN_SENT = 1
+STATE_ESTABLISHED = 2
+STATE_FIN = 3
+STATE_RESET = 4
+
+# tabela de fluxos por 5-tupla (src, dst, sport, dport, proto), com campos em arrays NumPy indexados pelo id do fluxo
+# fluxos sem pacotes há idleTimeout ms, ou encerrados por FIN/RST há closeTimeout ms, são removidos e seus ids reutilizados,
+# mantendo a memória limitada ao número de fluxos ativos; fluxos removidos são passados a onExpire ou guardados em arrays compactos,
+# dos quais só os maxFinished mais recentes são mantidos
+class FlowTable():
+    def __init__(self, idleTimeout=60000, closeTimeout=2000, onExpire=None, capacity=1024, maxFinished=1000000):
+        self.idleTimeout = idleTimeout
+        self.closeTimeout = closeTimeout
+        self.onExpire = onExpire # função chamada com o dicionário de cada fluxo removido
+        self.maxFinished = maxFinished # fluxos removidos guardados sem onExpire; os mais antigos são descartados
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in FIELDS.items()}
+        self.index = OrderedDict() # 5-tupla -> id do fluxo, em ordem do último pacote
+        self.closing = OrderedDict() # id do fluxo -> tempo do FIN/RST, em ordem de encerramento
+        self.free = list(range(capacity - 1, -1, -1)) # ids livres
+        self.finished = {name: array(np.dtype(dtype).char) for name, dtype in FIELDS.items()} # fluxos removidos, sem onExpire
+        self.finishedCount = 0 # total de fluxos removidos
+        self.expiredIdle = 0
+        self.expiredClosed = 0
+
+    def __len__(self):
+        return len(self.index)
+
+    # dobra a capacidade dos arrays
+    def grow(self):
+        capacity = len(self.columns["src"])
+        for name, column in self.columns.items():
+            self.columns[name] = np.concatenate((column, np.zeros(capacity, dtype=column.dtype)))
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    # cria fluxo para a 5-tupla e retorna seu id
+    def addFlow(self, key, time):
+        if not self.free:
+            self.grow()
+
+        flowId = self.free.pop()
+        for name, value in zip(("src", "dst", "sport", "dport", "proto"), key):
+            self.columns[name][flowId] = value
+        for name in FIELDS:
+            if name not in ("src", "dst", "sport", "dport", "proto"):
+                self.columns[name][flowId] = 0
+        self.columns["firstTime"][flowId] = time
+        self.index[key] = flowId
+
+        return flowId
+
+    # remove fluxo, entregando seus campos a onExpire ou aos arrays de fluxos encerrados
+    def removeFlow(self, key):
+        flowId = self.index.pop(key)
+        self.closing.pop(flowId, None)
+        self.finishedCount += 1
+
+        if self.onExpire is not None:
+            self.onExpire(self.getFlow(flowId))
+        else:
+            for name in FIELDS:
+                self.finished[name].append(self.columns[name][flowId].item())
+            self.trimFinished()
+
+        self.free.append(flowId)
+
+    # descarta os fluxos removidos mais antigos além de maxFinished; o corte é feito em blocos de maxFinished/2
+    # para não deslocar os arrays a cada fluxo, e getFlows devolve só os maxFinished mais recentes
+    def trimFinished(self):
+        surplus = len(self.finished["src"]) - self.maxFinished
+        if surplus > self.maxFinished // 2:
+            for buffer in self.finished.values():
+                del buffer[:surplus]
+
+    # retorna campos de um fluxo ativo
+    def getFlow(self, flowId):
+        return {name: self.columns[name][flowId].item() for name in FIELDS}
+
+    # processa um pacote a partir dos seus campos
+    def update(self, src, dst, sport, dport, proto, length, flags, time):
+        self.evict(time)
+        key = (src, dst, sport, dport, proto)
+        columns = self.columns
+        flowId = self.index.get(key)
+
+        # SYN em fluxo já encerrado reutiliza a 5-tupla para uma nova conexão
+        if flowId is not None and proto == PROTO_TCP and flags & FLAG_SYN and not flags & FLAG_ACK and columns["state"][flowId] >= STATE_FIN:
+            self.removeFlow(key)
+            self.expiredClosed += 1
+            flowId = None
+
+        if flowId is None:
+            flowId = self.addFlow(key, time)
+        else:
+            self.index.move_to_end(key)
+
+        columns["packets"][flowId] += 1
+        columns["bytes"][flowId] += length
+        columns["lastTime"][flowId] = time
+
+        if proto == PROTO_TCP:
+            self.updateTcp(flowId, flags, time)
+
+    # atualiza contadores de flags e estado de um fluxo TCP
+    def updateTcp(self, flowId, flags, time):
+        columns = self.columns
+        for flag, name in FLAG_COUNTS:
+            if flags & flag:
+                columns[name][flowId] += 1
+
+        state = columns["state"][flowId]
+        if flags & FLAG_RST:
+            state = STATE_RESET
+        elif flags & FLAG_FIN and state != STATE_RESET:
+            state = STATE_FIN
+        elif flags & FLAG_SYN and not flags & FLAG_ACK and state == STATE_ACTIVE:
+            state = STATE_SYN_SENT
+        elif flags & FLAG_ACK and state in (STATE_ACTIVE, STATE_SYN_SENT):
+            state = STATE_ESTABLISHED
+        columns["state"][flowId] = state
+
+        if flags & (FLAG_FIN | FLAG_RST):
+            self.closing[flowId] = time
+            self.closing.move_to_end(flowId)
+
+    # processa os pacotes IP de uma tabela colunar, em ordem de captura
+    def updateTable(self, table):
+        rows = np.flatnonzero(table.proto >= 0)
+        columns = (table.src, table.dst, table.sport, table.dport, table.proto, table.length, table.flags, table.time)
+
+        for row in zip(*(column[rows].tolist() for column in columns)):
+            self.update(*row)
+
+    # remove fluxos encerrados há mais de closeTimeout e fluxos sem pacotes há mais de idleTimeout
+    def evict(self, now):
+        lastTime = self.columns["lastTime"]
+
+        while self.closing:
+            flowId, closeTime = next(iter(self.closing.items()))
+            if now - closeTime <= self.closeTimeout:
+                break
+
+            self.removeFlow(tuple(self.columns[name][flowId].item() for name in ("src", "dst", "sport", "dport", "proto")))
+            self.expiredClosed += 1
+
+        while self.index:
+            key, flowId = next(iter(self.index.items()))
+            if now - lastTime[flowId] <= self.idleTimeout:
+                break
+
+            self.removeFlow(key)
+            self.expiredIdle += 1
+
+    # remove todos os fluxos ativos, usado ao fim da captura
+    def flush(self):
+        while self.index:
+            self.removeFlow(next(iter(self.index)))
+
+    # retorna campos dos maxFinished fluxos encerrados mais recentes e dos ativos como arrays NumPy,
+    # em ordem de remoção e depois de criação
+    def getFlows(self):
+        active = np.array(sorted(self.index.values(), key=lambda flowId: self.columns["firstTime"][flowId]), dtype=np.int64)
+        kept = min(len(self.finished["src"]), self.maxFinished)
+        flows = {}
+
+        for name, dtype in FIELDS.items():
+            finished = np.array(self.finished[name][len(self.finished[name]) - kept:], dtype=dtype)
+            flows[name] = np.concatenate((finished, self.columns[name][active]))
+
+        return flows
+
+    # retorna contadores da tabela; dropped são fluxos removidos que não foram guardados pelo limite maxFinished
+    def getCounters(self):
+        dropped = 0 if self.onExpire is not None else self.finishedCount - min(len(self.finished["src"]), self.maxFinished)
+
+        return {"active": len(self.index),
+                "finished": self.finishedCount,
+                "dropped": dropped,
+                "expiredIdle": self.expiredIdle,
+                "expiredClosed": self.expiredClosed,
+                "capacity": len(self.columns["src"])
+                }
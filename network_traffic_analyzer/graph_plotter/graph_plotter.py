@@ -1,5 +1,8 @@
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from enum import Enum
+import numpy as np
 import sys
 
 # colors supported by matplotlib (except white)
@@ -149,7 +152,7 @@ class Color(Enum):
 # plot graphs using matplotlib
 class GraphPlotter:
 
-    def __init__(self, title=None, xLabel=None, yLabel=None, grid=True, legendFlag=True, legendPosition=None, colors=[], plotCount=0):
+    def __init__(self, title=None, xLabel=None, yLabel=None, grid=True, legendFlag=True, legendPosition=None, colors=[], plotCount=0, figure=None):
         self.title = title # graph title
         self.xLabel = xLabel # axis x label
         self.yLabel = yLabel # axis y label
@@ -158,7 +161,24 @@ class GraphPlotter:
         self.legendPosition = legendPosition # legend position option (right, bottom, left)
         self.colors = colors if colors else list(Color) # colors input or list of Color enum
         self.plotCount = plotCount # number of plots
-        self.fig, self.axis = plt.subplots() # subplots objects for each instance, avoid error using plt global 
+
+        if figure is None:
+            self.fig, self.axis = plt.subplots() # subplots objects for each instance, avoid error using plt global; needed by showGraph
+        else:
+            figure.clear() # reused figure, drawn again from scratch
+            self.fig, self.axis = figure, figure.add_subplot()
+
+    # create a figure drawn by the Agg canvas, outside pyplot global state: no GUI backend, released when no longer referenced
+    @staticmethod
+    def newFigure():
+        figure = Figure()
+        FigureCanvasAgg(figure)
+
+        return figure
+
+    # release a pyplot figure; figures from newFigure are not tracked by pyplot
+    def closeGraph(self):
+        plt.close(self.fig)
     
     # get color from Color enum or color passed by argument
     def getColor(self, color=None, i=0):
@@ -191,7 +211,8 @@ class GraphPlotter:
 
         plt.show()
 
-    def saveGraph(self, filename="graph.png", dpi=300, bbox_inches="tight"):
+    # format: png, svg, pdf, ...; None uses the filename extension
+    def saveGraph(self, filename="graph.png", dpi=300, bbox_inches="tight", format=None):
         
         if self.legendFlag == True:
             if self.legendPosition == "right":
@@ -210,18 +231,85 @@ class GraphPlotter:
                 self.axis.legend()
 
         try:
-            self.fig.savefig(filename, dpi=dpi, bbox_inches=bbox_inches)
+            self.fig.savefig(filename, dpi=dpi, bbox_inches=bbox_inches, format=format)
         except Exception as e:
             print(f"Error saving graph: {e}")
 
+    # Largest-Triangle-Three-Buckets: keeps first and last points and, for each of the nOut - 2 buckets between them, the point
+    # forming the largest triangle with the previously kept point and the mean of the next bucket; preserves the visual shape
+    @staticmethod
+    def decimateLttb(x, y, nOut):
+        n = len(y)
+        if nOut < 3 or n <= nOut:
+            return x, y
+
+        edges = np.linspace(1, n - 1, nOut - 1).astype(np.int64) # bucket i is [edges[i], edges[i + 1])
+        selected = np.empty(nOut, dtype=np.int64)
+        selected[0], selected[-1] = 0, n - 1
+
+        a = 0 # previously kept point
+        for i in range(nOut - 2):
+            start, stop = edges[i], edges[i + 1]
+
+            if i < nOut - 3:
+                nextX, nextY = x[stop:edges[i + 2]].mean(), y[stop:edges[i + 2]].mean()
+            else:
+                nextX, nextY = x[-1], y[-1]
+
+            areas = np.abs((x[a] - nextX) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (nextY - y[a]))
+            a = start + int(np.argmax(areas))
+            selected[i + 1] = a
+
+        return x[selected], y[selected]
+
+    # min/max per bucket: keeps the lowest and highest point of each of nBuckets index buckets (about one per pixel column),
+    # in their original order, so every spike of the full series is still drawn
+    @staticmethod
+    def decimateMinMax(x, y, nBuckets):
+        n = len(y)
+        if nBuckets < 1 or n <= 2 * nBuckets:
+            return x, y
+
+        size = -(-n // nBuckets)
+        nBuckets = -(-n // size)
+        buckets = np.pad(y, (0, nBuckets * size - n), mode="edge").reshape(nBuckets, size) # padding repeats the last point
+        starts = np.arange(nBuckets) * size
+
+        selected = np.concatenate(([0, n - 1], starts + buckets.argmin(axis=1), starts + buckets.argmax(axis=1)))
+        selected = np.unique(np.minimum(selected, n - 1))
+
+        return x[selected], y[selected]
+
+    # reduce a line to about maxPoints points before plotting
+    # decimation: "auto" or "minmax" (min/max per bucket, closest to the full rendering), "lttb" (Largest-Triangle-Three-Buckets,
+    # smoother shape with fewer points), None keeps every point; only applied above maxPoints numeric points
+    @staticmethod
+    def decimate(x, y, decimation="auto", maxPoints=4000):
+        if decimation is None or len(y) <= maxPoints or len(x) != len(y):
+            return x, y
+
+        try:
+            xData = np.asarray(x, dtype=np.float64)
+            yData = np.asarray(y, dtype=np.float64)
+        except (TypeError, ValueError): # categorical axis
+            return x, y
+
+        if decimation == "lttb":
+            return GraphPlotter.decimateLttb(xData, yData, maxPoints)
+
+        return GraphPlotter.decimateMinMax(xData, yData, maxPoints // 2)
+
     # plot using object attributes or method arguments 
+    # series longer than maxPoints are decimated (see decimate); scales are computed from the full series
     def plotLineGraph(self, x, y, color=None, plotLabel=None, xLabel=None, yLabel=None, title=None, grid=None, marker="o", linestyle="-", autoScaleY=False, 
-                      autoScaleX=False, yScaleFactor=3, xScaleFactor=3, yScaleStart=0, xScaleStart=0, yScale="linear", xScale="linear", base=10):
+                      autoScaleX=False, yScaleFactor=3, xScaleFactor=3, yScaleStart=0, xScaleStart=0, yScale="linear", xScale="linear", base=10,
+                      decimation="auto", maxPoints=4000):
 
         color = self.getColor(color, self.plotCount)
         self.plotCount += 1
 
-        self.axis.plot(x, y, color=color, label=plotLabel, marker=marker, linestyle=linestyle)
+        xPlot, yPlot = self.decimate(x, y, decimation, maxPoints)
+        self.axis.plot(xPlot, yPlot, color=color, label=plotLabel, marker=marker, linestyle=linestyle)
 
         self.axis.set_xlabel(xLabel or self.xLabel)
         self.axis.set_ylabel(yLabel or self.yLabel)
@@ -237,11 +325,11 @@ class GraphPlotter:
 
         # automatic scale adjustment, to better visualization of the graph
         if autoScaleY and len(y) > 0:
-            yMean = sum(y) / len(y)
+            yMean = np.mean(y)
             self.axis.set_ylim(yScaleStart, yMean * yScaleFactor)
 
         if autoScaleX and len(x) > 0:
-            xMean = sum(x) / len(x)
+            xMean = np.mean(x)
             self.axis.set_xlim(xScaleStart, xMean * xScaleFactor)
 
     def plotBarGraph(self, x, y, color=None, plotLabel=None, xLabel=None, yLabel=None, title=None, grid=None, align="center", edgecolor="black", horizontal=False):
@@ -280,18 +368,38 @@ class GraphPlotter:
         self.axis.set_title(self.title or "")
         self.axis.axis('equal')  # circle
 
-    def plotHistogram(self, data, bins=10, color=None, plotLabel=None, xLabel=None, yLabel=None, title=None, grid=None, edgecolor="black", density=False, histtype="bar"):
+    # weights: counts for each data value, allows plotting already binned data (data = bin starts, bins = edges)
+    def plotHistogram(self, data, bins=10, color=None, plotLabel=None, xLabel=None, yLabel=None, title=None, grid=None, edgecolor="black", density=False, histtype="bar",
+                      weights=None):
 
         color = self.getColor(color, self.plotCount)
         self.plotCount += 1
 
-        self.axis.hist(data, bins, color=color, label=plotLabel, edgecolor=edgecolor, density=density, histtype=histtype)
+        self.axis.hist(data, bins, color=color, label=plotLabel, edgecolor=edgecolor, density=density, histtype=histtype, weights=weights)
 
         self.axis.set_xlabel(xLabel or self.xLabel)
         self.axis.set_ylabel(yLabel or self.yLabel)
         self.axis.set_title(title or self.title)
         self.axis.grid(self.grid if grid is None else grid)
 
+    # plot already binned data: counts[i] samples in [edges[i], edges[i + 1]), no samples needed
+    # trim drops empty bins at both ends, so wide fixed ranges only show the filled part; log edges are drawn with xScale="log"
+    def plotBinnedHistogram(self, counts, edges, color=None, plotLabel=None, xLabel=None, yLabel=None, title=None, grid=None, edgecolor="black", density=False,
+                            histtype="bar", xScale="linear", base=10, trim=True):
+
+        counts = np.asarray(counts)
+        edges = np.asarray(edges, dtype=np.float64)
+
+        nonEmpty = np.flatnonzero(counts)
+        if trim and len(nonEmpty) > 0:
+            counts = counts[nonEmpty[0]:nonEmpty[-1] + 1]
+            edges = edges[nonEmpty[0]:nonEmpty[-1] + 2]
+
+        self.plotHistogram(edges[:-1], edges, color, plotLabel, xLabel, yLabel, title, grid, edgecolor, density, histtype, weights=counts)
+
+        if xScale == "log":
+            self.axis.set_xscale(xScale, base=base)
+
     # custom user input plot
     def plotUserInput(self):
 
@@ -1 +1,2 @@
-from .icmp_analyzer import IcmpAnalyzer
\ No newline at end of file
+from .icmp_analyzer import IcmpAnalyzer
+from .echo_matcher import EchoMatcher
\ No newline at end of file
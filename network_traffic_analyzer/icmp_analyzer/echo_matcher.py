@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from array import array
+import numpy as np
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import ECHO_REPLY, ECHO_REQUEST
+from network_traffic_analyzer.running_stats import RunningStats
+
+# contadores de um destino de ping
+class TargetStats():
+    __slots__ = ("sent", "received", "lost", "rtt")
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.lost = 0
+        self.rtt = RunningStats()
+
+# associa echo request ↔ echo reply em uma passagem, pela chave (src, dst, id, seq) do request
+# requests pendentes ficam em ordem de envio e os que passam de timeout sem reply são contados como perdidos,
+# mantendo a memória limitada aos requests em andamento; contadores e RTTs são separados por destino
+class EchoMatcher():
+    def __init__(self, timeout=10000):
+        self.timeout = timeout # tempo máximo em ms que um request espera pelo reply
+        self.pending = OrderedDict() # (src, dst, id, seq) -> tempo do request, em ordem de envio
+        self.targets = {} # IP de destino dos requests -> TargetStats
+        self.rtts = array("d") # RTTs em ordem de chegada dos replies
+        self.sent = 0
+        self.received = 0
+        self.lost = 0 # requests sem reply: expirados, substituídos por request repetido ou pendentes no fim
+        self.expired = 0 # requests removidos por timeout
+        self.unmatched = 0 # replies sem request pendente (duplicados, atrasados ou request fora da captura)
+
+    # retorna contadores do destino, criando na primeira vez
+    def getTarget(self, dst):
+        target = self.targets.get(dst)
+        if target is None:
+            target = self.targets[dst] = TargetStats()
+
+        return target
+
+    # conta request pendente como perdido
+    def loseRequest(self, key):
+        self.lost += 1
+        self.getTarget(key[1]).lost += 1
+
+    # registra echo request; request repetido com a mesma chave conta o anterior como perdido
+    def addRequest(self, src, dst, id, seq, time):
+        self.evict(time)
+        key = (src, dst, id, seq)
+
+        if key in self.pending:
+            self.loseRequest(key)
+        self.pending[key] = time
+        self.pending.move_to_end(key)
+
+        self.sent += 1
+        self.getTarget(dst).sent += 1
+
+    # associa echo reply ao request pendente do sentido oposto
+    def addReply(self, src, dst, id, seq, time):
+        self.evict(time)
+        requestTime = self.pending.pop((dst, src, id, seq), None)
+
+        if requestTime is None:
+            self.unmatched += 1
+            return None
+
+        rtt = time - requestTime
+        self.rtts.append(rtt)
+        self.received += 1
+
+        target = self.getTarget(src)
+        target.received += 1
+        target.rtt.update(rtt)
+
+        return rtt
+
+    # processa um pacote ICMP a partir dos seus campos
+    def update(self, src, dst, icmpType, id, seq, time):
+        if icmpType == ECHO_REQUEST:
+            self.addRequest(src, dst, id, seq, time)
+
+        elif icmpType == ECHO_REPLY:
+            self.addReply(src, dst, id, seq, time)
+
+    # processa os pacotes ICMP de echo de uma tabela colunar, em ordem de captura
+    def updateTable(self, table):
+        icmpType = table.icmpType
+        rows = np.flatnonzero(table.getIcmpMask() & ((icmpType == ECHO_REQUEST) | (icmpType == ECHO_REPLY)))
+        columns = (table.src, table.dst, icmpType, table.icmpId, table.icmpSeq, table.time)
+
+        for row in zip(*(column[rows].tolist() for column in columns)):
+            self.update(*row)
+
+    # conta como perdidos os requests pendentes há mais de timeout
+    def evict(self, now):
+        while self.pending:
+            key, requestTime = next(iter(self.pending.items()))
+            if now - requestTime <= self.timeout:
+                break
+
+            self.pending.popitem(last=False)
+            self.loseRequest(key)
+            self.expired += 1
+
+    # conta como perdidos todos os requests ainda pendentes, usado ao fim da captura
+    def flush(self):
+        while self.pending:
+            key, _ = self.pending.popitem(last=False)
+            self.loseRequest(key)
+
+    # retorna cópia dos RTTs em ordem de chegada dos replies
+    # uma view do buffer impediria o matcher de acrescentar amostras enquanto ela existir
+    def getRtts(self):
+        return np.array(self.rtts, dtype=np.float64)
+
+    # retorna perdas e estatísticas de RTT por destino, com IPs em formato textual
+    def getTargets(self):
+        targets = {}
+
+        for dst, target in self.targets.items():
+            stats = target.rtt.getStats()
+            stats["sent"] = target.sent
+            stats["received"] = target.received
+            stats["lost"] = target.lost
+            stats["lossRate"] = (target.lost * 100) / target.sent if target.sent > 0 else 0
+            targets[PacketTable.intToIp(dst)] = stats
+
+        return targets
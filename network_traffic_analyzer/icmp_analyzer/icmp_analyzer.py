@@ -1,13 +1,22 @@
 from scapy.all import ICMP
 import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
 from network_traffic_analyzer.packet_analyzer import PacketAnalyzer
-from network_traffic_analyzer.ip_analyzer import IpAnalyzer
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.icmp_analyzer.echo_matcher import EchoMatcher
+from network_traffic_analyzer.icmp_analyzer.icmp_stages import IcmpEchoStage
+from network_traffic_analyzer.packet_analyzer.table_stages import IntervalStage
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+from network_traffic_analyzer.running_stats import RunningStats
+from network_traffic_analyzer.stats_cache import cached
 
 # analisador de camada ICMP
 class IcmpAnalyzer(PacketAnalyzer):
+    cacheState = PacketAnalyzer.cacheState + ("echoTimeout",)
 
-    def __init__(self, id=None, packetsMargin=None, path=None):
-        super().__init__(id, packetsMargin, path)
+    def __init__(self, id=None, packetsMargin=None, path=None, streaming=False, decoder="scapy", timeMargin=None, workers=None, tableCache=None):
+        super().__init__(id, packetsMargin, path, streaming, decoder, timeMargin, workers, tableCache)
+        self.echoTimeout = 10000 # tempo máximo em ms entre echo request e echo reply; requests sem reply nesse tempo são perdidos
 
     # retorna tipo de ICMP: 0 = echo request , 8 = echo reply
     def getIcmpType(self, pkt):
@@ -37,116 +46,115 @@ class IcmpAnalyzer(PacketAnalyzer):
             return None
     
     # retorna lista de sequência de pacotes ICMP em ordem crescente (sem duplicatas)
+    @cached
     def getIcmpSeqsList(self):
-        seqsList = set() # conjunto sem duplicatas
-        for pkt in self.getPackets():
-            if ICMP in pkt:
-                seqsList.add(self.getIcmpSeq(pkt))
+        table = self.getTable()
 
-        return sorted(list(seqsList)) if seqsList else []
+        return np.unique(table.icmpSeq[table.getIcmpMask()]).tolist()
     
-    # retorna pares tuplas com atributos ICMP e IP e pacote equivalente para cada pacote ICMP
+    # retorna chaves (src, dst, tipo, id, seq) de cada pacote ICMP e índice do pacote na janela de análise
+    # montadas a partir das colunas da tabela, sem ler pacotes com scapy nem guardá-los
+    @cached
     def getIcmpKeys(self):
-        icmpKeys = {}
-
-        for pkt in self.getPackets():
-            if ICMP in pkt:
-                key = (
-                    IpAnalyzer.getSrcIp(pkt),
-                    IpAnalyzer.getDstIp(pkt), 
-                    self.getIcmpType(pkt), 
-                    self.getIcmpId(pkt), 
-                    self.getIcmpSeq(pkt)
-                )
-                icmpKeys[key] = pkt
-        
-        return icmpKeys
+        table = self.getTable()
+        rows = np.flatnonzero(table.getIcmpMask())
+        src, dst = table.src[rows], table.dst[rows]
+        ips = {value: PacketTable.intToIp(value) for value in np.unique(np.concatenate((src, dst))).tolist()}
+
+        return {(ips[s], ips[d], icmpType, icmpId, icmpSeq): row
+                for s, d, icmpType, icmpId, icmpSeq, row in zip(src.tolist(), dst.tolist(), table.icmpType[rows].tolist(),
+                                                                table.icmpId[rows].tolist(), table.icmpSeq[rows].tolist(), rows.tolist())}
     
-    # retorna pacote filtrado por chave
+    # retorna pacote filtrado por chave, lido da captura só quando pedido
     #override
     def getPacketByKey(self, key):
-        return self.getIcmpKeys().get(key)
+        row = self.getIcmpKeys().get(key)
+
+        return self.getPacket(row) if row is not None else None
+
+    # acrescenta echoes e intervalos entre echo requests à passagem incremental
+    # override
+    def getStreamStages(self):
+        return super().getStreamStages() + [IcmpEchoStage(self.echoTimeout), IntervalStage("ICMP")]
+
+    # associa echo requests e replies pela chave (src, dst, id, seq) em uma passagem, com perdas por timeout e por destino
+    @cached
+    def getEchoes(self):
+        if self.usesStreamResults():
+            icmp = self.getStreamResults().get("icmp")
+            return {"rtts": icmp.get("rtt").get("rtts"),
+                    "sent": icmp.get("sent"),
+                    "received": icmp.get("received"),
+                    "lost": icmp.get("lost"),
+                    "expired": icmp.get("expired"),
+                    "unmatched": icmp.get("unmatched"),
+                    "targets": icmp.get("targets")
+                    }
+
+        matcher = EchoMatcher(self.echoTimeout)
+        matcher.updateTable(self.getTable())
+        matcher.flush() # requests ainda pendentes no fim da captura não tiveram reply
+
+        return {"rtts": matcher.getRtts(),
+                "sent": matcher.sent,
+                "received": matcher.received,
+                "lost": matcher.lost,
+                "expired": matcher.expired,
+                "unmatched": matcher.unmatched,
+                "targets": matcher.getTargets()
+                }
 
     # retorna estatísticas de rtt ICMP: lista de rtt, desvio padrão, média, máximo, mínimo, erro padrão e coeficiente de variação
     # override
+    @cached
     def getRttStats(self):
-        rtts = []
-        requests = {}
-
-        for pkt in self.getPackets():
-            if ICMP in pkt:
-                seq = self.getIcmpSeq(pkt)
-
-                if self.getIcmpType(pkt) == 8: # echo request
-                    requests[seq] = pkt
-
-                elif self.getIcmpType(pkt) == 0 and seq in requests: # echo reply
-                    rtts.append(self.getTimeDiff(requests[seq], pkt))
-
-        rtts = np.array(rtts) if rtts else []
-        mean = np.mean(rtts) if len(rtts) > 0 else 0 
-        std = np.std(rtts) if len(rtts) > 0 else 0
-        max = np.max(rtts) if len(rtts) > 0 else 0
-        min = np.min(rtts) if len(rtts) > 0 else 0
-        error = std/np.sqrt(len(rtts)) if len(rtts) > 0 else 0
-        cv = (std/mean)*100 if mean > 0 else 0
-
-        return {"rtts": rtts,
-                "mean": mean,
-                "std": std,
-                "max": max,
-                "min": min,
-                "error": error,        
-                "cv": cv
-                }
+        rtts = self.getEchoes().get("rtts")
+        rtts = rtts if len(rtts) > 0 else []
+        runningStats = RunningStats().updateBatch(rtts)
+
+        stats = runningStats.getStats()
+        stats["rtts"] = rtts
+        stats["runningStats"] = runningStats # acumulador combinável com o de outras capturas ou partes
+        stats["sketch"] = QuantileSketch().updateBatch(rtts) # esboço de quantis, também combinável
+        stats["percentiles"] = stats["sketch"].getPercentiles()
+        stats["histogram"] = BinnedHistogram().updateBatch(rtts) # histograma de bins fixos, também combinável
+
+        return stats
     
     # retorna estatísticas de intervalo de chegada entre requisições ICMP: lista de intervalos, média, desvio padrão, máximo, mínimo, erro padrão e coeficiente de variação
     # override
+    @cached
     def getIntervalStats(self):
         if self.getTotalPackets() < 2:
             print("There is no way to measure interval with less than two packets")
             return None
 
-        requestTimes = []
-
-        for pkt in self.getPackets():
-            if ICMP in pkt:
-                if self.getIcmpType(pkt) == 8:
-                    requestTimes.append(self.getTime(pkt))
-
-        intervals = np.diff(requestTimes) if requestTimes else []  # diferença entre tempos consecutivos
-        mean = np.mean(intervals) if len(intervals) > 0 else 0
-        std = np.std(intervals) if len(intervals) > 0 else 0
-        max = np.max(intervals) if len(intervals) > 0 else 0
-        min = np.min(intervals) if len(intervals) > 0 else 0
-        error = std/np.sqrt(len(intervals)) if len(intervals) > 0 else 0
-        cv = (std/mean)*100 if mean > 0 else 0
-
-        return {"intervals": intervals,
-                "mean": mean,
-                "std": std,
-                "max": max,
-                "min": min,
-                "error": error,
-                "cv": cv
-                } 
+        if self.usesStreamResults():
+            return self.getStreamResults().get("icmpInterval")
+
+        table = self.getTable()
+        requestTimes = table.time[table.getIcmpMask() & (table.icmpType == 8)]
+
+        intervals = np.diff(requestTimes) if len(requestTimes) > 0 else []  # diferença entre tempos consecutivos
+        runningStats = RunningStats().updateBatch(intervals)
+
+        stats = runningStats.getStats()
+        stats["intervals"] = intervals
+        stats["runningStats"] = runningStats
+        stats["sketch"] = QuantileSketch().updateBatch(intervals)
+        stats["percentiles"] = stats["sketch"].getPercentiles()
+        stats["histogram"] = BinnedHistogram().updateBatch(intervals)
+
+        return stats
 
     # retorna estatísticas de perda de pacotes: enviados, recebidos, perdidos, taxa de perdas
     # override
+    @cached
     def getLossStats(self):
-        sent = 0
-        seqReceived = set()
-
-        for pkt in self.getPackets():
-            if ICMP in pkt:
-                if self.getIcmpType(pkt) == 8:
-                    sent += 1
-
-                elif self.getIcmpType(pkt) == 0:
-                    seqReceived.add(self.getIcmpSeq(pkt))
-        
-        received = len(seqReceived)
-        lost = sent - received
+        echoes = self.getEchoes()
+        sent = echoes.get("sent")
+        received = echoes.get("received")
+        lost = echoes.get("lost")
         lossRate = (lost * 100)/sent if sent > 0 else 0
         lossStats = [sent, received, lost]
 
@@ -154,7 +162,9 @@ class IcmpAnalyzer(PacketAnalyzer):
                 "received": received, 
                 "lost": lost, 
                 "lossRate": lossRate,
-                "lossStats": lossStats
+                "lossStats": lossStats,
+                "expired": echoes.get("expired"),
+                "unmatched": echoes.get("unmatched")
                 }
 
     # imprime métricas ICMP
@@ -176,37 +186,42 @@ class IcmpAnalyzer(PacketAnalyzer):
     # override
     def printRttMetrics(self):
         layer = "ICMP"
-        mean = self.getRttStats().get("mean")
-        std = self.getRttStats().get("std")
-        max = self.getRttStats().get("max")
-        min = self.getRttStats().get("min")
-        error = self.getRttStats().get("error")
-        cv = self.getRttStats().get("cv")
-
-        return super().printRttMetrics(layer, mean, std, max, min, error, cv)
+        stats = self.getRttStats()
+        mean = stats.get("mean")
+        std = stats.get("std")
+        max = stats.get("max")
+        min = stats.get("min")
+        error = stats.get("error")
+        cv = stats.get("cv")
+        percentiles = stats.get("percentiles")
+
+        return super().printRttMetrics(layer, mean, std, max, min, error, cv, percentiles)
     
     # override
     def printIntervalMetrics(self):
         layer = "ICMP"
-        mean = self.getIntervalStats().get("mean")
-        std = self.getIntervalStats().get("std")
-        max = self.getIntervalStats().get("max")
-        min = self.getIntervalStats().get("min")
-        error = self.getIntervalStats().get("error")
-        cv = self.getIntervalStats().get("cv")
-
-        return super().printIntervalMetrics(layer, mean, std, max, min, error, cv)
+        stats = self.getIntervalStats()
+        mean = stats.get("mean")
+        std = stats.get("std")
+        max = stats.get("max")
+        min = stats.get("min")
+        error = stats.get("error")
+        cv = stats.get("cv")
+        percentiles = stats.get("percentiles")
+
+        return super().printIntervalMetrics(layer, mean, std, max, min, error, cv, percentiles)
     
     # override
     def printRttJitterMetrics(self):
         layer = "ICMP"
         rtts = self.getRttStats().get("rtts")
-        mean = self.getJitterStats(rtts).get("mean")
-        std = self.getJitterStats(rtts).get("std")
-        max = self.getJitterStats(rtts).get("max")
-        min = self.getJitterStats(rtts).get("min")
-        error = self.getJitterStats(rtts).get("error")
-        cv = self.getJitterStats(rtts).get("cv")
+        stats = self.getJitterStats(rtts)
+        mean = stats.get("mean")
+        std = stats.get("std")
+        max = stats.get("max")
+        min = stats.get("min")
+        error = stats.get("error")
+        cv = stats.get("cv")
 
         return super().printRttJitterMetrics(layer, mean, std, max, min, error, cv)
     
@@ -214,24 +229,33 @@ class IcmpAnalyzer(PacketAnalyzer):
     def printIntervalJitterMetrics(self):
         layer = "ICMP"
         intervals = self.getIntervalStats().get("intervals")
-        mean = self.getJitterStats(intervals).get("mean")
-        std = self.getJitterStats(intervals).get("std")
-        max = self.getJitterStats(intervals).get("max")
-        min = self.getJitterStats(intervals).get("min")
-        error = self.getJitterStats(intervals).get("error")
-        cv = self.getJitterStats(intervals).get("cv")
+        stats = self.getJitterStats(intervals)
+        mean = stats.get("mean")
+        std = stats.get("std")
+        max = stats.get("max")
+        min = stats.get("min")
+        error = stats.get("error")
+        cv = stats.get("cv")
 
         return super().printIntervalJitterMetrics(layer, mean, std, max, min, error, cv)
     
     # override
     def printLossMetrics(self):
         layer = "ICMP"
-        sent = self.getLossStats().get("sent")
-        received = self.getLossStats().get("received")
-        lost = self.getLossStats().get("lost")
-        lossRate = self.getLossStats().get("lossRate")
+        stats = self.getLossStats()
+        sent = stats.get("sent")
+        received = stats.get("received")
+        lost = stats.get("lost")
+        lossRate = stats.get("lossRate")
 
         return super().printLossMetrics(layer, sent, received, lost, lossRate)
+
+    # imprime RTT e perdas por destino dos echo requests
+    def printTargetMetrics(self):
+        for target, stats in self.getEchoes().get("targets").items():
+            print(f"ICMP target {target}: sent {stats.get('sent')}, received {stats.get('received')}, lost {stats.get('lost')} "
+                  f"({stats.get('lossRate'):.2f}%), mean RTT {stats.get('mean'):.4f} ms, max RTT {stats.get('max'):.4f} ms")
+        print()
     
     # plotagem de gráficos ICMP
     # override
@@ -294,44 +318,44 @@ class IcmpAnalyzer(PacketAnalyzer):
     # override
     def plotRttHistogram(self, path):
         id = self.getId()
-        rtts = self.getRttStats().get("rtts")
+        histogram = self.getRttStats().get("histogram")
         title = None
         xLabel = "RTT interval (ms)"
         yLabel = "Frequency"
 
-        return super().plotRttHistogram(path, id, rtts, title, xLabel, yLabel)
+        return super().plotRttHistogram(path, id, histogram, title, xLabel, yLabel)
     
     # override
     def plotIntervalHistogram(self, path):
         id = self.getId()
-        intervals = self.getIntervalStats().get("intervals")
+        histogram = self.getIntervalStats().get("histogram")
         title = None
         xLabel = "Packet arrival time interval (ms)"
         yLabel = "Frequency"
 
-        return super().plotIntervalHistogram(path, id, intervals, title, xLabel, yLabel)
+        return super().plotIntervalHistogram(path, id, histogram, title, xLabel, yLabel)
 
     # override
     def plotRttJitterHistogram(self, path):
         id = self.getId()
         rtts = self.getRttStats().get("rtts")
-        jitters = self.getJitterStats(rtts).get("jitters")
+        histogram = self.getJitterStats(rtts).get("histogram")
         title = None
         xLabel = "Jitter interval (ms)"
         yLabel = "Frequency"
 
-        return super().plotRttJitterHistogram(path, id, jitters, title, xLabel, yLabel)
+        return super().plotRttJitterHistogram(path, id, histogram, title, xLabel, yLabel)
     
     # override
     def plotIntervalJitterHistogram(self, path):
         id = self.getId()
         intervals = self.getIntervalStats().get("intervals")
-        jitters = self.getJitterStats(intervals).get("jitters")
+        histogram = self.getJitterStats(intervals).get("histogram")
         title = None
         xLabel = "Jitter interval (ms)"
         yLabel = "Frequency"
 
-        return super().plotIntervalJitterHistogram(path, id, jitters, title, xLabel, yLabel)
+        return super().plotIntervalJitterHistogram(path, id, histogram, title, xLabel, yLabel)
     
     #override
     def plotLossGraph(self, path):
@@ -0,0 +1,83 @@
+from array import array
+import numpy as np
+from network_traffic_analyzer.icmp_analyzer.echo_matcher import EchoMatcher
+from network_traffic_analyzer.packet_analyzer.table_stages import PipelineStage, getSampleStats, hashKeys
+from network_traffic_analyzer.packet_table.packet_table import ECHO_REPLY, ECHO_REQUEST
+
+# RTT e perdas ICMP por echo request ↔ echo reply, com o estado do EchoMatcher mantido entre lotes
+class IcmpEchoStage(PipelineStage):
+    name = "icmp"
+    parallel = "partition"
+
+    def __init__(self, timeout=10000):
+        self.matcher = EchoMatcher(timeout)
+        self.positions = [] # índice na captura do reply de cada RTT, para ordenar partições em merge
+        self.targetPositions = {} # destino -> índice do primeiro request, ordem de criação dos destinos
+
+    # override
+    def update(self, table):
+        self.matcher.updateTable(table)
+
+    # override
+    def finish(self):
+        self.matcher.flush()
+
+    # override
+    def getResult(self):
+        matcher = self.matcher
+
+        return {"rtt": getSampleStats(matcher.getRtts(), "rtts"),
+                "sent": matcher.sent,
+                "received": matcher.received,
+                "lost": matcher.lost,
+                "lossRate": (matcher.lost * 100) / matcher.sent if matcher.sent > 0 else 0,
+                "expired": matcher.expired,
+                "unmatched": matcher.unmatched,
+                "targets": matcher.getTargets()
+                }
+
+    # override
+    def getPartitionKeys(self, table):
+        icmpType = table.icmpType
+        rows = np.flatnonzero(table.getIcmpMask() & ((icmpType == ECHO_REQUEST) | (icmpType == ECHO_REPLY)))
+        targets = np.where(icmpType[rows] == ECHO_REQUEST, table.dst[rows], table.src[rows]) # partição pelo destino dos pings
+
+        return rows, hashKeys(targets)
+
+    # override
+    def updatePartition(self, table, index, previous):
+        matcher = self.matcher
+        columns = (table.src, table.dst, table.icmpType, table.icmpId, table.icmpSeq, table.time)
+
+        for position, row in zip(index.tolist(), zip(*(column.tolist() for column in columns))):
+            if row[2] == ECHO_REQUEST:
+                self.targetPositions.setdefault(row[1], position)
+
+            count = len(matcher.rtts)
+            matcher.update(*row)
+            if len(matcher.rtts) > count:
+                self.positions.append(position)
+
+    # override
+    def finishPartition(self, lastTime):
+        self.matcher.evict(lastTime)
+        self.matcher.flush()
+
+    # override
+    def merge(self, other):
+        matcher = self.matcher
+        positions = self.positions + other.positions
+        rtts = matcher.rtts + other.matcher.rtts
+        order = np.argsort(positions, kind="stable").tolist()
+
+        self.positions = [positions[i] for i in order]
+        matcher.rtts = array("d", [rtts[i] for i in order])
+        matcher.sent += other.matcher.sent
+        matcher.received += other.matcher.received
+        matcher.lost += other.matcher.lost
+        matcher.expired += other.matcher.expired
+        matcher.unmatched += other.matcher.unmatched
+
+        self.targetPositions.update(other.targetPositions)
+        targets = {**matcher.targets, **other.matcher.targets}
+        matcher.targets = {dst: targets[dst] for dst in sorted(targets, key=self.targetPositions.get)}
@@ -0,0 +1,3 @@
+from .live_analyzer import LiveAnalyzer
+from .packet_ring import PacketRing
+from .replay_source import ReplaySource
\ No newline at end of file
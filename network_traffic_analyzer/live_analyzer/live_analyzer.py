@@ -0,0 +1,235 @@
+from scapy.all import AsyncSniffer
+from collections import Counter, deque
+import argparse
+import threading
+import time
+import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
+from network_traffic_analyzer.icmp_analyzer.echo_matcher import EchoMatcher
+from network_traffic_analyzer.live_analyzer.packet_ring import PacketRing
+from network_traffic_analyzer.live_analyzer.replay_source import ReplaySource
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+from network_traffic_analyzer.running_stats import RunningStats
+from network_traffic_analyzer.tcp_analyzer.handshake_matcher import HandshakeMatcher
+from network_traffic_analyzer.tcp_analyzer.retransmission_detector import RetransmissionDetector
+
+# analisador ao vivo: a captura (AsyncSniffer ou ReplaySource) insere pacotes em um PacketRing e uma thread consumidora
+# decodifica lotes em PacketTable e alimenta os mesmos acumuladores em uma passagem da análise de arquivos
+# (HandshakeMatcher, EchoMatcher, RetransmissionDetector); a cada interval segundos é emitido um snapshot de throughput,
+# RTT e perdas do intervalo, e nenhuma parte da captura é guardada além do buffer
+class LiveAnalyzer():
+    def __init__(self, iface=None, filter=None, replay=None, speed=1.0, capacity=65536, interval=5, batchSize=1024,
+                 onSnapshot=None, maxSnapshots=1000, echoTimeout=10000, handshakeTimeout=60000):
+        self.ring = PacketRing(capacity)
+        self.interval = interval # segundos entre snapshots
+        self.batchSize = batchSize # pacotes decodificados por lote
+        self.onSnapshot = onSnapshot or self.printSnapshot # função chamada com cada snapshot
+        self.snapshots = deque(maxlen=maxSnapshots) # snapshots mais recentes
+
+        if replay is not None:
+            self.source = ReplaySource(replay, speed, prn=self.receive)
+        else:
+            self.source = AsyncSniffer(iface=iface, filter=filter, prn=self.receive, store=False)
+
+        self.handshakes = HandshakeMatcher(handshakeTimeout)
+        self.echoes = EchoMatcher(echoTimeout)
+        self.retransmissions = RetransmissionDetector(idleTimeout=handshakeTimeout)
+
+        self.consumer = None
+        self.stopping = threading.Event()
+        self.totalPackets = 0
+        self.totalBytes = 0
+        self.lastTime = None # tempo de captura do último pacote do snapshot anterior, em ms
+        self.previous = {} # contadores acumulados no snapshot anterior
+        self.resetInterval()
+
+    # zera acumuladores do intervalo atual
+    def resetInterval(self):
+        self.packets = 0
+        self.bytes = 0
+        self.layers = Counter()
+        self.firstTime = None
+        self.endTime = None
+        self.tcpRtt = RunningStats()
+        self.tcpRttSketch = QuantileSketch()
+        self.tcpRttHistogram = BinnedHistogram()
+        self.icmpRtt = RunningStats()
+        self.icmpRttSketch = QuantileSketch()
+        self.icmpRttHistogram = BinnedHistogram()
+        self.nextSnapshot = time.monotonic() + self.interval
+
+    # recebe pacote da captura; não retorna valor para o AsyncSniffer não imprimir nada
+    def receive(self, pkt):
+        self.ring.put(pkt)
+
+    # inicia captura e thread consumidora
+    def start(self):
+        self.stopping.clear()
+        self.resetInterval()
+        self.source.start()
+        self.consumer = threading.Thread(target=self.consume, daemon=True)
+        self.consumer.start()
+
+    # interrompe a captura, processa os pacotes restantes do buffer e emite o último snapshot
+    def stop(self):
+        self.stopping.set()
+        if getattr(self.source, "running", False):
+            self.source.stop()
+        self.join()
+
+    # aguarda o fim da thread consumidora (fim da reprodução ou stop)
+    def join(self, timeout=None):
+        if self.consumer is not None:
+            self.consumer.join(timeout)
+
+    # captura por duration segundos, ou até o fim da reprodução, e retorna os snapshots
+    def run(self, duration=None):
+        self.start()
+        try:
+            self.join(duration)
+        except KeyboardInterrupt:
+            pass
+        self.stop()
+
+        return list(self.snapshots)
+
+    # laço da thread consumidora: esvazia o buffer em lotes e emite snapshots no intervalo
+    def consume(self):
+        while True:
+            finished = self.stopping.is_set() or not self.source.thread.is_alive()
+            batch = self.ring.drain(self.batchSize, timeout=0.1)
+            if batch:
+                self.process(batch)
+
+            if time.monotonic() >= self.nextSnapshot:
+                self.takeSnapshot()
+
+            if finished and len(self.ring) == 0:
+                break
+
+        self.echoes.flush() # requests ainda pendentes ao fim da captura não tiveram reply
+        self.takeSnapshot()
+
+    # decodifica lote de pacotes e atualiza os acumuladores
+    def process(self, packets):
+        table = PacketTable.fromPackets(packets)
+        times = table.time
+
+        self.packets += len(table)
+        self.bytes += int(table.length.sum(dtype=np.int64))
+        self.layers.update(table.getLayers())
+        self.firstTime = float(times[0]) if self.firstTime is None else self.firstTime
+        self.endTime = float(times[-1])
+
+        self.handshakes.updateTable(table)
+        rtts = self.handshakes.getRtts()
+        self.handshakes.pairs.clear() # handshakes já contados, a memória fica limitada aos SYNs pendentes
+        self.tcpRtt.updateBatch(rtts)
+        self.tcpRttSketch.updateBatch(rtts)
+        self.tcpRttHistogram.updateBatch(rtts)
+
+        self.echoes.updateTable(table)
+        rtts = np.array(self.echoes.rtts, dtype=np.float64)
+        del self.echoes.rtts[:]
+        self.icmpRtt.updateBatch(rtts)
+        self.icmpRttSketch.updateBatch(rtts)
+        self.icmpRttHistogram.updateBatch(rtts)
+
+        self.retransmissions.updateTable(table)
+
+    # retorna contadores acumulados de perdas e descartes
+    def getCounters(self):
+        counters = self.retransmissions.getCounters()
+
+        return {"dataSegments": counters.get("dataSegments"),
+                "retransmissions": counters.get("retransmissions"),
+                "sent": self.echoes.sent,
+                "received": self.echoes.received,
+                "lost": self.echoes.lost,
+                "dropped": self.ring.dropped
+                }
+
+    # monta snapshot do intervalo atual, entrega a onSnapshot e inicia novo intervalo
+    def takeSnapshot(self):
+        counters = self.getCounters()
+        delta = {name: value - self.previous.get(name, 0) for name, value in counters.items()}
+        self.totalPackets += self.packets
+        self.totalBytes += self.bytes
+
+        # duração em tempo de captura, do fim do snapshot anterior ao último pacote deste
+        startTime = self.lastTime if self.lastTime is not None else self.firstTime
+        span = self.endTime - startTime if self.endTime is not None else 0
+        seconds = span / 1000
+
+        tcpRtt = self.tcpRtt.getStats()
+        tcpRtt["percentiles"] = self.tcpRttSketch.getPercentiles()
+        tcpRtt["histogram"] = self.tcpRttHistogram # histogramas de intervalos consecutivos são somados com merge
+        icmpRtt = self.icmpRtt.getStats()
+        icmpRtt["percentiles"] = self.icmpRttSketch.getPercentiles()
+        icmpRtt["histogram"] = self.icmpRttHistogram
+
+        snapshot = {"time": self.endTime,
+                    "span": span,
+                    "packets": self.packets,
+                    "bytes": self.bytes,
+                    "throughput": (self.bytes * 8 / span) / 1000 if span > 0 else 0,
+                    "packetRate": self.packets / seconds if seconds > 0 else 0,
+                    "layers": dict(self.layers),
+                    "tcpRtt": tcpRtt,
+                    "icmpRtt": icmpRtt,
+                    "tcpLoss": {"dataSegments": delta.get("dataSegments"),
+                                "retransmissions": delta.get("retransmissions"),
+                                "lossRate": (delta.get("retransmissions") * 100) / delta.get("dataSegments") if delta.get("dataSegments") > 0 else 0},
+                    "icmpLoss": {"sent": delta.get("sent"),
+                                 "received": delta.get("received"),
+                                 "lost": delta.get("lost"),
+                                 "lossRate": (delta.get("lost") * 100) / delta.get("sent") if delta.get("sent") > 0 else 0},
+                    "dropped": delta.get("dropped"),
+                    "totalPackets": self.totalPackets,
+                    "totalBytes": self.totalBytes,
+                    "totalDropped": self.ring.dropped,
+                    "backlog": len(self.ring)
+                    }
+
+        self.previous = counters
+        self.lastTime = self.endTime if self.endTime is not None else self.lastTime
+        self.snapshots.append(snapshot)
+        self.resetInterval()
+        self.onSnapshot(snapshot)
+
+        return snapshot
+
+    # imprime snapshot
+    @staticmethod
+    def printSnapshot(snapshot):
+        tcpRtt = snapshot.get("tcpRtt")
+        icmpRtt = snapshot.get("icmpRtt")
+        tcpLoss = snapshot.get("tcpLoss")
+        icmpLoss = snapshot.get("icmpLoss")
+
+        print(f"Packets: {snapshot.get('packets')} ({snapshot.get('packetRate'):.1f} pkt/s), "
+              f"throughput: {snapshot.get('throughput'):.4f} Mbps")
+        print(f"TCP RTT: mean {tcpRtt.get('mean'):.4f} ms, p99 {tcpRtt.get('percentiles').get(99):.4f} ms ({tcpRtt.get('count')} handshakes), "
+              f"retransmissions: {tcpLoss.get('retransmissions')} ({tcpLoss.get('lossRate'):.2f}%)")
+        print(f"ICMP RTT: mean {icmpRtt.get('mean'):.4f} ms, p99 {icmpRtt.get('percentiles').get(99):.4f} ms, "
+              f"lost: {icmpLoss.get('lost')}/{icmpLoss.get('sent')} ({icmpLoss.get('lossRate'):.2f}%)")
+        print(f"Dropped: {snapshot.get('dropped')} (total {snapshot.get('totalDropped')}), backlog: {snapshot.get('backlog')}\n")
+
+# uso: python live_analyzer.py [--iface IFACE] [--filter BPF] [--replay captura.pcap] [--speed N] [--interval S] [--duration S]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Analyze live traffic or a replayed capture with periodic snapshots")
+    parser.add_argument("--iface", default=None, help="network interface to sniff (default: scapy's default interface)")
+    parser.add_argument("--filter", default=None, help="BPF capture filter")
+    parser.add_argument("--replay", default=None, help="replay a .pcap file instead of sniffing")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier, 0 replays as fast as possible")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between snapshots")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--capacity", type=int, default=65536, help="packets held in the ring buffer")
+    args = parser.parse_args(args)
+
+    analyzer = LiveAnalyzer(args.iface, args.filter, args.replay, args.speed, args.capacity, args.interval)
+    analyzer.run(args.duration)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import threading
+
+# buffer circular de tamanho fixo entre a captura (produtor) e a análise (consumidor)
+# quando o consumidor fica para trás e o buffer enche, os pacotes novos são descartados e contados em dropped,
+# de modo que a memória nunca passa de capacity pacotes
+class PacketRing():
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.slots = [None] * capacity
+        self.head = 0 # posição do pacote mais antigo
+        self.size = 0
+        self.received = 0 # pacotes entregues pelo produtor, incluindo descartados
+        self.dropped = 0 # pacotes descartados com o buffer cheio
+        self.condition = threading.Condition()
+
+    def __len__(self):
+        return self.size
+
+    # insere pacote no fim do buffer, retorna False se foi descartado
+    def put(self, item):
+        with self.condition:
+            self.received += 1
+            if self.size == self.capacity:
+                self.dropped += 1
+                return False
+
+            self.slots[(self.head + self.size) % self.capacity] = item
+            self.size += 1
+            self.condition.notify()
+
+        return True
+
+    # remove e retorna até maxItems pacotes em ordem de chegada, esperando até timeout segundos se o buffer estiver vazio
+    def drain(self, maxItems=None, timeout=None):
+        with self.condition:
+            if self.size == 0 and timeout:
+                self.condition.wait(timeout)
+
+            count = self.size if maxItems is None else min(self.size, maxItems)
+            items = []
+            for _ in range(count):
+                items.append(self.slots[self.head])
+                self.slots[self.head] = None
+                self.head = (self.head + 1) % self.capacity
+            self.size -= count
+
+        return items
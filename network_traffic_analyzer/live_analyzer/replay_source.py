@@ -0,0 +1,58 @@
+from scapy.all import PcapReader
+import threading
+import time
+
+# fonte de pacotes que reproduz uma captura .pcap em uma thread, com a mesma interface usada do AsyncSniffer
+# (start, stop, join, running, thread); permite testar a análise ao vivo sem privilégios de captura
+# speed: 1 reproduz no ritmo original, 10 dez vezes mais rápido, None ou 0 o mais rápido possível
+class ReplaySource():
+    def __init__(self, path, speed=1.0, prn=None):
+        self.path = path
+        self.speed = speed
+        self.prn = prn # função chamada com cada pacote
+        self.thread = None
+        self.running = False
+        self.count = 0 # pacotes reproduzidos
+        self.stopped = threading.Event()
+
+        PcapReader(path).close() # valida caminho da captura antes de iniciar a thread
+
+    # inicia reprodução em segundo plano
+    def start(self):
+        self.stopped.clear()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # reproduz pacotes respeitando os intervalos originais divididos por speed
+    def run(self):
+        startTime = time.monotonic()
+        firstTime = None
+
+        try:
+            with PcapReader(self.path) as reader:
+                for pkt in reader:
+                    if self.stopped.is_set():
+                        break
+
+                    if self.speed:
+                        firstTime = pkt.time if firstTime is None else firstTime
+                        delay = float(pkt.time - firstTime) / self.speed - (time.monotonic() - startTime)
+                        if delay > 0 and self.stopped.wait(delay):
+                            break
+
+                    self.prn(pkt)
+                    self.count += 1
+        finally:
+            self.running = False
+
+    # interrompe a reprodução e aguarda a thread terminar
+    def stop(self, join=True):
+        self.stopped.set()
+        if join:
+            self.join()
+
+    # aguarda o fim da reprodução
+    def join(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
@@ -1 +1,5 @@
-from .packet_analyzer import PacketAnalyzer
\ No newline at end of file
+from .packet_analyzer import PacketAnalyzer
+from .packet_stream import PacketStream
+from .packet_window import PacketWindow
+from .table_stream import TableStream
+from .parallel_pipeline import ParallelPipeline
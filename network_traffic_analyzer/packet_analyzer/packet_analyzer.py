@@ -1,30 +1,108 @@
 from scapy.all import rdpcap
-from collections import Counter
+from itertools import islice
 import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
+from network_traffic_analyzer.flow_table import FlowTable
 from network_traffic_analyzer.graph_plotter import GraphPlotter
+from network_traffic_analyzer.packet_analyzer.packet_stream import PacketStream
+from network_traffic_analyzer.packet_analyzer.packet_window import PacketWindow
+from network_traffic_analyzer.packet_analyzer.parallel_pipeline import ParallelPipeline
+from network_traffic_analyzer.packet_analyzer.table_stages import GroupBytesStage, LayerStage, ThroughputStage
+from network_traffic_analyzer.packet_analyzer.table_stream import TableStream
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.pcap_decoder import PcapDecoder, ParallelDecoder
+from network_traffic_analyzer.running_stats import RunningStats
+from network_traffic_analyzer.stats_cache import StatsCache, cached
 import sys
 
 # analisador de pacotes em capturas .pcap
 class PacketAnalyzer():
-    def __init__(self, id=None, packetsMargin=None, path=None):
+    cacheState = ("path", "packetsMargin", "timeMargin", "decoder", "captureVersion") # atributos que invalidam resultados memoizados
+
+    def __init__(self, id=None, packetsMargin=None, path=None, streaming=False, decoder="scapy", timeMargin=None, workers=None, tableCache=None):
         self.id = id
         self.packetsMargin = packetsMargin
+        self.timeMargin = timeMargin # segundos descartados no início e no fim da captura
+        self.decoder = decoder # "scapy" disseca pacotes com scapy, "fast" lê cabeçalhos direto do arquivo mapeado em memória
+        self.workers = workers # processos usados pelo decodificador rápido para dividir a captura, None decodifica em série
+        self.tableCache = tableCache # TableCache que guarda em disco a tabela da captura entre execuções, None desativa
+        self.streaming = streaming or decoder == "fast" or tableCache is not None # modo streaming: pacotes lidos sob demanda, sem rdpcap
+        self.statsCache = StatsCache() # resultados memoizados por método e parâmetros
+        self.graphFormat = "png" # formato dos gráficos salvos pelos métodos plot*
+        self.graphDpi = 300
+        self.graphFigure = None # figura Agg reutilizada por todos os gráficos do analisador
+        self.captureVersion = 0
+
+        if workers is not None and workers > 1 and decoder != "fast":
+            print(f"workers={workers} is only used by the fast decoder; the {decoder} decoder reads the capture serially")
 
+        self.loadCapture(path)
+
+    # carrega captura, invalidando resultados memoizados da captura anterior
+    def loadCapture(self, path):
         try:
-            self.packets = rdpcap(path)
+            self.packets = PacketStream(path) if self.streaming else rdpcap(path)
         except Exception as e:
             print(f"Capture path is wrong or not specified: {e}")
             sys.exit(1)
 
+        self.path = path
+        self.captureTable = None # tabela da captura completa, sem margens
+        self.timeIndex = None # tempos acumulados pelo máximo, ordenados para busca binária
+        self.captureVersion += 1
+
+    # altera margem de pacotes descartados, invalidando resultados memoizados
+    def setPacketsMargin(self, packetsMargin):
+        self.packetsMargin = packetsMargin
+
+    # altera margem em segundos descartada no início e no fim da captura, invalidando resultados memoizados
+    def setTimeMargin(self, timeMargin):
+        self.timeMargin = timeMargin
+
+    # retorna contadores de acertos e faltas do cache de resultados
+    def getCacheStats(self):
+        return self.statsCache.getCounters()
+
+    # retorna intervalo de índices [start, stop) da captura após as margens de pacotes e de tempo
+    # no modo incremental os limites são conhecidos ao fim de uma passagem pela captura, sem guardar a tabela
+    @cached
+    def getBounds(self):
+        if self.isIncremental():
+            stream = self.getTableStream()
+            for table in stream:
+                pass
+
+            return stream.bounds
+
+        total = len(self.getCaptureTable()) if self.streaming else len(self.packets)
+        margin = self.packetsMargin or 0
+        start = min(margin, total)
+        stop = max(start, total - margin)
+
+        if self.timeMargin and total > 0:
+            timeIndex = self.getTimeIndex()
+            offset = self.timeMargin * 1000
+            start = max(start, int(np.searchsorted(timeIndex, timeIndex[0] + offset, side="left")))
+            stop = max(start, min(stop, int(np.searchsorted(timeIndex, timeIndex[-1] - offset, side="right"))))
+
+        return start, stop
+
     # retorna pacotes, pode excluir os n primeiros e n últimos para evitar viés de borda
+    # a margem é aplicada como janela sobre a captura, sem copiar a lista de pacotes
     def getPackets(self):
-        if self.packetsMargin != None:
-            return self.packets[self.packetsMargin:-self.packetsMargin]
-        else:
-            return self.packets
+        if self.streaming:
+            if self.timeMargin:
+                return PacketStream(self.path, None, *self.getBounds())
+
+            return PacketStream(self.path, self.packetsMargin) # margem aplicada durante a leitura
+        
+        return PacketWindow(self.packets, *self.getBounds())
         
     # retorna pacote específico
     def getPacket(self, pkt):
+        if self.streaming:
+            return next(islice(self.getPackets(), pkt, None), 0)
+
         return self.getPackets()[pkt] if len(self.getPackets()) > 0 else 0
     
     # retorna tempo de captura de pacote em ms
@@ -35,17 +113,127 @@ class PacketAnalyzer():
     def getId(self):
         return self.id
     
+    # retorna tabela colunar da captura completa, extraída uma única vez por captura carregada
+    # no modo streaming os pacotes scapy são descartados após a extração, mantendo apenas as colunas
+    # com o decodificador rápido, scapy só é usado para tipos de enlace não suportados e para pacotes completos (getPacket, getPdfDump)
+    def getCaptureTable(self):
+        if self.captureTable is not None:
+            return self.captureTable
+
+        if self.tableCache is not None:
+            self.captureTable = self.tableCache.load(self.path, self.decoder)
+            if self.captureTable is not None:
+                return self.captureTable
+
+        if self.decoder == "fast" and self.workers is not None and self.workers > 1:
+            self.captureTable = ParallelDecoder(self.path, self.workers).decode()
+
+        if self.captureTable is None and self.decoder == "fast":
+            with PcapDecoder(self.path) as decoder:
+                if decoder.isSupported():
+                    self.captureTable = decoder.decode()
+
+        if self.captureTable is None:
+            self.captureTable = PacketTable.fromPackets(self.packets)
+
+        if self.tableCache is not None:
+            self.tableCache.store(self.path, self.decoder, self.captureTable)
+
+        return self.captureTable
+
+    # reutiliza tabela já decodificada da mesma captura, evitando nova decodificação
+    def setCaptureTable(self, table):
+        self.captureTable = table
+        self.timeIndex = None
+        self.captureVersion += 1
+
+    # retorna índice de tempos não decrescente da captura, usado para cortes por tempo com busca binária
+    def getTimeIndex(self):
+        if self.timeIndex is None:
+            self.timeIndex = np.maximum.accumulate(self.getCaptureTable().time)
+
+        return self.timeIndex
+
+    # modo incremental: no modo streaming, enquanto a tabela da captura não foi carregada (getTable, setCaptureTable),
+    # as métricas de getStreamResults, a tabela de fluxos e o RTT por segmento são calculados lote a lote com TableStream,
+    # com memória proporcional ao lote, ao estado dos agregadores e às amostras, não ao total de pacotes
+    # com cache de tabelas ou workers > 1 a tabela completa é carregada ou decodificada em paralelo, e os métodos que
+    # indexam pacotes (chaves, gráficos por pacote) sempre a carregam
+    def isIncremental(self):
+        return self.streaming and self.captureTable is None and self.tableCache is None and not (self.workers is not None and self.workers > 1)
+
+    # modo paralelo: com o decodificador rápido e workers > 1, sem margens e sem tabela carregada, as métricas de
+    # getStreamResults são calculadas por ParallelPipeline, um trecho da captura por processo
+    def isParallel(self):
+        return (self.decoder == "fast" and self.workers is not None and self.workers > 1 and self.captureTable is None
+                and self.tableCache is None and not self.packetsMargin and not self.timeMargin)
+
+    # verifica se as métricas de getStreamResults substituem o cálculo sobre a tabela
+    def usesStreamResults(self):
+        return self.isIncremental() or self.isParallel()
+
+    # retorna sequência de lotes da janela de análise, lidos da captura a cada iteração
+    def getTableStream(self):
+        return TableStream(self.path, self.decoder, self.packetsMargin, self.timeMargin)
+
+    # percorre a janela de análise uma vez, entregando cada lote às funções updates; fora do modo incremental, entrega a tabela da janela
+    def scanTables(self, *updates):
+        tables = self.getTableStream() if self.isIncremental() else [self.getTable()]
+
+        for table in tables:
+            for update in updates:
+                update(table)
+
+    # retorna etapas (PipelineStage) calculadas juntas em uma passagem no modo incremental; subclasses acrescentam as suas
+    def getStreamStages(self):
+        return [LayerStage()]
+
+    # retorna dicionário nome da etapa -> resultado das etapas de getStreamStages, em uma passagem pela captura
+    # no modo paralelo, se a captura não pode ser dividida com resultados exatos, as etapas percorrem a tabela decodificada em paralelo
+    @cached
+    def getStreamResults(self):
+        if self.isParallel():
+            results = ParallelPipeline(self.path, self.getStreamStages(), self.workers).run()
+            if results is not None:
+                return results
+
+        stages = self.getStreamStages()
+        self.scanTables(*[stage.update for stage in stages])
+
+        for stage in stages:
+            stage.finish()
+
+        return {stage.name: stage.getResult() for stage in stages}
+
+    # retorna tabela colunar dos pacotes dentro das margens, como visão sobre os arrays da captura completa
+    @cached
+    def getTable(self):
+        return self.getCaptureTable().slice(*self.getBounds())
+
     # retorna número total de pacotes
     def getTotalPackets(self):
-        return len(self.getPackets())
+        if self.usesStreamResults():
+            return self.getStreamResults().get("general").get("totalPackets")
+
+        return len(self.getTable())
     
     # retorna total de bytes capturados
+    @cached
     def getTotalBytes(self):
-        return sum(len(pkt) for pkt in self.getPackets()) if self.getTotalPackets() > 0 else 0
+        if self.usesStreamResults():
+            return self.getStreamResults().get("general").get("totalBytes")
+
+        return int(self.getTable().length.sum(dtype=np.int64))
     
     # retorna tempo total de captura em ms
+    @cached
     def getTotalTime(self):
-        return self.getTimeDiff(self.getPackets()[0], self.getPackets()[-1]) if self.getTotalPackets() > 0 else 0
+        if self.usesStreamResults():
+            return self.getStreamResults().get("general").get("totalTime")
+
+        times = self.getTable().time
+
+        return float(times[-1] - times[0]) if len(times) > 0 else 0
     
     # retorna pacotes capturados por segundo
     def getCaptureRate(self):
@@ -61,14 +249,39 @@ class PacketAnalyzer():
 
         return (totalBits/self.getTotalTime())/1000 if self.getTotalTime() > 0 else 0
     
+    # retorna séries de throughput (Mbps) e pacotes por segundo em intervalos de binWidth ms (de 1 ms a 1 min), a partir do primeiro pacote da janela
+    # groupBy: None, "protocol" ou "flow" (5-tupla); com grupos, as séries têm uma linha por grupo, com os maxGroups grupos
+    # de mais bytes e o restante somado em "other"
+    # as séries são somadas lote a lote por ThroughputStage; com grupos, uma passagem anterior soma os bytes por grupo
+    @cached
+    def getThroughputSeries(self, binWidth=1000, groupBy=None, maxGroups=10):
+        if self.getTotalPackets() == 0 or binWidth <= 0:
+            print("There is no way to build throughput series without packets or with a non-positive bin width")
+            return None
+
+        if groupBy not in (None, "protocol", "flow"):
+            print(f"Unknown series grouping: {groupBy}")
+            return None
+
+        totals = None
+        if groupBy is not None:
+            groupBytes = GroupBytesStage(groupBy)
+            self.scanTables(groupBytes.update)
+            totals = groupBytes.getResult()
+
+        series = ThroughputStage(binWidth, groupBy, totals, maxGroups)
+        self.scanTables(series.update)
+
+        return series.getResult()
+
     # retorna lista de camadas e quantidade total encontrada por camada
+    @cached
     def getLayers(self):
-        layers = Counter() 
+        if self.usesStreamResults():
+            general = self.getStreamResults().get("general")
+            return {"layers": general.get("layers"), "nLayers": general.get("nLayers")}
 
-        for pkt in self.getPackets():
-            while pkt:
-                layers[pkt.name] += 1 # incrementa número de camadas
-                pkt = pkt.payload # próxima camada, payload da camada atual
+        layers = self.getTable().getLayers()
 
         nLayers = list(layers.values())
         layers = list(layers.keys())
@@ -76,6 +289,15 @@ class PacketAnalyzer():
         return {"layers": layers,
                 "nLayers": nLayers
                 }
+
+    # retorna tabela de fluxos por 5-tupla dos pacotes da janela de análise, com fluxos expirados por inatividade e FIN/RST
+    # guarda os maxFinished fluxos expirados mais recentes
+    @cached
+    def getFlowTable(self, idleTimeout=60000, closeTimeout=2000, maxFinished=1000000):
+        flowTable = FlowTable(idleTimeout, closeTimeout, maxFinished=maxFinished)
+        self.scanTables(flowTable.updateTable)
+
+        return flowTable
     
     # retorna estatísticas de jitter baseado na variação de dados: lista de jitters, média, desvio padrão, máximo, mínimo, erro padrão e coeficiente de variação
     def getJitterStats(self, data):       
@@ -84,21 +306,14 @@ class PacketAnalyzer():
             return None
         
         jitters = np.abs(np.diff(data)) if len(data) > 0 else []
-        mean = np.mean(jitters) if len(jitters) > 0 else 0
-        std = np.std(jitters) if len(jitters) > 0 else 0
-        max = np.max(jitters) if len(jitters) > 0 else 0
-        min = np.min(jitters) if len(jitters) > 0 else 0
-        error = std/np.sqrt(len(jitters)) if len(jitters) > 0 else 0
-        cv = (std/mean)*100 if mean > 0 else 0
-
-        return {"jitters": jitters,
-                "mean": mean,
-                "std": std,
-                "max": max,
-                "min": min,
-                "error": error,
-                "cv": cv
-                }
+        runningStats = RunningStats().updateBatch(jitters)
+
+        stats = runningStats.getStats()
+        stats["jitters"] = jitters
+        stats["runningStats"] = runningStats # acumulador combinável com o de outras capturas ou partes
+        stats["histogram"] = BinnedHistogram().updateBatch(jitters) # histograma de bins fixos, também combinável
+
+        return stats
     
     # salva visualização gráfica de pacote em pdf
     def getPdfDump(self, filename, pkt):
@@ -134,23 +349,27 @@ class PacketAnalyzer():
         print(f"Layers: {layers}")
         print(f"Throughput: {throughput:.4f} Mbps\n")
 
-    # imprime métricas de RTT
-    def printRttMetrics(self, layer, mean, std, max, min, error, cv):       
+    # imprime métricas de RTT; percentiles: dicionário percentil -> valor estimado por QuantileSketch
+    def printRttMetrics(self, layer, mean, std, max, min, error, cv, percentiles=None):       
         places = self.getDecimalPlaces(error)
         print(f"Mean {layer} RTT: {mean:.{places}f} ms")
         print(f"{layer} RTT standard deviation: {std:.{places}f} ms")
         print(f"Maximum {layer} RTT: {max:.{places}f} ms")
         print(f"Minimum {layer} RTT: {min:.{places}f} ms")
+        for percentile, value in (percentiles or {}).items():
+            print(f"{layer} RTT p{percentile:g}: {value:.{places}f} ms")
         print(f"Standard error: {error:.{places}f} ms")
         print(f"Percentage of standard deviation from the mean: {cv:.2f}%\n")
     
     # imprime métricas de intervalo de chegada entre pacotes
-    def printIntervalMetrics(self, layer, mean, std, max, min, error, cv):
+    def printIntervalMetrics(self, layer, mean, std, max, min, error, cv, percentiles=None):
         places = self.getDecimalPlaces(error)
         print(f"Mean {layer} packets arrival time interval: {mean:.{places}f} ms")
         print(f"Standard deviation of {layer} packets arrival time interval: {std:.{places}f} ms")
         print(f"Maximum {layer} packet arrival time interval: {max:.{places}f} ms")
         print(f"Minimum {layer} request packet arrival time Interval: {min:.{places}f} ms")
+        for percentile, value in (percentiles or {}).items():
+            print(f"{layer} packets arrival time interval p{percentile:g}: {value:.{places}f} ms")
         print(f"Standard error: {error:.{places}f} ms")
         print(f"Percentage of standard deviation from the mean: {cv:.2f}%\n")
 
@@ -182,71 +401,108 @@ class PacketAnalyzer():
         print(f"{layer} loss rate: {lossRate}%\n")
         print("-------------------------------------------------------------------")
 
+    # altera formato (png, svg, pdf) e resolução dos gráficos salvos pelos métodos plot*
+    def setGraphOutput(self, format="png", dpi=300):
+        self.graphFormat = format
+        self.graphDpi = dpi
+
+    # retorna GraphPlotter que desenha na figura Agg do analisador, reutilizada entre gráficos e fora do estado global do pyplot
+    def getGraphPlotter(self, **kwargs):
+        if self.graphFigure is None:
+            self.graphFigure = GraphPlotter.newFigure()
+
+        return GraphPlotter(figure=self.graphFigure, **kwargs)
+
+    # salva gráfico em filename com a extensão do formato configurado
+    def saveGraph(self, graph, filename):
+        graph.saveGraph(f"{filename}.{self.graphFormat}", dpi=self.graphDpi, format=self.graphFormat)
+
+    # desenha histograma a partir de amostras (10 bins no intervalo dos dados) ou de um BinnedHistogram (contagens e bordas fixas)
+    def plotHistogramData(self, graph, data, color):
+        if isinstance(data, BinnedHistogram):
+            graph.plotBinnedHistogram(data.counts, data.edges, color=color, xScale=data.scale)
+        else:
+            graph.plotHistogram(data, color=color)
+
     # plota gráfico de barra para o total de camadas
     def plotLayersGraph(self, path, id, layers, nLayers, title=None, xLabel=None, yLabel=None, legendFlag=True, horizontal=False):
-        layersGraph = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=legendFlag, legendPosition="right")
+        layersGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=legendFlag, legendPosition="right")
         layersGraph.plotBarGraph(layers, nLayers, plotLabel=layers, horizontal=horizontal)
-        layersGraph.saveGraph(path+id+"-layers.png")
+        self.saveGraph(layersGraph, path+id+"-layers")
+
+    # plota série de throughput; com séries por grupo (linhas de throughput), uma curva por grupo
+    def plotThroughputGraph(self, path, id, xAxis, throughput, groups=None, title=None, xLabel=None, yLabel=None):
+        throughputGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendPosition="right")
+        for label, series in zip(groups or ["Throughput"], np.atleast_2d(throughput)):
+            throughputGraph.plotLineGraph(xAxis, series, plotLabel=label, marker=None)
+        self.saveGraph(throughputGraph, path+id+"-throughput")
+
+    # plota série de pacotes por segundo; com séries por grupo, uma curva por grupo
+    def plotPacketRateGraph(self, path, id, xAxis, packetRate, groups=None, title=None, xLabel=None, yLabel=None):
+        packetRateGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendPosition="right")
+        for label, series in zip(groups or ["Packet rate"], np.atleast_2d(packetRate)):
+            packetRateGraph.plotLineGraph(xAxis, series, plotLabel=label, marker=None)
+        self.saveGraph(packetRateGraph, path+id+"-packet-rate")
 
     # plota gráfico de rtt 
     def plotRttGraph(self, path, id, xAxis, rtts, title=None, xLabel=None, yLabel=None):
-        rttGraph = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
+        rttGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
         rttGraph.plotLineGraph(xAxis, rtts, color="blue", plotLabel="Round Trip Time", marker=None, autoScaleY=True)
-        rttGraph.saveGraph(path+id+"-rtt.png")
+        self.saveGraph(rttGraph, path+id+"-rtt")
 
     # plota gráfico de intervalos de chegada entre pacotes
     def plotIntervalGraph(self, path, id, xAxis, intervals, title=None, xLabel=None, yLabel=None):
-        intervalGraph = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
+        intervalGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
         intervalGraph.plotLineGraph(xAxis, intervals, color="yellow", plotLabel="Packets arrival time interval", marker=None)
-        intervalGraph.saveGraph(path+id+"-interval.png")
+        self.saveGraph(intervalGraph, path+id+"-interval")
 
     # plota gráfico de jitter baseado em rtt
     def plotRttJitterGraph(self, path, id, xAxis, jitters, title=None, xLabel=None, yLabel=None):
-        rttJitterGraph = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
+        rttJitterGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
         rttJitterGraph.plotLineGraph(xAxis, jitters, color="red", plotLabel="RTT based Jitter", marker=None)
-        rttJitterGraph.saveGraph(path+id+"-rtt-jitter.png")
+        self.saveGraph(rttJitterGraph, path+id+"-rtt-jitter")
 
     # plota gráfico de jitter baseado em intervalo de chegada
     def plotIntervalJitterGraph(self, path, id, xAxis, jitters, title=None, xLabel=None, yLabel=None):       
-        intervalJitterGraph = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
+        intervalJitterGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel)
         intervalJitterGraph.plotLineGraph(xAxis, jitters, color="orange", plotLabel="Arrival time interval based Jitter", marker=None)
-        intervalJitterGraph.saveGraph(path+id+"-interval-jitter.png")
+        self.saveGraph(intervalJitterGraph, path+id+"-interval-jitter")
 
-    # plota histograma de rtt
+    # plota histograma de rtt; rtts: amostras ou BinnedHistogram, como nos demais histogramas
     def plotRttHistogram(self, path, id, rtts, title=None, xLabel=None, yLabel=None):        
-        rttHistogram = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
-        rttHistogram.plotHistogram(rtts, color="blue")
-        rttHistogram.saveGraph(path+id+"-rtt-histogram.png")
+        rttHistogram = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
+        self.plotHistogramData(rttHistogram, rtts, "blue")
+        self.saveGraph(rttHistogram, path+id+"-rtt-histogram")
     
     # plota histograma de intervalos de chegada
     def plotIntervalHistogram(self, path, id, intervals, title=None, xLabel=None, yLabel=None):       
-        intervalHistogram = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
-        intervalHistogram.plotHistogram(intervals, color="yellow")
-        intervalHistogram.saveGraph(path+id+"-interval-histogram.png")
+        intervalHistogram = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
+        self.plotHistogramData(intervalHistogram, intervals, "yellow")
+        self.saveGraph(intervalHistogram, path+id+"-interval-histogram")
 
     # plota histograma de jitter baseado em rtt
     def plotRttJitterHistogram(self, path, id, jitters, title=None, xLabel=None, yLabel=None):
-        jitterHistogram = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
-        jitterHistogram.plotHistogram(jitters, color="red")
-        jitterHistogram.saveGraph(path+id+"-rtt-jitter-histogram.png")
+        jitterHistogram = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
+        self.plotHistogramData(jitterHistogram, jitters, "red")
+        self.saveGraph(jitterHistogram, path+id+"-rtt-jitter-histogram")
 
     # plota histogram de jitter baseado em intervalo de chegada
     def plotIntervalJitterHistogram(self, path, id, jitters, title=None, xLabel=None, yLabel=None):
-        jitterHistogram = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
-        jitterHistogram.plotHistogram(jitters, color="orange")
-        jitterHistogram.saveGraph(path+id+"-interval-jitter-histogram.png")
+        jitterHistogram = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendFlag=False)
+        self.plotHistogramData(jitterHistogram, jitters, "orange")
+        self.saveGraph(jitterHistogram, path+id+"-interval-jitter-histogram")
     
     # plota gráfico de perda de pacotes
     def plotLossGraph(self, path, id, lossStats, title=None, xLabel=None, yLabel=None):       
-        lossGraph = GraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendPosition="right")
+        lossGraph = self.getGraphPlotter(title=title, xLabel=xLabel, yLabel=yLabel, legendPosition="right")
         lossGraph.plotBarGraph(["sent", "received", "lost"], lossStats, ["gray", "green", "red"], ["Sent Packets", "Received Packets", "Lost Packets"])
-        lossGraph.saveGraph(path+id+"-loss.png")
+        self.saveGraph(lossGraph, path+id+"-loss")
 
     # plota gráfico de porcentagem de perda de pacotes
     def plotLossRateGraph(self, path, id, lossRate):       
-        lossRateGraph = GraphPlotter()
+        lossRateGraph = self.getGraphPlotter()
         lossRateGraph.plotPizzaGraph(["received packets", "lost packets"], [100-lossRate, lossRate], ["green", "red"])
-        lossRateGraph.saveGraph(path+id+"-loss-rate.png")
+        self.saveGraph(lossRateGraph, path+id+"-loss-rate")
 
 
 
@@ -0,0 +1,29 @@
+from scapy.all import PcapReader
+from collections import deque
+from itertools import islice
+
+# sequência re-iterável de pacotes lidos sob demanda com PcapReader, sem carregar a captura inteira em memória
+# cada iteração é uma passagem pelo arquivo; a margem descarta os n primeiros e n últimos pacotes
+# usando um buffer de look-ahead de n pacotes, no lugar de fatiar a lista completa
+# start e stop restringem a leitura a um intervalo de índices conhecido
+class PacketStream():
+    def __init__(self, path, packetsMargin=None, start=0, stop=None):
+        self.path = path
+        self.packetsMargin = packetsMargin
+        self.start = start
+        self.stop = stop
+
+        PcapReader(path).close() # valida caminho da captura antes da primeira passagem
+
+    def __iter__(self):
+        margin = self.packetsMargin or 0
+        buffer = deque() # look-ahead: pacote só é entregue quando há n pacotes depois dele
+
+        with PcapReader(self.path) as reader:
+            for i, pkt in enumerate(islice(reader, self.start, self.stop)):
+                if i < margin:
+                    continue
+
+                buffer.append(pkt)
+                if len(buffer) > margin:
+                    yield buffer.popleft()
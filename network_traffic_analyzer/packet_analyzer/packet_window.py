@@ -0,0 +1,30 @@
+# janela sobre a lista de pacotes da captura: intervalo de índices [start, stop) sem cópia dos pacotes
+# tamanho, indexação e iteração custam O(1) de preparação e não alocam novas listas
+class PacketWindow():
+    def __init__(self, packets, start=0, stop=None):
+        self.items = getattr(packets, "res", packets) # lista interna do PacketList do scapy
+        stop = len(self.items) if stop is None else stop
+        self.start = max(0, min(start, len(self.items)))
+        self.stop = max(self.start, min(stop, len(self.items)))
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        return map(self.items.__getitem__, range(self.start, self.stop))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self.items[self.start + i] for i in range(start, stop, step)]
+
+            return PacketWindow(self.items, self.start + start, self.start + max(start, stop))
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("packet index out of window")
+
+        return self.items[self.start + index]
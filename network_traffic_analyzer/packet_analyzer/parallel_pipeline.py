@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor
+import tempfile
+import os
+import numpy as np
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import COLUMNS
+from network_traffic_analyzer.pcap_decoder import PcapDecoder
+
+# retorna caminho do arquivo com as linhas da etapa stage, do trecho chunk, na partição partition
+def getPartitionPath(directory, stage, chunk, partition):
+    return os.path.join(directory, f"{stage}-{chunk}-{partition}.npz")
+
+# primeira fase, em um processo de trabalho: decodifica os registros que começam na região [start, stop) do arquivo,
+# atualiza as etapas "chunk" e grava as linhas das etapas "partition" em um arquivo por partição
+# retorna as etapas "chunk", a posição do registro seguinte e os tempos usados para conferir e costurar os trechos
+def analyzeChunk(path, start, stop, chunk, stages, partitions, directory):
+    with PcapDecoder(path) as decoder:
+        records = decoder.getRecords(start, stop)
+        table = decoder.decode(records)
+
+    time = table.time
+    summary = {"end": records["end"],
+               "rows": len(table),
+               "monotonic": bool(np.all(np.diff(time) >= 0)),
+               "firstTime": float(time[0]) if len(table) > 0 else None,
+               "lastTime": float(time[-1]) if len(table) > 0 else None,
+               "stageTimes": {} # etapa "partition" -> tempo da sua última linha no trecho
+               }
+
+    for i, stage in enumerate(stages):
+        if stage.parallel == "chunk":
+            stage.update(table)
+            continue
+
+        rows, keys = stage.getPartitionKeys(table)
+        ids = keys % np.uint64(partitions)
+        previous = np.concatenate(([np.nan], time[rows[:-1]])) if len(rows) > 0 else np.array([]) # nan: linha anterior em outro trecho
+        summary["stageTimes"][i] = float(time[rows[-1]]) if len(rows) > 0 else None
+
+        for partition in range(partitions):
+            selected = ids == partition
+            part = rows[selected]
+            np.savez(getPartitionPath(directory, i, chunk, partition), index=part, previous=previous[selected],
+                     **{name: table.columns[name][part] for name in COLUMNS})
+
+    return [stage if stage.parallel == "chunk" else None for stage in stages], summary
+
+# segunda fase, em um processo de trabalho: junta as linhas da partição de todos os trechos em ordem de captura e atualiza a etapa
+# offsets: índice da primeira linha de cada trecho na captura; carried: tempo da última linha da etapa antes de cada trecho
+def analyzePartition(directory, index, partition, stage, offsets, carried, lastTime):
+    parts = []
+    for chunk, (offset, before) in enumerate(zip(offsets, carried)):
+        with np.load(getPartitionPath(directory, index, chunk, partition)) as data:
+            part = {name: data[name] for name in data.files}
+
+        part["index"] = part["index"] + offset
+        part["previous"] = np.where(np.isnan(part["previous"]), before, part["previous"])
+        parts.append(part)
+
+    columns = {name: np.concatenate([part[name] for part in parts]).astype(dtype, copy=False) for name, dtype in COLUMNS.items()}
+    stage.updatePartition(PacketTable(columns, []), np.concatenate([part["index"] for part in parts]),
+                          np.concatenate([part["previous"] for part in parts]))
+    stage.finishPartition(lastTime)
+
+    return stage
+
+# análise paralela de uma captura grande com o decodificador rápido, com resultados idênticos aos das etapas em série
+# a captura é dividida em regiões de bytes pelos cabeçalhos de registro; cada processo decodifica uma região e atualiza as
+# etapas "chunk" (totais, camadas, intervalos), combinadas depois em ordem de captura com merge
+# as etapas que associam pacotes de um fluxo (handshakes, retransmissões, echoes) são divididas por fluxo: as linhas de
+# cada partição de fluxos, de todos os trechos, são processadas em ordem por um processo, então fluxos que cruzam as
+# divisões são vistos inteiros; a expiração por timeout recebe o tempo do pacote anterior da etapa na captura inteira
+# a equivalência com a passagem em série vale para tempos não decrescentes; caso contrário, ou com etapas que não podem
+# ser divididas, run retorna None e a análise deve ser feita em série
+class ParallelPipeline():
+    def __init__(self, path, stages, workers=None, partitions=None):
+        self.path = path
+        self.stages = stages # etapas com parallel "chunk" ou "partition", com nomes distintos
+        self.workers = workers or os.cpu_count() # processos de trabalho e trechos da captura
+        self.partitions = partitions or self.workers # partições de fluxos
+
+    # retorna dicionário nome da etapa -> resultado, ou None se a captura não pode ser analisada em paralelo com resultados exatos
+    def run(self):
+        if any(stage.parallel not in ("chunk", "partition") for stage in self.stages):
+            return None
+
+        with PcapDecoder(self.path) as decoder:
+            if not decoder.isSupported():
+                return None
+            bounds = decoder.getChunkBounds(self.workers)
+
+        if len(bounds) <= 1:
+            return None
+
+        with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(analyzeChunk, self.path, start, stop, chunk, self.stages, self.partitions, directory)
+                       for chunk, (start, stop) in enumerate(bounds)]
+            chunks = [future.result() for future in futures]
+            summaries = [summary for _, summary in chunks]
+
+            if not self.isExact(bounds, summaries):
+                return None
+
+            offsets = np.cumsum([0] + [summary["rows"] for summary in summaries[:-1]]).tolist()
+            futures = {}
+            for i, stage in enumerate(self.stages):
+                if stage.parallel == "partition":
+                    carried, lastTime = self.getStageTimes(summaries, i)
+                    futures[i] = [executor.submit(analyzePartition, directory, i, partition, stage, offsets, carried, lastTime)
+                                  for partition in range(self.partitions)]
+
+            merged = []
+            for i, stage in enumerate(self.stages):
+                parts = [future.result() for future in futures[i]] if i in futures else [chunkStages[i] for chunkStages, _ in chunks]
+                for part in parts[1:]:
+                    parts[0].merge(part)
+                merged.append(parts[0])
+
+        for stage in merged:
+            stage.finish()
+
+        return {stage.name: stage.getResult() for stage in merged}
+
+    # verifica que os trechos cobrem a captura sem lacunas e que os tempos são não decrescentes, dentro e entre trechos
+    @staticmethod
+    def isExact(bounds, summaries):
+        if any(summary["end"] != start for summary, (start, _) in zip(summaries, bounds[1:])):
+            return False
+
+        if not all(summary["monotonic"] for summary in summaries):
+            return False
+
+        lastTime = -np.inf
+        for summary in summaries:
+            if summary["rows"] > 0:
+                if summary["firstTime"] < lastTime:
+                    return False
+                lastTime = summary["lastTime"]
+
+        return True
+
+    # retorna tempo da última linha da etapa antes de cada trecho (-inf se não há) e na captura inteira
+    @staticmethod
+    def getStageTimes(summaries, index):
+        carried = []
+        lastTime = -np.inf
+
+        for summary in summaries:
+            carried.append(lastTime)
+            stageTime = summary["stageTimes"][index]
+            lastTime = stageTime if stageTime is not None else lastTime
+
+        return carried, lastTime
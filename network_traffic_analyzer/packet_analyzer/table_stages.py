@@ -0,0 +1,253 @@
+from collections import Counter
+import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import ECHO_REQUEST, FLAG_SYN, PROTO_NAMES
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+from network_traffic_analyzer.running_stats import RunningStats
+
+# retorna estatísticas de amostras (RTTs, intervalos, jitters) no mesmo formato de get*Stats dos analisadores
+def getSampleStats(samples, key):
+    runningStats = RunningStats().updateBatch(samples)
+
+    stats = runningStats.getStats()
+    stats[key] = samples
+    stats["runningStats"] = runningStats
+    stats["sketch"] = QuantileSketch().updateBatch(samples)
+    stats["percentiles"] = stats["sketch"].getPercentiles()
+    stats["histogram"] = BinnedHistogram().updateBatch(samples)
+
+    return stats
+
+# retorna chave uint64 espalhada a partir de colunas inteiras, usada para dividir linhas em partições
+def hashKeys(*columns):
+    keys = np.zeros(len(columns[0]), dtype=np.uint64)
+    for column in columns:
+        keys = (keys ^ column.astype(np.uint64)) * np.uint64(0x9E3779B97F4A7C15)
+
+    return keys >> np.uint64(32)
+
+# etapa agregadora (CapturePipeline, modo streaming dos analisadores): recebe as tabelas colunares da captura em ordem, uma por lote
+# em ParallelPipeline, etapas "chunk" processam trechos da captura em paralelo e são combinadas em ordem com merge;
+# etapas "partition" recebem, por partição, todas as linhas dos fluxos da partição em ordem de captura
+class PipelineStage():
+    name = None # chave do resultado da etapa
+    parallel = None # "chunk", "partition" ou None quando a etapa não pode ser dividida
+
+    # processa um lote da captura
+    def update(self, table):
+        pass
+
+    # chamado após o último lote
+    def finish(self):
+        pass
+
+    # retorna resultado da etapa
+    def getResult(self):
+        pass
+
+    # combina nesta a etapa do trecho seguinte da captura ou de outra partição
+    def merge(self, other):
+        pass
+
+    # retorna índices das linhas usadas pela etapa e chave de partição de cada uma; linhas com a mesma chave ficam na mesma partição
+    def getPartitionKeys(self, table):
+        pass
+
+    # processa as linhas de uma partição em ordem de captura; index: índice de cada linha na captura, previous: tempo da
+    # linha anterior da etapa na captura inteira (-inf na primeira), para expirar estado como na passagem em série
+    def updatePartition(self, table, index, previous):
+        pass
+
+    # chamado após a última linha da partição; lastTime: tempo da última linha da etapa na captura inteira
+    def finishPartition(self, lastTime):
+        pass
+
+# métricas gerais: pacotes, bytes, duração, throughput e camadas
+class LayerStage(PipelineStage):
+    name = "general"
+    parallel = "chunk"
+
+    def __init__(self):
+        self.totalPackets = 0
+        self.totalBytes = 0
+        self.firstTime = None
+        self.lastTime = None
+        self.layers = Counter() # camadas na ordem em que aparecem pela primeira vez
+
+    # override
+    def update(self, table):
+        if len(table) == 0:
+            return
+
+        self.totalPackets += len(table)
+        self.totalBytes += int(table.length.sum(dtype=np.int64))
+        self.firstTime = float(table.time[0]) if self.firstTime is None else self.firstTime
+        self.lastTime = float(table.time[-1])
+        self.layers.update(table.getLayers())
+
+    # override
+    def merge(self, other):
+        if other.totalPackets == 0:
+            return
+
+        self.totalPackets += other.totalPackets
+        self.totalBytes += other.totalBytes
+        self.firstTime = other.firstTime if self.firstTime is None else self.firstTime
+        self.lastTime = other.lastTime
+        self.layers.update(other.layers)
+
+    # override
+    def getResult(self):
+        totalTime = self.lastTime - self.firstTime if self.totalPackets > 0 else 0
+
+        return {"totalPackets": self.totalPackets,
+                "totalBytes": self.totalBytes,
+                "totalTime": totalTime,
+                "throughput": (self.totalBytes * 8 / totalTime) / 1000 if totalTime > 0 else 0,
+                "layers": list(self.layers.keys()),
+                "nLayers": list(self.layers.values())
+                }
+
+# retorna chaves distintas dos grupos (protocolo ou 5-tupla) de uma tabela, em ordem crescente, e índice da chave de cada pacote
+def getGroupKeys(table, groupBy):
+    if groupBy == "protocol":
+        keys, inverse = np.unique(table.proto, return_inverse=True)
+        return keys.tolist(), inverse.ravel()
+
+    keys, inverse = np.unique(np.column_stack((table.src, table.dst, table.sport, table.dport, table.proto)).astype(np.int64),
+                              axis=0, return_inverse=True)
+
+    return [tuple(key) for key in keys.tolist()], inverse.ravel()
+
+# retorna nome do grupo de uma chave de getGroupKeys
+def getGroupName(key, groupBy):
+    if groupBy == "protocol":
+        return PROTO_NAMES.get(key, str(key)) if key >= 0 else "non-IP"
+
+    src, dst, sport, dport, proto = key
+
+    return f"{PacketTable.intToIp(src)}:{sport} -> {PacketTable.intToIp(dst)}:{dport} ({PROTO_NAMES.get(proto, str(proto))})"
+
+# bytes por grupo de pacotes (protocolo ou fluxo), somados lote a lote; primeira passagem das séries de throughput por grupo
+class GroupBytesStage(PipelineStage):
+    name = "groupBytes"
+
+    def __init__(self, groupBy="protocol"):
+        self.groupBy = groupBy # "protocol" ou "flow" (5-tupla)
+        self.totals = {} # chave do grupo -> bytes
+
+    # override
+    def update(self, table):
+        if len(table) == 0:
+            return
+
+        keys, inverse = getGroupKeys(table, self.groupBy)
+        for key, total in zip(keys, np.bincount(inverse, weights=table.length, minlength=len(keys)).tolist()):
+            self.totals[key] = self.totals.get(key, 0) + total
+
+    # override
+    def getResult(self):
+        return self.totals
+
+# séries de throughput (Mbps) e pacotes por segundo em intervalos de binWidth ms a partir do primeiro pacote, somadas
+# lote a lote em um acumulador por intervalo; pacotes com tempo anterior ao primeiro (fora de ordem) entram no primeiro intervalo
+# com groupBy ("protocol" ou "flow"), totals traz os bytes por grupo de GroupBytesStage: as séries têm uma linha por grupo,
+# com os maxGroups grupos de mais bytes e o restante somado em "other"
+class ThroughputStage(PipelineStage):
+    name = "throughput"
+
+    def __init__(self, binWidth=1000, groupBy=None, totals=None, maxGroups=10):
+        self.binWidth = binWidth
+        self.groupBy = groupBy
+        self.origin = None # tempo do primeiro pacote, início do primeiro intervalo
+        self.ranks = {} # chave do grupo -> linha das séries
+        self.groups = None # nomes das linhas, None sem grupos
+
+        if groupBy is not None:
+            keys = sorted(totals)
+            order = np.argsort(-np.array([totals[key] for key in keys], dtype=np.float64), kind="stable")[:maxGroups].tolist()
+            self.ranks = {keys[i]: rank for rank, i in enumerate(order)}
+            self.groups = [getGroupName(keys[i], groupBy) for i in order] + (["other"] if len(keys) > len(order) else [])
+
+        nGroups = len(self.groups) if self.groups is not None else 1
+        self.bytes = np.zeros((nGroups, 0))
+        self.packets = np.zeros((nGroups, 0), dtype=np.int64)
+
+    # override
+    def update(self, table):
+        if len(table) == 0:
+            return
+
+        self.origin = float(table.time[0]) if self.origin is None else self.origin
+        bins = np.maximum((table.time - self.origin) // self.binWidth, 0).astype(np.int64)
+        nGroups = self.bytes.shape[0]
+        nBins = max(int(bins.max()) + 1, self.bytes.shape[1])
+        index = bins
+
+        if self.groupBy is not None:
+            keys, inverse = getGroupKeys(table, self.groupBy)
+            groupIds = np.array([self.ranks.get(key, len(self.ranks)) for key in keys], dtype=np.int64)[inverse]
+            index = groupIds * nBins + bins
+
+        padding = ((0, 0), (0, nBins - self.bytes.shape[1]))
+        self.bytes = np.pad(self.bytes, padding) + np.bincount(index, weights=table.length, minlength=nGroups * nBins).reshape(nGroups, nBins)
+        self.packets = np.pad(self.packets, padding) + np.bincount(index, minlength=nGroups * nBins).reshape(nGroups, nBins)
+
+    # override
+    def getResult(self):
+        seconds = self.binWidth / 1000
+        nBytes, nPackets = (self.bytes, self.packets) if self.groups is not None else (self.bytes[0], self.packets[0])
+
+        return {"times": np.arange(self.bytes.shape[1]) * self.binWidth,
+                "throughput": nBytes * 8 / seconds / 1000000,
+                "packetRate": nPackets / seconds,
+                "groups": self.groups
+                }
+
+# intervalos de chegada entre SYNs (TCP) ou entre echo requests (ICMP), contínuos entre lotes
+class IntervalStage(PipelineStage):
+    parallel = "chunk"
+
+    def __init__(self, protocol="TCP"):
+        self.protocol = protocol # "TCP" ou "ICMP"
+        self.name = protocol.lower() + "Interval"
+        self.firstTime = None # tempo do primeiro pacote medido
+        self.lastTime = None # tempo do último pacote do lote anterior
+        self.intervals = [] # intervalos de cada lote
+
+    # retorna máscara dos pacotes cujos intervalos são medidos
+    def getMask(self, table):
+        if self.protocol == "TCP":
+            return table.getTcpMask() & (table.flags == FLAG_SYN)
+
+        return table.getIcmpMask() & (table.icmpType == ECHO_REQUEST)
+
+    # override
+    def update(self, table):
+        times = table.time[self.getMask(table)]
+        if len(times) == 0:
+            return
+
+        self.firstTime = times[0] if self.firstTime is None else self.firstTime
+        if self.lastTime is not None:
+            times = np.concatenate(([self.lastTime], times))
+        self.intervals.append(np.diff(times))
+        self.lastTime = times[-1]
+
+    # override
+    def merge(self, other):
+        if other.firstTime is None:
+            return
+
+        if self.lastTime is not None:
+            self.intervals.append(np.diff([self.lastTime, other.firstTime])) # intervalo entre os dois trechos
+        self.intervals += other.intervals
+        self.firstTime = other.firstTime if self.firstTime is None else self.firstTime
+        self.lastTime = other.lastTime
+
+    # override
+    def getResult(self):
+        intervals = np.concatenate(self.intervals) if self.intervals else np.array([])
+
+        return getSampleStats(intervals, "intervals")
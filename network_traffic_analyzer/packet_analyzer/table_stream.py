@@ -0,0 +1,103 @@
+from scapy.all import PcapReader
+from collections import deque
+from itertools import islice
+import numpy as np
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.pcap_decoder import PcapDecoder
+from network_traffic_analyzer.pcap_decoder.pcap_decoder import GLOBAL_HEADER_LEN
+
+# sequência de tabelas colunares (PacketTable) da captura lidas lote a lote, sem montar a tabela da captura completa
+# cada iteração é uma nova passagem pelo arquivo: com decoder="fast" os registros são decodificados em regiões de
+# batchBytes bytes, nos demais casos (e em enlaces não suportados) os pacotes são lidos com PcapReader em lotes de batchPackets
+# as margens de pacotes e de tempo são as mesmas de PacketAnalyzer.getBounds: o início é descartado durante a leitura
+# e as linhas a menos de packetsMargin pacotes ou timeMargin segundos do fim já lido ficam retidas até serem liberadas
+class TableStream():
+    def __init__(self, path, decoder="scapy", packetsMargin=None, timeMargin=None, batchBytes=8 * 1024 * 1024, batchPackets=4096):
+        self.path = path
+        self.decoder = decoder
+        self.packetsMargin = packetsMargin
+        self.timeMargin = timeMargin
+        self.batchBytes = batchBytes
+        self.batchPackets = batchPackets
+        self.bounds = None # intervalo [start, stop) de índices da janela na captura, conhecido ao fim de uma passagem
+
+    # retorna lotes da captura completa, sem margens
+    def getBatches(self):
+        if self.decoder == "fast":
+            with PcapDecoder(self.path) as decoder:
+                if decoder.isSupported():
+                    size = len(decoder.map)
+                    start = GLOBAL_HEADER_LEN
+                    while start < size:
+                        records = decoder.getRecords(start, start + self.batchBytes)
+                        if len(records["offsets"]) == 0: # registro truncado no fim do arquivo
+                            break
+
+                        yield decoder.decode(records)
+                        start = records["end"]
+                    return
+
+        with PcapReader(self.path) as reader:
+            while True:
+                packets = list(islice(reader, self.batchPackets))
+                if not packets:
+                    break
+
+                yield PacketTable.fromPackets(packets)
+
+    # percorre a janela de análise, um lote por vez
+    def __iter__(self):
+        margin = self.packetsMargin or 0
+        offset = self.timeMargin * 1000 if self.timeMargin else None
+        held = deque() # (tabela, tempos acumulados pelo máximo, índice da primeira linha) ainda não liberados
+        read = 0 # linhas lidas
+        start = 0 # linhas descartadas no início
+        released = 0
+        first = None # tempo do primeiro pacote
+        last = -np.inf # maior tempo lido
+
+        for table in self.getBatches():
+            if len(table) == 0:
+                continue
+
+            times = np.maximum.accumulate(np.maximum(table.time, last))
+            first = float(table.time[0]) if first is None else first
+            last = times[-1]
+            cut = 0
+
+            if start == read: # nenhuma linha passou do início ainda
+                cut = max(margin - read, 0)
+                if offset is not None:
+                    cut = max(cut, int(np.searchsorted(times, first + offset, side="left")))
+                cut = min(cut, len(table))
+                start += cut
+
+            if cut < len(table):
+                held.append((table.slice(cut, len(table)), times[cut:], read + cut))
+            read += len(table)
+
+            for batch in self.release(held, read - margin, last - offset if offset is not None else None):
+                released += len(batch)
+                yield batch
+
+        self.bounds = (start, start + released) # linhas ainda retidas estão na margem final
+
+    # libera, em ordem, as linhas retidas com índice menor que stop e tempo acumulado até maxTime
+    @staticmethod
+    def release(held, stop, maxTime):
+        while held:
+            table, times, index = held[0]
+            count = min(len(table), stop - index)
+            if maxTime is not None:
+                count = min(count, int(np.searchsorted(times, maxTime, side="right")))
+
+            if count <= 0:
+                return
+
+            if count < len(table):
+                held[0] = (table.slice(count, len(table)), times[count:], index + count)
+                yield table.slice(0, count)
+                return
+
+            held.popleft()
+            yield table
@@ -0,0 +1 @@
+from .packet_table import PacketTable
\ No newline at end of file
@@ -0,0 +1,201 @@
+from scapy.all import IP, TCP, UDP, ICMP
+from array import array
+from collections import Counter
+import numpy as np
+import socket
+
+# colunas da tabela e tipos NumPy correspondentes
+COLUMNS = {
+    "time": np.float64, # tempo de captura em ms
+    "length": np.uint32, # tamanho do pacote em bytes
+    "src": np.uint32, # IPv4 de origem
+    "dst": np.uint32, # IPv4 de destino
+    "proto": np.int16, # número do protocolo IP, -1 quando não há camada de transporte conhecida
+    "sport": np.uint16, # porta de origem TCP/UDP
+    "dport": np.uint16, # porta de destino TCP/UDP
+    "seq": np.uint32, # número de sequência TCP
+    "ack": np.uint32, # número de ACK TCP
+    "flags": np.uint16, # flags TCP
+    "payloadLen": np.uint32, # bytes de dados do segmento TCP
+    "icmpType": np.uint8, # tipo ICMP
+    "icmpId": np.uint16, # id ICMP
+    "icmpSeq": np.uint16, # número de sequência ICMP
+    "layerId": np.int32 # índice da assinatura de camadas do pacote
+}
+
+# códigos de protocolo IP
+PROTO_ICMP = 1
+PROTO_TCP = 6
+PROTO_UDP = 17
+
+# nomes dos protocolos de transporte; demais protocolos IP usam o número como nome
+PROTO_NAMES = {PROTO_TCP: "TCP", PROTO_UDP: "UDP", PROTO_ICMP: "ICMP"}
+
+# valores de flags TCP
+FLAG_FIN = 0x01
+FLAG_SYN = 0x02
+FLAG_RST = 0x04
+FLAG_PSH = 0x08
+FLAG_ACK = 0x10
+FLAG_URG = 0x20
+
+# tipos ICMP de echo
+ECHO_REPLY = 0
+ECHO_REQUEST = 8
+
+# tabela colunar de pacotes: campos de cabeçalho decodificados uma única vez em arrays NumPy
+class PacketTable():
+    def __init__(self, columns, layerSignatures):
+        self.columns = columns # dicionário nome da coluna -> array NumPy
+        self.layerSignatures = layerSignatures # lista de tuplas com nomes de camadas, indexada por layerId
+
+    def __len__(self):
+        return len(self.columns["time"])
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get("columns")
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    # retorna tabela com as linhas [start:stop], compartilhando os arrays originais
+    def slice(self, start=None, stop=None):
+        return PacketTable({name: column[start:stop] for name, column in self.columns.items()}, self.layerSignatures)
+
+    # concatena tabelas em ordem, unificando as assinaturas de camadas
+    @classmethod
+    def concatenate(cls, tables):
+        signatures = {}
+        parts = {name: [] for name in COLUMNS}
+
+        for table in tables:
+            remap = np.array([signatures.setdefault(signature, len(signatures)) for signature in table.layerSignatures], dtype=np.int32)
+            for name in COLUMNS:
+                column = table.columns[name]
+                parts[name].append(remap[column] if name == "layerId" else column)
+
+        columns = {name: np.concatenate(parts[name]).astype(dtype, copy=False) if parts[name] else np.array([], dtype=dtype)
+                   for name, dtype in COLUMNS.items()}
+
+        return cls(columns, list(signatures.keys()))
+
+    # constrói tabela a partir de uma sequência de pacotes scapy em uma única passagem
+    @classmethod
+    def fromPackets(cls, packets):
+        buffers = {name: array(np.dtype(dtype).char) for name, dtype in COLUMNS.items()} # arrays compactos durante a leitura
+        signatures = {}
+
+        for pkt in packets:
+            row = cls.decodePacket(pkt, signatures)
+            for name, value in row.items():
+                buffers[name].append(value)
+
+        columns = {name: np.frombuffer(buffers[name], dtype=dtype) if len(buffers[name]) > 0 else np.array([], dtype=dtype)
+                   for name, dtype in COLUMNS.items()}
+
+        return cls(columns, list(signatures.keys()))
+
+    # extrai campos de cabeçalho de um pacote scapy
+    @staticmethod
+    def decodePacket(pkt, signatures):
+        row = dict.fromkeys(COLUMNS, 0)
+        row["time"] = float(pkt.time*1000)
+        row["length"] = len(pkt)
+        row["proto"] = -1
+
+        ip = pkt.getlayer(IP)
+        if ip is not None:
+            row["src"] = PacketTable.ipToInt(ip.src)
+            row["dst"] = PacketTable.ipToInt(ip.dst)
+            row["proto"] = ip.proto
+
+        if TCP in pkt:
+            tcp = pkt[TCP]
+            row["proto"] = PROTO_TCP
+            row["sport"] = tcp.sport
+            row["dport"] = tcp.dport
+            row["seq"] = tcp.seq
+            row["ack"] = tcp.ack
+            row["flags"] = int(tcp.flags)
+            row["payloadLen"] = max(0, ip.len - ip.ihl*4 - tcp.dataofs*4) if ip is not None else len(tcp.payload)
+
+        elif UDP in pkt:
+            row["proto"] = PROTO_UDP
+            row["sport"] = pkt[UDP].sport
+            row["dport"] = pkt[UDP].dport
+
+        elif ICMP in pkt:
+            row["proto"] = PROTO_ICMP
+            row["icmpType"] = pkt[ICMP].type
+            row["icmpId"] = pkt[ICMP].id or 0
+            row["icmpSeq"] = pkt[ICMP].seq or 0
+
+        names = []
+        layer = pkt
+        while layer:
+            names.append(layer.name)
+            layer = layer.payload
+        row["layerId"] = signatures.setdefault(tuple(names), len(signatures))
+
+        return row
+
+    # converte IPv4 textual para inteiro de 32 bits
+    @staticmethod
+    def ipToInt(ip):
+        return int.from_bytes(socket.inet_aton(ip), "big")
+
+    # converte inteiro de 32 bits para IPv4 textual
+    @staticmethod
+    def intToIp(value):
+        return socket.inet_ntoa(int(value).to_bytes(4, "big"))
+
+    # retorna máscara de pacotes TCP
+    def getTcpMask(self):
+        return self.proto == PROTO_TCP
+
+    # retorna máscara de pacotes ICMP
+    def getIcmpMask(self):
+        return self.proto == PROTO_ICMP
+
+    # retorna contagem de camadas na ordem em que aparecem pela primeira vez na captura
+    def getLayers(self):
+        layers = Counter()
+        if len(self) == 0:
+            return layers
+
+        counts = np.bincount(self.layerId, minlength=len(self.layerSignatures))
+        ids, first = np.unique(self.layerId, return_index=True)
+        for layerId in ids[np.argsort(first)]:
+            for name in self.layerSignatures[layerId]:
+                layers[name] += int(counts[layerId])
+
+        return layers
+
+    # associa cada resposta à última requisição anterior com a mesma chave
+    # keys: arrays (n, k) de chaves; positions: índices dos pacotes na tabela
+    # retorna índices das respostas associadas e das requisições correspondentes, em ordem de captura das respostas
+    @staticmethod
+    def matchPrevious(requestKeys, requestPositions, replyKeys, replyPositions):
+        nRequests = len(requestPositions)
+        if nRequests == 0 or len(replyPositions) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+        keys = np.concatenate((requestKeys, replyKeys)).astype(np.int64)
+        _, group = np.unique(keys, axis=0, return_inverse=True)
+        group = group.ravel()
+        positions = np.concatenate((requestPositions, replyPositions))
+        isRequest = np.arange(len(positions)) < nRequests
+
+        order = np.lexsort((positions, group)) # agrupa por chave, em ordem de captura dentro de cada chave
+        group = group[order]
+        isRequest = isRequest[order]
+
+        lastRequest = np.maximum.accumulate(np.where(isRequest, np.arange(len(order)), -1)) # última requisição vista até cada posição
+        valid = ~isRequest & (lastRequest >= 0)
+        valid[valid] = group[lastRequest[valid]] == group[valid]
+
+        replies = order[valid] - nRequests
+        requests = order[lastRequest[valid]]
+        captureOrder = np.argsort(replyPositions[replies], kind="stable")
+
+        return replies[captureOrder], requests[captureOrder]
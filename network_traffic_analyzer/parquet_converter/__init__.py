@@ -0,0 +1 @@
+from .parquet_converter import ParquetConverter
\ No newline at end of file
@@ -0,0 +1,191 @@
+from scapy.all import PcapReader
+from array import array
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import hashlib
+import os
+import sys
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import PROTO_NAMES
+
+# esquema das capturas convertidas; "timestamp" é int64 em nanossegundos e "type" é codificado em dicionário
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ns")),
+    ("size", pa.uint32()),
+    ("type", pa.dictionary(pa.int16(), pa.string())),
+    ("src", pa.uint32()),
+    ("dst", pa.uint32()),
+    ("sport", pa.uint16()),
+    ("dport", pa.uint16()),
+    ("flags", pa.uint16()),
+    ("seq", pa.uint32()),
+    ("ack", pa.uint32()),
+    ("icmpType", pa.uint8()),
+    ("icmpId", pa.uint16()),
+    ("icmpSeq", pa.uint16())
+])
+
+# tipos dos arrays compactos usados durante a leitura, quando diferem do tipo da coluna
+BUFFER_TYPES = {"timestamp": "q", "type": "h"}
+
+# partições Hive da saída particionada: hora UTC no formato ISO ("2007-01-01T18") e nome do protocolo
+# a coluna "type" fica só no caminho das partições, e pacotes sem camada IP vão para a partição nula do Hive
+PARTITION_SCHEMA = pa.schema([("hour", pa.string()), ("type", pa.string())])
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+
+# colunas copiadas da linha decodificada pela PacketTable
+TABLE_FIELDS = ("src", "dst", "sport", "dport", "flags", "seq", "ack", "icmpType", "icmpId", "icmpSeq")
+
+# conversor de capturas .pcap para Parquet em fluxo contínuo: pacotes são lidos um a um e acumulados
+# em arrays tipados de tamanho fixo, e cada lote é gravado como um row group, mantendo a memória constante
+# com partitioned=True a saída é um diretório particionado por hora e protocolo (hour=.../type=.../part-<captura>.parquet)
+# cada captura grava o próprio arquivo em cada partição: capturas da mesma hora convertidas no mesmo diretório se somam,
+# e converter de novo a mesma captura substitui só os arquivos dela
+class ParquetConverter():
+    def __init__(self, path, output, batchSize=65536, compression="snappy", partitioned=False):
+        self.path = path
+        self.output = output
+        self.batchSize = batchSize # pacotes por row group
+        self.compression = compression
+        self.partitioned = partitioned
+        self.typeIds = {} # nome do protocolo -> índice no dicionário da coluna "type"
+        self.buffers = None
+        self.writer = None # gravador do arquivo único
+        self.writers = {} # (hora, protocolo) -> gravador da partição
+        self.totalPackets = 0
+        self.rowGroups = 0
+
+    # cria arrays compactos vazios para um novo lote
+    def resetBuffers(self):
+        self.buffers = {field.name: array(BUFFER_TYPES.get(field.name) or np.dtype(field.type.to_pandas_dtype()).char)
+                        for field in SCHEMA}
+
+    # retorna o nome do protocolo a partir do número, None quando não há camada IP
+    @staticmethod
+    def getProtoName(proto):
+        if proto < 0:
+            return None
+        return PROTO_NAMES.get(proto, str(proto))
+
+    # acrescenta um pacote scapy ao lote atual
+    def addPacket(self, pkt, signatures):
+        row = PacketTable.decodePacket(pkt, signatures)
+        name = self.getProtoName(row["proto"])
+
+        self.buffers["timestamp"].append(int(pkt.time * 1000000000))
+        self.buffers["size"].append(row["length"])
+        self.buffers["type"].append(-1 if name is None else self.typeIds.setdefault(name, len(self.typeIds)))
+        for field in TABLE_FIELDS:
+            self.buffers[field].append(row[field])
+
+    # converte o lote atual em RecordBatch do esquema
+    def getBatch(self):
+        columns = []
+        for field in SCHEMA:
+            values = self.buffers[field.name]
+            if field.name == "type":
+                indices = np.frombuffer(values, dtype=np.int16) if len(values) > 0 else np.array([], dtype=np.int16)
+                indices = pa.array(indices, mask=indices < 0) # -1 marca pacotes sem camada IP
+                columns.append(pa.DictionaryArray.from_arrays(indices, pa.array(list(self.typeIds), type=pa.string())))
+            else:
+                columns.append(pa.array(values, type=field.type))
+
+        return pa.RecordBatch.from_arrays(columns, schema=SCHEMA)
+
+    # retorna nome do arquivo da captura em cada partição: nome da captura e hash do caminho absoluto
+    def getPartName(self):
+        pathHash = hashlib.blake2b(os.path.abspath(self.path).encode(), digest_size=8).hexdigest()
+        stem = os.path.splitext(os.path.basename(self.path))[0]
+
+        return f"part-{stem}-{pathHash}.parquet"
+
+    # retorna gravador da partição, criando diretório e arquivo na primeira vez
+    def getPartitionWriter(self, hour, name):
+        key = (hour, name)
+        if key not in self.writers:
+            directory = os.path.join(self.output, f"hour={hour}", f"type={HIVE_NULL if name is None else name}")
+            os.makedirs(directory, exist_ok=True)
+            self.writers[key] = pq.ParquetWriter(os.path.join(directory, self.getPartName()), SCHEMA.remove(SCHEMA.get_field_index("type")),
+                                                 compression=self.compression)
+
+        return self.writers[key]
+
+    # divide o lote por hora e protocolo e grava cada parte como row group da sua partição, retorna quantidade de partes
+    def writePartitions(self, batch):
+        timestamps = np.frombuffer(self.buffers["timestamp"], dtype=np.int64)
+        types = np.frombuffer(self.buffers["type"], dtype=np.int16)
+        hours = timestamps // 3600000000000
+        keys = (hours - hours.min()) * (len(self.typeIds) + 1) + types + 1
+
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        names = list(self.typeIds)
+        batch = batch.drop_columns(["type"])
+
+        for rows in np.split(order, bounds):
+            hour = np.datetime_as_string(np.datetime64(int(hours[rows[0]]), "h"), unit="h")
+            name = None if types[rows[0]] < 0 else names[types[rows[0]]]
+            self.getPartitionWriter(hour, name).write_batch(batch.take(pa.array(rows)))
+
+        return len(bounds) + 1
+
+    # grava o lote atual como row group e inicia um novo
+    def flush(self):
+        if len(self.buffers["timestamp"]) == 0:
+            return
+
+        if self.partitioned:
+            self.rowGroups += self.writePartitions(self.getBatch())
+        else:
+            self.writer.write_batch(self.getBatch())
+            self.rowGroups += 1
+        self.totalPackets += len(self.buffers["timestamp"])
+        self.resetBuffers()
+
+    # converte a captura inteira e retorna quantidade de pacotes e de row groups gravados
+    def convert(self):
+        try:
+            packets = PcapReader(self.path)
+        except Exception as e:
+            print(f"Capture path is wrong or not specified: {e}")
+            return None
+
+        signatures = {}
+        self.resetBuffers()
+        self.totalPackets = 0
+        self.rowGroups = 0
+
+        if not self.partitioned:
+            self.writer = pq.ParquetWriter(self.output, SCHEMA, compression=self.compression)
+
+        try:
+            with packets:
+                for pkt in packets:
+                    self.addPacket(pkt, signatures)
+                    if len(self.buffers["timestamp"]) >= self.batchSize:
+                        self.flush()
+
+                self.flush()
+        finally:
+            for writer in [self.writer] + list(self.writers.values()):
+                if writer is not None:
+                    writer.close()
+            self.writer = None
+            self.writers = {}
+
+        return {"totalPackets": self.totalPackets, "rowGroups": self.rowGroups}
+
+# uso: python parquet_converter.py captura.pcap saida.parquet [pacotes por row group] [--partitioned]
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--partitioned"]
+    if len(args) < 2:
+        print("Usage: parquet_converter.py <capture.pcap> <output.parquet|output directory> [batch size] [--partitioned]")
+        sys.exit(1)
+
+    converter = ParquetConverter(args[0], args[1], int(args[2]) if len(args) > 2 else 65536, partitioned="--partitioned" in sys.argv)
+    result = converter.convert()
+    if result is None:
+        sys.exit(1)
+
+    print(f"Converted {result['totalPackets']} packets into {result['rowGroups']} row groups")
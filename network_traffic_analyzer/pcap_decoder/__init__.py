@@ -0,0 +1,2 @@
+from .pcap_decoder import PcapDecoder
+from .parallel_decoder import ParallelDecoder
\ No newline at end of file
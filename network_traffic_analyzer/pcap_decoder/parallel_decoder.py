@@ -0,0 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.pcap_decoder.pcap_decoder import PcapDecoder
+
+# decodifica em um processo de trabalho os registros que começam na região [start, stop) do arquivo
+# retorna a tabela da região e a posição do primeiro registro seguinte, usada para conferir a divisão
+def decodeChunk(path, start, stop):
+    with PcapDecoder(path) as decoder:
+        records = decoder.getRecords(start, stop)
+        return decoder.decode(records), records["end"]
+
+# decodifica uma captura grande dividindo-a em regiões de bytes processadas em paralelo
+# só a decodificação é paralela: cada processo devolve a tabela da sua região e o processo principal as concatena
+# em ordem de captura; associação de handshakes e echoes, retransmissões e agregações rodam em série sobre a tabela
+# completa, por isso fluxos que cruzam as divisões têm resultados idênticos aos da decodificação serial
+class ParallelDecoder():
+    def __init__(self, path, workers=None):
+        self.path = path
+        self.workers = workers or os.cpu_count() # número de processos de trabalho
+
+    # retorna tabela da captura inteira, ou None se o formato não é suportado pelo decodificador rápido
+    def decode(self):
+        with PcapDecoder(self.path) as decoder:
+            if not decoder.isSupported():
+                return None
+            bounds = decoder.getChunkBounds(self.workers)
+
+            if len(bounds) <= 1:
+                return decoder.decode()
+
+        with ProcessPoolExecutor(max_workers=len(bounds)) as executor:
+            futures = [executor.submit(decodeChunk, self.path, start, stop) for start, stop in bounds]
+            results = [future.result() for future in futures]
+
+        # cada região deve terminar exatamente onde a seguinte começa; caso contrário a divisão caiu fora de um registro
+        if any(end != start for (_, end), (start, _) in zip(results, bounds[1:])):
+            with PcapDecoder(self.path) as decoder:
+                return decoder.decode()
+
+        return PacketTable.concatenate([table for table, _ in results])
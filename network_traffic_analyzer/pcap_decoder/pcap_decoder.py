@@ -0,0 +1,285 @@
+from array import array
+import numpy as np
+import mmap
+import struct
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import COLUMNS, PROTO_ICMP, PROTO_TCP, PROTO_UDP
+
+# números mágicos do cabeçalho global pcap: ordem de bytes e resolução do timestamp
+MAGICS = {
+    b"\xd4\xc3\xb2\xa1": ("<", False),
+    b"\xa1\xb2\xc3\xd4": (">", False),
+    b"\x4d\x3c\xb2\xa1": ("<", True),
+    b"\xa1\xb2\x3c\x4d": (">", True)
+}
+
+GLOBAL_HEADER_LEN = 24
+RECORD_HEADER_LEN = 16
+
+# limites usados para reconhecer cabeçalhos de registro ao dividir o arquivo em regiões
+MAX_SNAPLEN = 262144 # maior snaplen usado pelo tcpdump
+MAX_SPAN = 366 * 86400 # duração máxima, em segundos, aceita a partir do primeiro registro
+
+# tipos de enlace suportados: Ethernet, IP puro e Linux cooked capture
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = (12, 101)
+LINKTYPE_LINUX_SLL = 113
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_ARP = 0x0806
+ETHERTYPE_VLAN = 0x8100
+
+# tipos ICMP que possuem campos id e seq (mesmos usados pelo scapy)
+ICMP_ID_SEQ_TYPES = [0, 8, 13, 14, 15, 16, 17, 18, 37, 38]
+
+# nomes de camadas iguais aos do scapy, usados nas assinaturas de camadas
+LINK_NAMES = {0: (), 1: ("Ethernet",), 2: ("Ethernet", "802.1Q"), 3: ("cooked linux",)}
+NETWORK_NAMES = {0: (), 1: ("IP",), 2: ("IPv6",), 3: ("ARP",)}
+TRANSPORT_NAMES = {0: (), 1: ("TCP",), 2: ("UDP",), 3: ("ICMP",)}
+
+# decodificador rápido de capturas .pcap: mapeia o arquivo em memória e extrai os campos de cabeçalho
+# Ethernet/IPv4/IPv6/TCP/UDP/ICMP diretamente dos bytes com NumPy, sem dissecção scapy
+# payloads de aplicação (DNS, NTP, ...) aparecem como camada Raw nas assinaturas de camadas
+class PcapDecoder():
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = None
+        self.byteorder = None
+        self.nanoseconds = False
+        self.linktype = None
+        self.snaplen = 0
+
+        header = self.file.read(GLOBAL_HEADER_LEN)
+        if len(header) == GLOBAL_HEADER_LEN and header[:4] in MAGICS:
+            self.byteorder, self.nanoseconds = MAGICS[header[:4]]
+            self.snaplen, self.linktype = struct.unpack_from(self.byteorder + "II", header, 16)
+
+        if self.isSupported():
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = np.frombuffer(self.map, dtype=np.uint8)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # verifica se a captura pode ser decodificada sem scapy (pcap clássico com tipo de enlace conhecido)
+    def isSupported(self):
+        return self.byteorder is not None and (self.linktype == LINKTYPE_ETHERNET or self.linktype in LINKTYPE_RAW
+                                               or self.linktype == LINKTYPE_LINUX_SLL)
+
+    def close(self):
+        self.data = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    # percorre os cabeçalhos de registro e retorna offsets dos dados, tamanhos capturados e timestamps em ms
+    # start e stop delimitam, em bytes, a região onde os registros começam
+    def getRecords(self, start=GLOBAL_HEADER_LEN, stop=None):
+        size = len(self.map)
+        stop = size if stop is None else min(stop, size)
+        unpack = struct.Struct(self.byteorder + "IIII").unpack_from
+
+        offsets = array("q")
+        caplens = array("I")
+        seconds = array("q")
+        fractions = array("q")
+
+        pos = start
+        while pos < stop and pos + RECORD_HEADER_LEN <= size:
+            sec, frac, caplen, _ = unpack(self.map, pos)
+            if pos + RECORD_HEADER_LEN + caplen > size: # registro truncado no fim do arquivo
+                break
+
+            offsets.append(pos + RECORD_HEADER_LEN)
+            caplens.append(caplen)
+            seconds.append(sec)
+            fractions.append(frac)
+            pos += RECORD_HEADER_LEN + caplen
+
+        seconds = np.frombuffer(seconds, dtype=np.int64) if len(seconds) > 0 else np.array([], dtype=np.int64)
+        fractions = np.frombuffer(fractions, dtype=np.int64) if len(fractions) > 0 else np.array([], dtype=np.int64)
+
+        if self.nanoseconds:
+            times = seconds * 1000.0 + fractions / 1e6
+        else:
+            times = (seconds * 1000000 + fractions) / 1000.0 # microssegundos inteiros, uma única divisão arredondada
+
+        return {"offsets": np.frombuffer(offsets, dtype=np.int64) if len(offsets) > 0 else np.array([], dtype=np.int64),
+                "caplens": np.frombuffer(caplens, dtype=np.uint32).astype(np.int64) if len(caplens) > 0 else np.array([], dtype=np.int64),
+                "times": times,
+                "end": pos
+                }
+
+    # verifica se os cabeçalhos a partir de pos formam uma cadeia de registros válidos até chain registros ou o fim do arquivo
+    def isRecordChain(self, pos, first, chain=8):
+        size = len(self.map)
+        unpack = struct.Struct(self.byteorder + "IIII").unpack_from
+        maxFraction = 1000000000 if self.nanoseconds else 1000000
+        maxCaplen = max(self.snaplen, MAX_SNAPLEN)
+
+        for _ in range(chain):
+            if pos == size:
+                return True
+            if pos + RECORD_HEADER_LEN > size:
+                return False
+
+            sec, frac, caplen, wirelen = unpack(self.map, pos)
+            if (frac >= maxFraction or caplen > maxCaplen or caplen > wirelen or not first <= sec <= first + MAX_SPAN
+                    or pos + RECORD_HEADER_LEN + caplen > size):
+                return False
+
+            pos += RECORD_HEADER_LEN + caplen
+
+        return True
+
+    # retorna o início do primeiro registro a partir de pos, ou o fim do arquivo se nenhum for encontrado
+    def findRecordStart(self, pos):
+        size = len(self.map)
+        if size < GLOBAL_HEADER_LEN + RECORD_HEADER_LEN:
+            return size
+
+        first = struct.unpack_from(self.byteorder + "I", self.map, GLOBAL_HEADER_LEN)[0]
+        while pos < size and not self.isRecordChain(pos, first):
+            pos += 1
+
+        return pos
+
+    # divide o arquivo em até chunks regiões de bytes que começam em inícios de registro
+    # retorna lista de (start, stop) em bytes, cada uma para getRecords
+    def getChunkBounds(self, chunks):
+        size = len(self.map)
+        step = max((size - GLOBAL_HEADER_LEN) // max(chunks, 1), 1)
+        starts = [GLOBAL_HEADER_LEN]
+
+        for i in range(1, chunks):
+            start = self.findRecordStart(max(GLOBAL_HEADER_LEN + i * step, starts[-1] + 1))
+            if start >= size:
+                break
+            starts.append(start)
+
+        return list(zip(starts, starts[1:] + [size]))
+
+    # lê campo inteiro big-endian de size bytes em cada posição, 0 quando o campo ultrapassa o limite capturado
+    def readField(self, positions, size, limits):
+        valid = positions + size <= limits
+        safe = np.where(valid, positions, 0)
+        value = np.zeros(len(positions), dtype=np.uint32)
+
+        for i in range(size):
+            value = (value << np.uint32(8)) | self.data[safe + i]
+
+        value[~valid] = 0
+        return value
+
+    # decodifica os registros em uma tabela colunar
+    def decode(self, records=None):
+        records = self.getRecords() if records is None else records
+        n = len(records["offsets"])
+        start = records["offsets"]
+        end = start + records["caplens"]
+        columns = {name: np.zeros(n, dtype=dtype) for name, dtype in COLUMNS.items()}
+        columns["time"] = records["times"]
+        columns["length"] = records["caplens"].astype(np.uint32)
+        columns["proto"][:] = -1
+
+        # camada de enlace
+        if self.linktype == LINKTYPE_ETHERNET:
+            etherType = self.readField(start + 12, 2, end)
+            network = start + 14
+            link = np.full(n, 1, dtype=np.int64)
+
+            vlan = etherType == ETHERTYPE_VLAN
+            etherType[vlan] = self.readField(start[vlan] + 16, 2, end[vlan])
+            network[vlan] += 4
+            link[vlan] = 2
+
+        elif self.linktype == LINKTYPE_LINUX_SLL:
+            etherType = self.readField(start + 14, 2, end)
+            network = start + 16
+            link = np.full(n, 3, dtype=np.int64)
+
+        else:
+            version = self.readField(start, 1, end) >> 4
+            etherType = np.where(version == 4, ETHERTYPE_IPV4, np.where(version == 6, ETHERTYPE_IPV6, 0)).astype(np.uint32)
+            network = start.copy()
+            link = np.zeros(n, dtype=np.int64)
+
+        # camada de rede
+        ipv4 = etherType == ETHERTYPE_IPV4
+        ipv6 = etherType == ETHERTYPE_IPV6
+        arp = etherType == ETHERTYPE_ARP
+        netCode = np.select([ipv4, ipv6, arp], [1, 2, 3], 0)
+
+        ihl = (self.readField(network, 1, end) & 0x0F) * 4
+        totalLen = np.where(ipv4, self.readField(network + 2, 2, end), self.readField(network + 4, 2, end) + 40)
+        fragOffset = self.readField(network + 6, 2, end) & 0x1FFF
+        proto = np.where(ipv4, self.readField(network + 9, 1, end), self.readField(network + 6, 1, end))
+
+        columns["src"][ipv4] = self.readField(network[ipv4] + 12, 4, end[ipv4])
+        columns["dst"][ipv4] = self.readField(network[ipv4] + 16, 4, end[ipv4])
+        columns["proto"][ipv4] = proto[ipv4]
+
+        networkEnd = np.select([ipv4, ipv6, arp], [network + totalLen, network + totalLen, network + 28], end)
+        transport = np.where(ipv4, network + ihl, network + 40)
+        dissect = (ipv4 & (fragOffset == 0)) | ipv6 # fragmentos com offset não têm cabeçalho de transporte
+
+        # camada de transporte
+        tcp = dissect & (proto == PROTO_TCP)
+        udp = dissect & (proto == PROTO_UDP)
+        icmp = ipv4 & (fragOffset == 0) & (proto == PROTO_ICMP)
+        transCode = np.select([tcp, udp, icmp], [1, 2, 3], 0)
+        transportLen = np.zeros(n, dtype=np.int64)
+
+        ports = tcp | udp
+        columns["proto"][tcp] = PROTO_TCP
+        columns["proto"][udp] = PROTO_UDP
+        columns["proto"][icmp] = PROTO_ICMP
+        columns["sport"][ports] = self.readField(transport[ports], 2, end[ports])
+        columns["dport"][ports] = self.readField(transport[ports] + 2, 2, end[ports])
+
+        columns["seq"][tcp] = self.readField(transport[tcp] + 4, 4, end[tcp])
+        columns["ack"][tcp] = self.readField(transport[tcp] + 8, 4, end[tcp])
+        dataOffset = (self.readField(transport[tcp] + 12, 1, end[tcp]) >> 4).astype(np.int64) * 4
+        columns["flags"][tcp] = self.readField(transport[tcp] + 12, 2, end[tcp]) & 0x01FF
+        columns["payloadLen"][tcp] = np.maximum(0, networkEnd[tcp] - transport[tcp] - dataOffset)
+        transportLen[tcp] = dataOffset
+        transportLen[udp] = 8
+
+        icmpType = self.readField(transport[icmp], 1, end[icmp])
+        idSeq = np.isin(icmpType, ICMP_ID_SEQ_TYPES)
+        columns["icmpType"][icmp] = icmpType
+        columns["icmpId"][icmp] = np.where(idSeq, self.readField(transport[icmp] + 4, 2, end[icmp]), 0)
+        columns["icmpSeq"][icmp] = np.where(idSeq, self.readField(transport[icmp] + 6, 2, end[icmp]), 0)
+        transportLen[icmp] = 8
+
+        # assinatura de camadas: enlace, rede, transporte, payload (Raw) e preenchimento de quadro (Padding)
+        known = netCode > 0
+        payloadStart = np.where(transCode > 0, transport + transportLen, np.where(ipv4, transport, np.where(ipv6, network + 40, network)))
+        payloadStart = np.where(arp, networkEnd, payloadStart)
+        payloadEnd = np.where(known, np.minimum(networkEnd, end), end)
+        hasRaw = payloadEnd > payloadStart
+        hasPadding = known & (end > networkEnd)
+
+        codes = link + 4 * netCode + 16 * transCode + 64 * hasRaw + 128 * hasPadding
+        uniqueCodes, layerIds = np.unique(codes, return_inverse=True)
+        columns["layerId"] = layerIds.ravel().astype(np.int32)
+        signatures = [self.getSignature(int(code)) for code in uniqueCodes]
+
+        return PacketTable(columns, signatures)
+
+    # converte código de assinatura em tupla de nomes de camadas
+    @staticmethod
+    def getSignature(code):
+        names = LINK_NAMES[code % 4] + NETWORK_NAMES[(code // 4) % 4] + TRANSPORT_NAMES[(code // 16) % 4]
+        if code & 64:
+            names += ("Raw",)
+        if code & 128:
+            names += ("Padding",)
+
+        return names
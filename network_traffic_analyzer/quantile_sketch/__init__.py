@@ -0,0 +1 @@
+from .quantile_sketch import QuantileSketch
\ No newline at end of file
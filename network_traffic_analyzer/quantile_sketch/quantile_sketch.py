@@ -0,0 +1,138 @@
+import numpy as np
+
+# percentis informados nas métricas de RTT e intervalo
+PERCENTILES = (50, 95, 99, 99.9)
+
+# esboço de quantis DDSketch: amostras contadas em bins logarítmicos de razão gamma = (1 + a) / (1 - a),
+# de modo que todo quantil estimado tem erro relativo máximo a (relativeAccuracy) em relação ao valor real
+# a memória é limitada a maxBins bins por sinal; ao passar do limite os bins de menor módulo são unidos,
+# afetando só quantis muito baixos; esboços com a mesma precisão são combinados somando os bins
+# mínimo e máximo exatos são mantidos, e os quantis estimados são limitados a eles
+class QuantileSketch():
+    def __init__(self, relativeAccuracy=0.01, maxBins=2048, minValue=1e-9):
+        self.relativeAccuracy = relativeAccuracy
+        self.maxBins = maxBins
+        self.minValue = minValue # módulos menores que minValue são contados como zero
+        self.gamma = (1 + relativeAccuracy) / (1 - relativeAccuracy)
+        self.logGamma = np.log(self.gamma)
+        self.positive = {} # índice do bin -> contagem de amostras positivas
+        self.negative = {} # índice do bin -> contagem de amostras negativas, pelo módulo
+        self.zeroCount = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    # retorna índice do bin de cada módulo
+    def getIndex(self, values):
+        return np.ceil(np.log(values) / self.logGamma).astype(np.int64)
+
+    # retorna valor representativo do bin, com erro relativo máximo relativeAccuracy para todo valor do bin
+    def getValue(self, index):
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    # soma contagens aos bins e une os bins de menor índice quando passam de maxBins
+    def addBins(self, bins, indices, counts):
+        for index, count in zip(indices, counts):
+            bins[index] = bins.get(index, 0) + count
+
+        if len(bins) > self.maxBins:
+            indices = sorted(bins)
+            collapsed = sum(bins.pop(index) for index in indices[:len(indices) - self.maxBins + 1])
+            bins[indices[len(indices) - self.maxBins]] = collapsed
+
+    # acrescenta uma amostra
+    def update(self, value):
+        return self.updateBatch([value])
+
+    # acrescenta um array de amostras
+    def updateBatch(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return self
+
+        magnitudes = np.abs(values)
+        zero = magnitudes < self.minValue
+        self.zeroCount += int(np.count_nonzero(zero))
+        self.count += values.size
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+
+        for bins, mask in ((self.positive, (values > 0) & ~zero), (self.negative, (values < 0) & ~zero)):
+            if np.any(mask):
+                indices, counts = np.unique(self.getIndex(magnitudes[mask]), return_counts=True)
+                self.addBins(bins, indices.tolist(), counts.tolist())
+
+        return self
+
+    # combina outro esboço com a mesma precisão neste
+    def merge(self, other):
+        if other.relativeAccuracy != self.relativeAccuracy:
+            print("There is no way to merge quantile sketches with different relative accuracies")
+            return self
+
+        self.addBins(self.positive, list(other.positive.keys()), list(other.positive.values()))
+        self.addBins(self.negative, list(other.negative.keys()), list(other.negative.values()))
+        self.zeroCount += other.zeroCount
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        return self
+
+    # retorna valor estimado do quantil q (0 a 1), limitado ao mínimo e ao máximo das amostras
+    def getQuantile(self, q):
+        if self.count == 0:
+            return 0
+
+        return min(max(self.getBinValue(q), self.min), self.max)
+
+    # retorna valor representativo do bin que contém o quantil q
+    def getBinValue(self, q):
+        rank = q * (self.count - 1)
+        seen = 0
+
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self.getValue(index)
+
+        seen += self.zeroCount
+        if seen > rank:
+            return 0
+
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self.getValue(index)
+
+        return self.getValue(max(self.positive))
+
+    # retorna dicionário percentil -> valor estimado
+    def getPercentiles(self, percentiles=PERCENTILES):
+        return {percentile: self.getQuantile(percentile / 100) for percentile in percentiles}
+
+    # retorna estado serializável (JSON) do esboço
+    def getState(self):
+        return {"relativeAccuracy": self.relativeAccuracy,
+                "maxBins": self.maxBins,
+                "minValue": self.minValue,
+                "positive": [[index, count] for index, count in self.positive.items()],
+                "negative": [[index, count] for index, count in self.negative.items()],
+                "zeroCount": self.zeroCount,
+                "count": self.count,
+                "min": self.min if self.count > 0 else None,
+                "max": self.max if self.count > 0 else None
+                }
+
+    # cria esboço a partir de estado salvo com getState
+    @classmethod
+    def fromState(cls, state):
+        sketch = cls(state["relativeAccuracy"], state["maxBins"], state["minValue"])
+        sketch.positive = {int(index): int(count) for index, count in state["positive"]}
+        sketch.negative = {int(index): int(count) for index, count in state["negative"]}
+        sketch.zeroCount = state["zeroCount"]
+        sketch.count = state["count"]
+        if state.get("min") is not None:
+            sketch.min, sketch.max = state["min"], state["max"]
+
+        return sketch
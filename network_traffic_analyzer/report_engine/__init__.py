@@ -0,0 +1,2 @@
+from .report_engine import ReportEngine
+from .graph_renderer import GraphRenderer
\ No newline at end of file
@@ -0,0 +1,35 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+from network_traffic_analyzer.report_engine.report_engine import ReportEngine, GRAPH_FORMATS
+
+# renderiza em um processo de trabalho os gráficos de uma captura a partir das entradas já calculadas
+# o ReportEngine do processo só valida o caminho da captura; nada é decodificado de novo
+def renderCapture(capture, id, protocols, inputs, path, format, dpi):
+    engine = ReportEngine(capture, protocols=protocols, id=id)
+    engine.setGraphOutput(format, dpi)
+    engine.plotReport(path, inputs)
+
+    return capture
+
+# renderização em lote dos gráficos de várias capturas: cada processo desenha em uma única figura Agg reutilizada,
+# sem estado global do pyplot, então a memória não cresce com o número de gráficos
+class GraphRenderer():
+    def __init__(self, path, format="png", dpi=300, workers=None):
+        self.path = os.path.join(path, "") # diretório de saída
+        self.format = format
+        self.dpi = dpi
+        self.workers = workers or os.cpu_count() # número de processos de trabalho
+
+    # renderiza os gráficos dos relatórios (ReportEngine) e retorna as capturas renderizadas, ou None se o formato é inválido
+    def render(self, engines):
+        if self.format not in GRAPH_FORMATS:
+            print(f"Unknown graph format: {self.format}")
+            return None
+
+        os.makedirs(self.path, exist_ok=True)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(renderCapture, engine.path, engine.getId(), engine.protocols, engine.getPlotInputs(),
+                                       self.path, self.format, self.dpi) for engine in engines]
+
+            return [future.result() for future in futures]
@@ -0,0 +1,265 @@
+from contextlib import redirect_stdout
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
+from network_traffic_analyzer.capture_pipeline import (CapturePipeline, LayerStage, ThroughputStage, TcpRttStage, IntervalStage,
+                                                       TcpLossStage, IcmpEchoStage)
+from network_traffic_analyzer.capture_pipeline.pipeline_stages import getSampleStats
+from network_traffic_analyzer.packet_analyzer import PacketAnalyzer
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+from network_traffic_analyzer.running_stats import RunningStats
+from network_traffic_analyzer.stats_cache import cached
+
+# métricas do relatório, na ordem dos print*Metrics dos analisadores
+METRICS = ("general", "throughput", "rtt", "interval", "rttJitter", "intervalJitter", "loss")
+PROTOCOLS = ("TCP", "ICMP")
+
+# formatos de arquivo dos gráficos
+GRAPH_FORMATS = ("png", "svg", "pdf")
+
+# chaves de amostras, ocupam memória proporcional à captura e ficam só nas entradas dos gráficos
+SAMPLE_KEYS = ("rtts", "intervals", "jitters", "handshakes")
+
+# gráfico de linha, histograma e rótulo dos eixos de cada métrica com amostras
+SAMPLE_PLOTS = (("rtt", "plotRttGraph", "plotRttHistogram", "RTT (ms)"),
+                ("interval", "plotIntervalGraph", "plotIntervalHistogram", "Interval (ms)"),
+                ("rttJitter", "plotRttJitterGraph", "plotRttJitterHistogram", "Jitter (ms)"),
+                ("intervalJitter", "plotIntervalJitterGraph", "plotIntervalJitterHistogram", "Jitter (ms)"))
+
+# motor de relatórios: monta as etapas do CapturePipeline para as métricas pedidas e percorre a captura uma única vez,
+# entregando cada lote a todos os coletores; do resultado saem o relatório em texto (mesmos print*Metrics dos analisadores),
+# um documento JSON e as entradas dos gráficos
+class ReportEngine(PacketAnalyzer):
+    cacheState = PacketAnalyzer.cacheState + ("metrics", "protocols", "executor", "pipelineWorkers")
+
+    def __init__(self, path, metrics=METRICS, protocols=PROTOCOLS, id=None, executor="thread", pipelineWorkers=None):
+        super().__init__(id or os.path.basename(path), path=path, streaming=True, decoder="fast")
+        self.metrics = tuple(metric for metric in METRICS if metric in metrics)
+        self.protocols = tuple(protocol for protocol in PROTOCOLS if protocol in protocols)
+        self.executor = executor
+        self.pipelineWorkers = pipelineWorkers # lotes decodificados ao mesmo tempo pelo CapturePipeline, distinto de workers do decodificador
+
+        for name in set(metrics) - set(METRICS):
+            print(f"Unknown report metric: {name}")
+        for name in set(protocols) - set(PROTOCOLS):
+            print(f"Unknown report protocol: {name}")
+
+    # retorna etapas do pipeline necessárias para as métricas e protocolos pedidos
+    def getStages(self):
+        metrics = set(self.metrics)
+        stages = [LayerStage()]
+
+        if "throughput" in metrics:
+            stages.append(ThroughputStage())
+
+        if metrics & {"rtt", "rttJitter"} and "TCP" in self.protocols:
+            stages.append(TcpRttStage())
+
+        if metrics & {"interval", "intervalJitter"}:
+            stages += [IntervalStage(protocol) for protocol in self.protocols]
+
+        if "loss" in metrics and "TCP" in self.protocols:
+            stages.append(TcpLossStage())
+
+        if metrics & {"rtt", "rttJitter", "loss"} and "ICMP" in self.protocols:
+            stages.append(IcmpEchoStage())
+
+        return stages
+
+    # percorre a captura uma vez e retorna resultados brutos por etapa
+    @cached
+    def getResults(self):
+        return CapturePipeline(self.path, self.getStages(), executor=self.executor, workers=self.pipelineWorkers).run()
+
+    # retorna relatório: métricas gerais, séries de throughput e métricas por protocolo
+    @cached
+    def getReport(self):
+        results = self.getResults()
+        if results is None:
+            return None
+
+        report = {"id": self.getId(), "path": self.path, "general": results.get("general")}
+        if "throughput" in self.metrics:
+            report["throughput"] = results.get("throughput")
+
+        for protocol in self.protocols:
+            metrics = {}
+
+            if "rtt" in self.metrics or "rttJitter" in self.metrics:
+                metrics["rtt"] = results.get("tcpRtt") if protocol == "TCP" else results.get("icmp").get("rtt")
+            if "rttJitter" in self.metrics:
+                metrics["rttJitter"] = getSampleStats(np.abs(np.diff(metrics["rtt"].get("rtts"))), "jitters")
+
+            if "interval" in self.metrics or "intervalJitter" in self.metrics:
+                metrics["interval"] = results.get(protocol.lower() + "Interval")
+            if "intervalJitter" in self.metrics:
+                metrics["intervalJitter"] = getSampleStats(np.abs(np.diff(metrics["interval"].get("intervals"))), "jitters")
+
+            if "loss" in self.metrics and protocol == "TCP":
+                metrics["loss"] = results.get("tcpLoss")
+            elif "loss" in self.metrics:
+                icmp = results.get("icmp")
+                metrics["loss"] = {name: icmp.get(name) for name in ("sent", "received", "lost", "lossRate", "expired", "unmatched")}
+                metrics["loss"]["lossStats"] = [icmp.get("sent"), icmp.get("received"), icmp.get("lost")]
+
+            report[protocol] = metrics
+
+        return report
+
+    # converte valor do relatório para JSON: acumuladores viram estado, arrays viram listas, infinitos viram null e amostras são omitidas
+    @staticmethod
+    def toJson(value):
+        if isinstance(value, dict):
+            return {str(key): ReportEngine.toJson(item) for key, item in value.items() if key not in SAMPLE_KEYS}
+
+        if isinstance(value, (list, tuple)):
+            return [ReportEngine.toJson(item) for item in value]
+
+        if isinstance(value, (RunningStats, QuantileSketch, BinnedHistogram)):
+            return value.getState()
+
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+
+        if isinstance(value, np.generic):
+            value = value.item()
+
+        if isinstance(value, float) and not np.isfinite(value): # máximo e mínimo de acumuladores vazios
+            return None
+
+        return value
+
+    # retorna documento JSON do relatório, sem as amostras
+    def getJson(self, indent=2):
+        return json.dumps(self.toJson(self.getReport()), indent=indent)
+
+    # retorna entradas dos gráficos por protocolo: camadas, séries de throughput, amostras de RTT, intervalos e jitter,
+    # seus histogramas (BinnedHistogram, chaves "<métrica>Histogram") e perdas
+    def getPlotInputs(self):
+        report = self.getReport()
+        general = report.get("general")
+        inputs = {"layers": general.get("layers"), "nLayers": general.get("nLayers")}
+
+        if "throughput" in report:
+            inputs.update({name: report["throughput"].get(name) for name in ("times", "throughput", "packetRate")})
+
+        for protocol in self.protocols:
+            metrics = report.get(protocol)
+            samples = {}
+
+            for metric, key in (("rtt", "rtts"), ("interval", "intervals"), ("rttJitter", "jitters"), ("intervalJitter", "jitters")):
+                if metric in metrics:
+                    samples[metric] = metrics[metric].get(key)
+                    samples[metric + "Histogram"] = metrics[metric].get("histogram")
+
+            if "loss" in metrics:
+                loss = metrics["loss"]
+                samples["lossStats"] = loss.get("lossStats") or [loss.get("totalPackets"), loss.get("uniquePackets"), loss.get("retransmissions")]
+                samples["lossRate"] = loss.get("lossRate")
+
+            inputs[protocol] = samples
+
+        return inputs
+
+    # imprime relatório em texto com os print*Metrics dos analisadores
+    def printReport(self):
+        report = self.getReport()
+        general = report.get("general")
+        self.printGeneralMetrics(self.getId(), general.get("totalPackets"), general.get("totalBytes"), general.get("layers"),
+                                 general.get("throughput"))
+
+        for protocol in self.protocols:
+            metrics = report.get(protocol)
+            stats = [(metric, metrics[metric]) for metric in ("rtt", "interval", "rttJitter", "intervalJitter") if metric in self.metrics]
+
+            for metric, values in stats:
+                args = [values.get(name) for name in ("mean", "std", "max", "min", "error", "cv")]
+                if metric == "rtt":
+                    self.printRttMetrics(protocol, *args, values.get("percentiles"))
+                elif metric == "interval":
+                    self.printIntervalMetrics(protocol, *args, values.get("percentiles"))
+                elif metric == "rttJitter":
+                    self.printRttJitterMetrics(protocol, *args)
+                else:
+                    self.printIntervalJitterMetrics(protocol, *args)
+
+            if "loss" in metrics and protocol == "TCP":
+                loss = metrics["loss"]
+                print(f"{protocol} spurious retransmissions: {loss.get('spuriousRetransmissions')}")
+                print(f"{protocol} out-of-order segments: {loss.get('outOfOrder')}")
+                self.printLossMetrics(protocol, loss.get("totalPackets"), loss.get("uniquePackets"), loss.get("retransmissions"),
+                                      loss.get("lossRate"))
+            elif "loss" in metrics:
+                loss = metrics["loss"]
+                self.printLossMetrics(protocol, loss.get("sent"), loss.get("received"), loss.get("lost"), loss.get("lossRate"))
+
+    # plota gráficos do relatório em path com os plot* dos analisadores, um prefixo por protocolo
+    # inputs: entradas já calculadas por getPlotInputs, possivelmente em outro processo; None calcula a partir da captura
+    def plotReport(self, path, inputs=None):
+        inputs = self.getPlotInputs() if inputs is None else inputs
+        id = self.getId()
+
+        self.plotLayersGraph(path, id, inputs.get("layers"), inputs.get("nLayers"), None, "Protocol layers", "Amount of packets")
+        if "times" in inputs:
+            xAxis = np.asarray(inputs.get("times")) / 1000
+            self.plotThroughputGraph(path, id, xAxis, inputs.get("throughput"), None, None, "Capture time (s)", "Throughput (Mbps)")
+            self.plotPacketRateGraph(path, id, xAxis, inputs.get("packetRate"), None, None, "Capture time (s)", "Packets per second")
+
+        for protocol in self.protocols:
+            samples = inputs.get(protocol)
+            prefix = f"{id}-{protocol.lower()}"
+
+            for metric, plotGraph, plotHistogram, label in SAMPLE_PLOTS:
+                values = samples.get(metric)
+                if values is None or len(values) == 0:
+                    continue
+
+                getattr(self, plotGraph)(path, prefix, np.arange(1, len(values) + 1), values, None, "Sample", label)
+                histogram = samples.get(metric + "Histogram") # entradas sem histograma usam as amostras
+                getattr(self, plotHistogram)(path, prefix, values if histogram is None else histogram, None, label, "Frequency")
+
+            if "lossStats" in samples:
+                self.plotLossGraph(path, prefix, samples.get("lossStats"), None, "Statistics", "Amount of packets")
+                self.plotLossRateGraph(path, prefix, samples.get("lossRate"))
+
+# uso: network-report <captura.pcap> [--metrics rtt,loss] [--protocols TCP,ICMP] [--json relatorio.json] [--text relatorio.txt]
+#      [--graphs DIR] [--format png|svg|pdf] [--dpi N] [--executor thread|process] [--workers N]
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Build a full traffic report from a capture in a single pass")
+    parser.add_argument("capture", help="capture file (.pcap)")
+    parser.add_argument("--metrics", default=",".join(METRICS), help=f"comma-separated metrics (default: {','.join(METRICS)})")
+    parser.add_argument("--protocols", default=",".join(PROTOCOLS), help=f"comma-separated protocols (default: {','.join(PROTOCOLS)})")
+    parser.add_argument("--id", default=None, help="capture id used in the report and graph names (default: file name)")
+    parser.add_argument("--json", default=None, help="write the report to a JSON file")
+    parser.add_argument("--text", default=None, help="write the text report to a file instead of stdout")
+    parser.add_argument("--graphs", default=None, help="render the report graphs into this directory")
+    parser.add_argument("--format", choices=GRAPH_FORMATS, default="png", help="graph file format")
+    parser.add_argument("--dpi", type=int, default=300, help="graph resolution")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="executor used to decode batches")
+    parser.add_argument("--workers", type=int, default=None, help="batches decoded at the same time")
+    args = parser.parse_args(args)
+
+    engine = ReportEngine(args.capture, args.metrics.split(","), args.protocols.split(","), args.id, args.executor, args.workers)
+    if engine.getReport() is None:
+        sys.exit(1)
+
+    if args.text:
+        with open(args.text, "w") as file, redirect_stdout(file):
+            engine.printReport()
+    else:
+        engine.printReport()
+
+    if args.json:
+        with open(args.json, "w") as file:
+            file.write(engine.getJson())
+
+    if args.graphs:
+        os.makedirs(args.graphs, exist_ok=True)
+        engine.setGraphOutput(args.format, args.dpi)
+        engine.plotReport(os.path.join(args.graphs, ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+from .running_stats import RunningStats
\ No newline at end of file
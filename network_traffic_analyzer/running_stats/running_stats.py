@@ -0,0 +1,89 @@
+import numpy as np
+
+# acumulador de estatísticas em uma passagem: quantidade, média, soma dos quadrados dos desvios (Welford), máximo e mínimo
+# acumuladores de partes diferentes (lotes, chunks, arquivos, processos) são combinados com merge (Chan et al.)
+class RunningStats():
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0 # soma dos quadrados dos desvios em relação à média
+        self.max = -np.inf
+        self.min = np.inf
+
+    # acrescenta uma amostra
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.max = max(self.max, value)
+        self.min = min(self.min, value)
+
+        return self
+
+    # acrescenta um array de amostras, com média e desvios calculados pelo NumPy
+    def updateBatch(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return self
+
+        batch = RunningStats()
+        batch.count = values.size
+        batch.mean = np.mean(values)
+        batch.m2 = np.sum((values - batch.mean) ** 2)
+        batch.max = np.max(values)
+        batch.min = np.min(values)
+
+        return self.merge(batch)
+
+    # combina outro acumulador neste
+    def merge(self, other):
+        if other.count == 0:
+            return self
+
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.max, self.min = other.count, other.mean, other.m2, other.max, other.min
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.max = max(self.max, other.max)
+        self.min = min(self.min, other.min)
+
+        return self
+
+    # retorna estado serializável do acumulador
+    def getState(self):
+        return {"count": self.count,
+                "mean": float(self.mean),
+                "m2": float(self.m2),
+                "max": float(self.max),
+                "min": float(self.min)
+                }
+
+    # cria acumulador a partir de estado salvo com getState
+    @classmethod
+    def fromState(cls, state):
+        stats = cls()
+        stats.count, stats.mean, stats.m2, stats.max, stats.min = state["count"], state["mean"], state["m2"], state["max"], state["min"]
+
+        return stats
+
+    # retorna média, desvio padrão, máximo, mínimo, erro padrão e coeficiente de variação, no formato usado pelos print*Metrics
+    def getStats(self):
+        if self.count == 0:
+            return {"count": 0, "mean": 0, "std": 0, "max": 0, "min": 0, "error": 0, "cv": 0}
+
+        std = np.sqrt(self.m2 / self.count)
+
+        return {"count": self.count,
+                "mean": self.mean,
+                "std": std,
+                "max": self.max,
+                "min": self.min,
+                "error": std / np.sqrt(self.count),
+                "cv": (std / self.mean) * 100 if self.mean > 0 else 0
+                }
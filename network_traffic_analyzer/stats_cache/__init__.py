@@ -0,0 +1 @@
+from .stats_cache import StatsCache, cached
\ No newline at end of file
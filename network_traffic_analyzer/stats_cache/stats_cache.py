@@ -0,0 +1,83 @@
+from functools import wraps
+import numpy as np
+import inspect
+
+# cache de resultados dos analisadores: chave por método e parâmetros, com contadores de acertos e faltas
+# o estado da captura (atributos listados em cacheState do analisador) é guardado junto, e qualquer mudança invalida o cache
+class StatsCache():
+    def __init__(self):
+        self.results = {}
+        self.state = None # estado da captura para o qual os resultados são válidos
+        self.hits = 0
+        self.misses = 0
+
+    # descarta resultados quando o estado da captura muda
+    def validate(self, state):
+        if state != self.state:
+            self.clear()
+            self.state = state
+
+    def clear(self):
+        self.results.clear()
+
+    # retorna resultado armazenado ou calcula e armazena
+    def get(self, key, compute):
+        if key in self.results:
+            self.hits += 1
+            return self.results[key]
+
+        self.misses += 1
+        result = compute()
+        self.results[key] = result
+
+        return result
+
+    # retorna contadores do cache
+    def getCounters(self):
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.results)
+                }
+
+# marca arrays NumPy do resultado, inclusive dentro de dicionários, listas e tuplas, como somente leitura
+def freeze(result):
+    if isinstance(result, np.ndarray):
+        result.flags.writeable = False
+    elif isinstance(result, dict):
+        for value in result.values():
+            freeze(value)
+    elif isinstance(result, (list, tuple)):
+        for value in result:
+            if isinstance(value, (np.ndarray, dict, list, tuple)):
+                freeze(value)
+
+    return result
+
+# decorador de métodos de analisadores com resultado memoizado
+# argumentos são associados aos parâmetros do método, com valores padrão, antes de montar a chave,
+# então f(x), f(x=x) e f() com x padrão usam a mesma entrada
+# resultados são compartilhados entre chamadas, sem cópia: arrays NumPy são somente leitura,
+# e dicionários, listas e acumuladores devem ser copiados antes de modificados por quem os recebe
+def cached(method):
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self.statsCache
+        cache.validate(tuple(getattr(self, name, None) for name in self.cacheState))
+
+        try:
+            bound = signature.bind(self, *args, **kwargs)
+        except TypeError: # argumentos inválidos, o próprio método informa o erro
+            return method(self, *args, **kwargs)
+        bound.apply_defaults()
+
+        key = (method.__qualname__, tuple(bound.arguments.items())[1:])
+        try:
+            hash(key)
+        except TypeError: # parâmetros não hasheáveis (arrays), calcula sem cache
+            return method(self, *args, **kwargs)
+
+        return cache.get(key, lambda: freeze(method(self, *args, **kwargs)))
+
+    return wrapper
@@ -0,0 +1 @@
+from .table_cache import TableCache
\ No newline at end of file
@@ -0,0 +1,130 @@
+import numpy as np
+import hashlib
+import json
+import os
+import zipfile
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import COLUMNS
+
+# sufixo dos arquivos de cache, usado também para localizar entradas na remoção por tamanho
+CACHE_SUFFIX = ".table.npz"
+
+# bytes lidos do início e do fim da captura para o hash de conteúdo
+HASH_SAMPLE = 1 << 20
+
+# cache em disco das tabelas de captura: arquivo .npz com as colunas ao lado da captura ou em cacheDir
+# a entrada guarda caminho, tamanho, mtime e hash do conteúdo da captura, e é ignorada quando algum deles muda
+class TableCache():
+    def __init__(self, cacheDir=None, maxBytes=None, refresh=False):
+        self.cacheDir = cacheDir # None grava o cache no diretório da captura
+        self.maxBytes = maxBytes # tamanho máximo das entradas em cacheDir, as menos usadas são removidas primeiro
+        self.refresh = refresh # ignora entradas existentes e grava novamente
+
+    # retorna caminho do arquivo de cache da captura para o decodificador
+    # em cacheDir o nome leva um hash do caminho absoluto, então capturas de mesmo nome em diretórios diferentes não
+    # sobrescrevem a entrada uma da outra
+    def getCachePath(self, path, decoder):
+        if self.cacheDir is None:
+            return os.path.join(os.path.dirname(os.path.abspath(path)), f"{os.path.basename(path)}.{decoder}{CACHE_SUFFIX}")
+
+        pathHash = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+        return os.path.join(self.cacheDir, f"{os.path.basename(path)}.{pathHash}.{decoder}{CACHE_SUFFIX}")
+
+    # retorna chave da captura: caminho, tamanho, mtime e hash do início e do fim do arquivo
+    # o hash parcial evita reler capturas grandes inteiras e detecta capturas regravadas com o mesmo tamanho
+    @staticmethod
+    def getKey(path, decoder):
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=16)
+
+        with open(path, "rb") as file:
+            digest.update(file.read(HASH_SAMPLE))
+            if stat.st_size > HASH_SAMPLE:
+                file.seek(max(HASH_SAMPLE, stat.st_size - HASH_SAMPLE))
+                digest.update(file.read(HASH_SAMPLE))
+
+        return {"path": os.path.abspath(path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": digest.hexdigest(),
+                "decoder": decoder
+                }
+
+    # retorna tabela armazenada para a captura, ou None quando não há entrada válida
+    # columns: nomes das colunas lidas do arquivo (time é sempre lida), None lê todas; as demais não são descompactadas
+    def load(self, path, decoder, columns=None):
+        cachePath = self.getCachePath(path, decoder)
+        if self.refresh or not os.path.isfile(cachePath):
+            return None
+
+        names = list(COLUMNS) if columns is None else list(dict.fromkeys(("time",) + tuple(columns)))
+        unknown = [name for name in names if name not in COLUMNS]
+        if unknown:
+            print(f"Unknown table columns: {unknown}")
+            return None
+
+        try:
+            with np.load(cachePath, allow_pickle=False) as entry:
+                if json.loads(str(entry["key"])) != self.getKey(path, decoder):
+                    return None
+
+                loaded = {name: entry[name] for name in names}
+                signatures = [tuple(signature) for signature in json.loads(str(entry["layerSignatures"]))]
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e: # entrada truncada ou corrompida
+            print(f"Ignoring unreadable table cache {cachePath}: {e}")
+            return None
+
+        try:
+            os.utime(cachePath) # marca entrada como usada recentemente
+        except OSError: # diretório de cache só para leitura
+            pass
+
+        return PacketTable(loaded, signatures)
+
+    # grava tabela da captura e remove entradas antigas se o diretório passar de maxBytes
+    def store(self, path, decoder, table):
+        cachePath = self.getCachePath(path, decoder)
+        temporary = f"{cachePath}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+            with open(temporary, "wb") as file: # arquivo temporário: processos paralelos nunca leem entrada incompleta
+                np.savez(file, key=np.array(json.dumps(self.getKey(path, decoder))),
+                         layerSignatures=np.array(json.dumps(table.layerSignatures)),
+                         **{name: np.ascontiguousarray(table.columns[name]) for name in COLUMNS})
+            os.replace(temporary, cachePath)
+        except OSError as e:
+            print(f"Could not write table cache {cachePath}: {e}")
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+
+        try:
+            self.evict(os.path.dirname(cachePath))
+        except OSError as e:
+            print(f"Could not evict table cache entries: {e}")
+
+    # remove as entradas usadas há mais tempo até o total caber em maxBytes
+    # processos que compartilham cacheDir removem entradas ao mesmo tempo: entradas que já sumiram são ignoradas
+    def evict(self, directory):
+        if self.maxBytes is None:
+            return
+
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith(CACHE_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(directory, name)))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(entry)
+            except FileNotFoundError:
+                pass
+            total -= size
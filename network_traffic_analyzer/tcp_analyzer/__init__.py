@@ -1 +1,4 @@
-from .tcp_analyzer import TcpAnalyzer
\ No newline at end of file
+from .tcp_analyzer import TcpAnalyzer
+from .handshake_matcher import HandshakeMatcher
+from .segment_rtt_matcher import SegmentRttMatcher
+from .retransmission_detector import RetransmissionDetector
\ No newline at end of file
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+import numpy as np
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import FLAG_SYN, FLAG_ACK
+
+# associa SYN ↔ SYN+ACK em uma passagem: tempos de SYN pendentes indexados pela chave do fluxo,
+# busca O(1) para cada SYN+ACK e remoção por timeout de SYNs sem resposta, mantendo a memória limitada
+class HandshakeMatcher():
+    def __init__(self, timeout=60000):
+        self.timeout = timeout # tempo máximo em ms que um SYN espera pelo SYN+ACK
+        self.pending = OrderedDict() # (src, dst, sport, dport, seq) -> tempo do SYN, em ordem de chegada
+        self.pairs = [] # handshakes associados: (chave do fluxo, tempo do SYN, tempo do SYN+ACK)
+        self.expired = 0 # SYNs removidos por timeout
+
+    # registra SYN, SYN retransmitido substitui o tempo do anterior
+    def addSyn(self, src, dst, sport, dport, seq, time):
+        key = (src, dst, sport, dport, seq)
+        self.pending[key] = time
+        self.pending.move_to_end(key)
+        self.evict(time)
+
+    # associa SYN+ACK ao SYN pendente do fluxo reverso: ack = número de sequência original + 1
+    def addSynAck(self, src, dst, sport, dport, ack, time):
+        self.evict(time)
+        synTime = self.pending.pop((dst, src, dport, sport, (ack - 1) % 2**32), None)
+
+        if synTime is None:
+            return None
+
+        self.pairs.append(((dst, src, dport, sport), synTime, time))
+        return time - synTime
+
+    # processa um pacote TCP a partir dos seus campos
+    def update(self, src, dst, sport, dport, seq, ack, flags, time):
+        if flags == FLAG_SYN:
+            self.addSyn(src, dst, sport, dport, seq, time)
+
+        elif flags == FLAG_SYN | FLAG_ACK:
+            self.addSynAck(src, dst, sport, dport, ack, time)
+
+    # processa os pacotes de handshake de uma tabela colunar, em ordem de captura
+    def updateTable(self, table):
+        flags = table.flags
+        rows = np.flatnonzero(table.getTcpMask() & ((flags == FLAG_SYN) | (flags == (FLAG_SYN | FLAG_ACK))))
+        columns = (table.src, table.dst, table.sport, table.dport, table.seq, table.ack, flags, table.time)
+
+        for row in zip(*(column[rows].tolist() for column in columns)):
+            self.update(*row)
+
+    # remove SYNs pendentes mais antigos que o timeout
+    def evict(self, now):
+        while self.pending:
+            key, synTime = next(iter(self.pending.items()))
+            if now - synTime <= self.timeout:
+                break
+
+            self.pending.popitem(last=False)
+            self.expired += 1
+
+    # retorna handshakes associados com IPs em formato textual
+    def getPairs(self):
+        return [((PacketTable.intToIp(src), PacketTable.intToIp(dst), sport, dport), synTime, synAckTime)
+                for (src, dst, sport, dport), synTime, synAckTime in self.pairs]
+
+    # retorna RTTs dos handshakes em ordem de chegada dos SYN+ACK
+    def getRtts(self):
+        return np.array([synAckTime - synTime for _, synTime, synAckTime in self.pairs])
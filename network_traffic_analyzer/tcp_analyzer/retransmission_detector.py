@@ -0,0 +1,147 @@
+from collections import OrderedDict
+import numpy as np
+from network_traffic_analyzer.packet_table.packet_table import FLAG_FIN, FLAG_RST, FLAG_ACK
+
+# estado de um sentido de um fluxo TCP: maior sequência enviada, maior ACK recebido, janela de segmentos recentes e lacunas
+# números de sequência são desdobrados para inteiros sem volta em 2^32, relativos ao primeiro número visto
+class SegmentState():
+    __slots__ = ("base", "highest", "acked", "recent", "gaps", "lastTime")
+
+    def __init__(self, seq, time):
+        self.base = seq
+        self.highest = 0 # maior fim de sequência enviado, desdobrado
+        self.acked = None # maior ACK recebido do sentido oposto, desdobrado
+        self.recent = OrderedDict() # (início, fim) dos segmentos recentes -> tempo, limitado ao tamanho da janela
+        self.gaps = [] # lacunas [início, fim, tempo] deixadas por segmentos que chegaram adiantados
+        self.lastTime = time
+
+    # desdobra número de sequência de 32 bits para o valor mais próximo do maior fim enviado
+    def unwrap(self, seq):
+        value = (self.highest & ~0xFFFFFFFF) + ((seq - self.base) % 2**32)
+        if value - self.highest > 2**31:
+            value -= 2**32
+        elif self.highest - value > 2**31:
+            value += 2**32
+
+        return value
+
+# detector de retransmissões por fluxo: cada segmento com dados é classificado como novo, retransmissão,
+# retransmissão espúria (dados já confirmados pelo receptor) ou fora de ordem (preenche lacuna pouco depois de aberta)
+# o estado de um fluxo é descartado após FIN/RST (closeTimeout) ou inatividade (idleTimeout),
+# então a memória é proporcional aos fluxos ativos e não ao total de pacotes
+class RetransmissionDetector():
+    def __init__(self, windowSize=64, maxGaps=16, outOfOrderThreshold=3, idleTimeout=60000, closeTimeout=2000):
+        self.windowSize = windowSize # segmentos recentes lembrados por fluxo
+        self.maxGaps = maxGaps # lacunas lembradas por fluxo
+        self.outOfOrderThreshold = outOfOrderThreshold # ms após a abertura da lacuna em que um segmento é considerado fora de ordem
+        self.idleTimeout = idleTimeout
+        self.closeTimeout = closeTimeout
+        self.flows = OrderedDict() # (src, dst, sport, dport) -> SegmentState, em ordem de atividade
+        self.closing = OrderedDict() # chave do fluxo -> tempo do FIN/RST
+        self.tcpPackets = 0
+        self.dataSegments = 0
+        self.retransmissions = 0
+        self.spurious = 0 # retransmissões de dados já confirmados, incluídas em retransmissions
+        self.outOfOrder = 0
+
+    # classifica segmento com dados
+    def addSegment(self, flow, seq, payloadLen, time):
+        start = flow.unwrap(seq)
+        end = start + payloadLen
+        self.dataSegments += 1
+
+        if start >= flow.highest: # dados novos; um salto deixa lacuna
+            if start > flow.highest:
+                flow.gaps.append([flow.highest, start, time])
+                if len(flow.gaps) > self.maxGaps:
+                    flow.gaps.pop(0)
+            flow.highest = end
+
+        elif (start, end) not in flow.recent and self.fillGap(flow, start, end, time):
+            self.outOfOrder += 1
+
+        else:
+            self.retransmissions += 1
+            if flow.acked is not None and end <= flow.acked:
+                self.spurious += 1
+            flow.highest = max(flow.highest, end)
+
+        flow.recent[(start, end)] = time
+        flow.recent.move_to_end((start, end))
+        if len(flow.recent) > self.windowSize:
+            flow.recent.popitem(last=False)
+
+    # remove trecho preenchido de uma lacuna recente, retorna True se o segmento estava em uma
+    def fillGap(self, flow, start, end, time):
+        for i, (gapStart, gapEnd, gapTime) in enumerate(flow.gaps):
+            if gapStart <= start and end <= gapEnd:
+                if time - gapTime > self.outOfOrderThreshold:
+                    return False
+
+                pieces = [[gapStart, start, gapTime]] if start > gapStart else []
+                pieces += [[end, gapEnd, gapTime]] if end < gapEnd else []
+                flow.gaps[i:i + 1] = pieces
+                return True
+
+        return False
+
+    # descarta fluxos encerrados há mais de closeTimeout e fluxos sem pacotes há mais de idleTimeout
+    def evict(self, now):
+        while self.closing:
+            key, closeTime = next(iter(self.closing.items()))
+            if now - closeTime <= self.closeTimeout:
+                break
+
+            self.closing.popitem(last=False)
+            self.flows.pop(key, None)
+
+        while self.flows:
+            key, flow = next(iter(self.flows.items()))
+            if now - flow.lastTime <= self.idleTimeout:
+                break
+
+            self.flows.popitem(last=False)
+            self.closing.pop(key, None)
+
+    # processa um pacote TCP a partir dos seus campos
+    def update(self, src, dst, sport, dport, seq, ack, flags, payloadLen, time):
+        self.evict(time)
+        self.tcpPackets += 1
+        key = (src, dst, sport, dport)
+
+        if flags & FLAG_ACK:
+            reverse = self.flows.get((dst, src, dport, sport))
+            if reverse is not None:
+                acked = reverse.unwrap(ack)
+                reverse.acked = acked if reverse.acked is None else max(reverse.acked, acked)
+
+        if payloadLen > 0:
+            flow = self.flows.get(key)
+            if flow is None:
+                flow = self.flows[key] = SegmentState(seq, time)
+            else:
+                self.flows.move_to_end(key)
+            flow.lastTime = time
+            self.addSegment(flow, seq, payloadLen, time)
+
+        if flags & (FLAG_FIN | FLAG_RST) and key in self.flows:
+            self.closing[key] = time
+            self.closing.move_to_end(key)
+
+    # processa os pacotes TCP de uma tabela colunar, em ordem de captura
+    def updateTable(self, table):
+        rows = np.flatnonzero(table.getTcpMask())
+        columns = (table.src, table.dst, table.sport, table.dport, table.seq, table.ack, table.flags, table.payloadLen, table.time)
+
+        for row in zip(*(column[rows].tolist() for column in columns)):
+            self.update(*row)
+
+    # retorna contadores do detector
+    def getCounters(self):
+        return {"tcpPackets": self.tcpPackets,
+                "dataSegments": self.dataSegments,
+                "retransmissions": self.retransmissions,
+                "spuriousRetransmissions": self.spurious,
+                "outOfOrder": self.outOfOrder,
+                "activeFlows": len(self.flows)
+                }
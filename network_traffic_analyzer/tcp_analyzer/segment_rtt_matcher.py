@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from array import array
+from bisect import bisect_left, bisect_right, insort
+import numpy as np
+from network_traffic_analyzer.packet_table.packet_table import FLAG_SYN, FLAG_RST, FLAG_ACK
+
+# segmentos enviados e ainda não confirmados de um sentido de um fluxo, ordenados pelo fim da sequência
+# números de sequência são desdobrados para inteiros sem volta em 2^32, relativos ao primeiro número visto
+class OutstandingSegments():
+    __slots__ = ("base", "highest", "starts", "ends", "times", "retransmitted", "lastTime")
+
+    def __init__(self, seq, time):
+        self.base = seq # primeiro número de sequência visto no fluxo
+        self.highest = 0 # maior fim de sequência enviado, desdobrado
+        self.starts = [] # início de sequência de cada segmento pendente
+        self.ends = [] # fins de sequência dos segmentos pendentes, em ordem crescente
+        self.times = [] # tempo de envio de cada segmento pendente
+        self.retransmitted = [] # segmento retransmitido: RTT ambíguo, descartado (regra de Karn)
+        self.lastTime = time
+
+    # desdobra número de sequência de 32 bits para o valor mais próximo do maior fim enviado
+    def unwrap(self, seq):
+        value = (self.highest & ~0xFFFFFFFF) + ((seq - self.base) % 2**32)
+        if value - self.highest > 2**31:
+            value -= 2**32
+        elif self.highest - value > 2**31:
+            value += 2**32
+
+        return value
+
+    # remove os count segmentos mais antigos (menores fins de sequência)
+    def dropOldest(self, count=1):
+        del self.starts[:count]
+        del self.ends[:count]
+        del self.times[:count]
+        del self.retransmitted[:count]
+
+# estima RTT por segmento de dados: cada segmento é associado ao primeiro ACK do sentido oposto que cobre o seu fim
+# segmentos retransmitidos não geram amostras (regra de Karn); cada ACK é resolvido por busca binária nos pendentes do fluxo
+# a memória é limitada por maxSegmentsPerFlow e maxSegments, removendo os segmentos mais antigos, e por idleTimeout por fluxo
+class SegmentRttMatcher():
+    def __init__(self, maxSegmentsPerFlow=1024, maxSegments=1000000, idleTimeout=60000):
+        self.maxSegmentsPerFlow = maxSegmentsPerFlow
+        self.maxSegments = maxSegments
+        self.idleTimeout = idleTimeout # tempo em ms sem pacotes após o qual o estado do fluxo é descartado
+        self.flows = OrderedDict() # (src, dst, sport, dport) -> OutstandingSegments, em ordem de atividade
+        self.pending = 0 # total de segmentos pendentes em todos os fluxos
+        self.rtts = array("d")
+        self.ackTimes = array("d") # tempo do ACK de cada amostra
+        self.discarded = 0 # segmentos confirmados sem amostra por terem sido retransmitidos
+        self.evicted = 0 # segmentos removidos pelos limites de memória ou por inatividade do fluxo
+
+    # registra segmento de dados enviado
+    def addSegment(self, key, seq, payloadLen, time):
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = self.flows[key] = OutstandingSegments(seq, time)
+        else:
+            self.flows.move_to_end(key)
+        flow.lastTime = time
+
+        start = flow.unwrap(seq)
+        end = start + payloadLen
+
+        # retransmissão total ou parcial: todo segmento pendente cuja faixa [início, fim) se sobrepõe a [start, end)
+        # fica ambíguo, inclusive os que terminam depois dela; os inícios não são ordenados, então a busca binária
+        # só limita os candidatos pelo fim
+        if start < flow.highest:
+            for i in range(bisect_right(flow.ends, start), len(flow.ends)):
+                if flow.starts[i] < end:
+                    flow.retransmitted[i] = True
+
+        if end <= flow.highest:
+            return
+
+        flow.highest = end
+        i = bisect_left(flow.ends, end)
+        flow.starts.insert(i, start)
+        flow.ends.insert(i, end)
+        flow.times.insert(i, time)
+        flow.retransmitted.insert(i, False)
+        self.pending += 1
+
+        if len(flow.ends) > self.maxSegmentsPerFlow:
+            flow.dropOldest()
+            self.pending -= 1
+            self.evicted += 1
+
+        while self.pending > self.maxSegments:
+            self.evictOldest()
+
+    # associa ACK cumulativo aos segmentos pendentes do sentido oposto cujo fim ele cobre
+    def addAck(self, key, ack, time):
+        flow = self.flows.get(key)
+        if flow is None or not flow.ends:
+            return
+
+        covered = bisect_right(flow.ends, flow.unwrap(ack))
+        for i in range(covered):
+            if flow.retransmitted[i]:
+                self.discarded += 1
+            else:
+                self.rtts.append(time - flow.times[i])
+                self.ackTimes.append(time)
+
+        flow.dropOldest(covered)
+        self.pending -= covered
+
+    # remove o segmento mais antigo do fluxo com atividade mais antiga que ainda tem pendentes
+    def evictOldest(self):
+        for flow in self.flows.values():
+            if flow.ends:
+                flow.dropOldest()
+                self.pending -= 1
+                self.evicted += 1
+                return
+
+    # descarta estado de fluxos sem pacotes há mais de idleTimeout
+    def evict(self, now):
+        while self.flows:
+            key, flow = next(iter(self.flows.items()))
+            if now - flow.lastTime <= self.idleTimeout:
+                break
+
+            self.flows.popitem(last=False)
+            self.pending -= len(flow.ends)
+            self.evicted += len(flow.ends)
+
+    # processa um pacote TCP a partir dos seus campos
+    def update(self, src, dst, sport, dport, seq, ack, flags, payloadLen, time):
+        self.evict(time)
+
+        if flags & FLAG_ACK and not flags & (FLAG_SYN | FLAG_RST):
+            self.addAck((dst, src, dport, sport), ack, time)
+
+        if payloadLen > 0:
+            self.addSegment((src, dst, sport, dport), seq, payloadLen, time)
+
+    # processa os segmentos com dados ou ACK de uma tabela colunar, em ordem de captura
+    def updateTable(self, table):
+        rows = np.flatnonzero(table.getTcpMask() & ((table.payloadLen > 0) | ((table.flags & FLAG_ACK) != 0)))
+        columns = (table.src, table.dst, table.sport, table.dport, table.seq, table.ack, table.flags, table.payloadLen, table.time)
+
+        for row in zip(*(column[rows].tolist() for column in columns)):
+            self.update(*row)
+
+    # retorna cópia dos RTTs por segmento, em ordem de chegada dos ACKs
+    # uma view do buffer impediria o matcher de acrescentar amostras enquanto ela existir
+    def getRtts(self):
+        return np.array(self.rtts, dtype=np.float64)
+
+    # retorna cópia do tempo do ACK de cada amostra de RTT
+    def getAckTimes(self):
+        return np.array(self.ackTimes, dtype=np.float64)
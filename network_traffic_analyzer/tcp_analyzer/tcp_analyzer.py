@@ -1,13 +1,25 @@
 from scapy.all import TCP
 import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
 from network_traffic_analyzer.packet_analyzer import PacketAnalyzer
-from network_traffic_analyzer.ip_analyzer import IpAnalyzer
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import FLAG_SYN
+from network_traffic_analyzer.tcp_analyzer.handshake_matcher import HandshakeMatcher
+from network_traffic_analyzer.tcp_analyzer.retransmission_detector import RetransmissionDetector
+from network_traffic_analyzer.tcp_analyzer.segment_rtt_matcher import SegmentRttMatcher
+from network_traffic_analyzer.tcp_analyzer.tcp_stages import TcpRttStage, TcpLossStage
+from network_traffic_analyzer.packet_analyzer.table_stages import IntervalStage
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+from network_traffic_analyzer.running_stats import RunningStats
+from network_traffic_analyzer.stats_cache import cached
 
 # analisador de camada TCP
 class TcpAnalyzer(PacketAnalyzer):
+    cacheState = PacketAnalyzer.cacheState + ("handshakeTimeout",)
 
-    def __init__(self, id=None, packetsMargin=None, path=None):
-        super().__init__(id, packetsMargin, path)
+    def __init__(self, id=None, packetsMargin=None, path=None, streaming=False, decoder="scapy", timeMargin=None, workers=None, tableCache=None):
+        super().__init__(id, packetsMargin, path, streaming, decoder, timeMargin, workers, tableCache)
+        self.handshakeTimeout = 60000 # tempo máximo em ms entre SYN e SYN+ACK para associar o handshake
 
     # retorna TCP source port
     def getTcpSport(self, pkt):
@@ -56,140 +68,142 @@ class TcpAnalyzer(PacketAnalyzer):
             return None
 
     # retorna lista de números de sequência TCP em ordem crescente (sem duplicatas)
+    @cached
     def getTcpSeqsList(self):
-        seqsSet = set()
-        for pkt in self.getPackets():
-            if TCP in pkt:
-                seqsSet.add(self.getTcpSeq(pkt))
+        table = self.getTable()
 
-        return sorted(list(seqsSet)) if seqsSet else []
+        return np.unique(table.seq[table.getTcpMask()]).tolist()
 
-    # retorna pares tuplas com atributos TCP e IP e pacote equivalente para cada pacote TCP
+    # retorna chaves (src, dst, sport, dport, seq) de cada pacote TCP e índice do pacote na janela de análise
+    # montadas a partir das colunas da tabela, sem ler pacotes com scapy nem guardá-los
+    @cached
     def getTcpKeys(self):
-        tcpKeys = {}
-        for pkt in self.getPackets():
-            if TCP in pkt:
-                key = (
-                    IpAnalyzer.getSrcIp(pkt),
-                    IpAnalyzer.getDstIp(pkt),
-                    self.getTcpSport(pkt),
-                    self.getTcpDport(pkt),
-                    self.getTcpSeq(pkt)
-                )
-                tcpKeys[key] = pkt
-
-        return tcpKeys
+        table = self.getTable()
+        rows = np.flatnonzero(table.getTcpMask())
+        src, dst = table.src[rows], table.dst[rows]
+        ips = {value: PacketTable.intToIp(value) for value in np.unique(np.concatenate((src, dst))).tolist()}
+
+        return {(ips[s], ips[d], sport, dport, seq): row
+                for s, d, sport, dport, seq, row in zip(src.tolist(), dst.tolist(), table.sport[rows].tolist(),
+                                                        table.dport[rows].tolist(), table.seq[rows].tolist(), rows.tolist())}
     
-    # retorna pacote filtrado por chave
+    # retorna pacote filtrado por chave, lido da captura só quando pedido
     # override
     def getPacketByKey(self, key):
-        return self.getTcpKeys().get(key)
+        row = self.getTcpKeys().get(key)
+
+        return self.getPacket(row) if row is not None else None
     
+    # acrescenta handshakes, intervalos entre SYNs e retransmissões à passagem incremental
+    # override
+    def getStreamStages(self):
+        return super().getStreamStages() + [TcpRttStage(self.handshakeTimeout), IntervalStage("TCP"), TcpLossStage(self.handshakeTimeout)]
+
+    # retorna handshakes associados em uma passagem: lista de (chave do fluxo, tempo do SYN, tempo do SYN+ACK) e RTTs
+    @cached
+    def getHandshakes(self):
+        if self.usesStreamResults():
+            tcpRtt = self.getStreamResults().get("tcpRtt")
+            return {"pairs": tcpRtt.get("handshakes"), "rtts": tcpRtt.get("rtts"), "expired": tcpRtt.get("expired")}
+
+        matcher = HandshakeMatcher(self.handshakeTimeout)
+        matcher.updateTable(self.getTable())
+
+        return {"pairs": matcher.getPairs(),
+                "rtts": matcher.getRtts(),
+                "expired": matcher.expired
+                }
+
     # retorna estatísticas de RTT baseado no handshake SYN ↔ SYN+ACK
     # override
+    @cached
     def getRttStats(self):
-        # dicionário para armazenar timestamp de SYNs:
-        synTimes = {}
-        rtts = []
-
-        for pkt in self.getPackets():
-            if TCP in pkt:
-                flags = self.getTcpFlags(pkt)
-                src = IpAnalyzer.getSrcIp(pkt)
-                dst = IpAnalyzer.getDstIp(pkt)
-                sport = self.getTcpSport(pkt)
-                dport = self.getTcpDport(pkt)
-                seq = self.getTcpSeq(pkt)
-
-                # SYN sem ACK
-                if flags == "S":
-                    key = (src, dst, sport, dport, seq)
-                    synTimes[key] = self.getTime(pkt)
-
-                # SYN+ACK
-                elif flags == "SA":
-                    # ackNum = número de sequência original + 1, então seqRequest = ack - 1
-                    ackNum = self.getTcpAck(pkt) - 1
-                    # chave reversa do SYN original
-                    revKey = (dst, src, dport, sport, ackNum)
-                    if revKey in synTimes:
-                        rtt = self.getTimeDiff(self.getPacketByKey(revKey), pkt)
-                        rtts.append(rtt)
-
-        mean = np.mean(rtts) if rtts else 0
-        std = np.std(rtts) if rtts else 0
-        maximum = np.max(rtts) if rtts else 0
-        minimum = np.min(rtts) if rtts else 0
-        error = std / np.sqrt(len(rtts)) if len(rtts) > 0 else 0
-        cv = (std / mean) * 100 if mean > 0 else 0
-
-        return {
-            "rtts": rtts,
-            "mean": mean,
-            "std": std,
-            "max": maximum,
-            "min": minimum,
-            "error": error,
-            "cv": cv
-        }
+        handshakes = self.getHandshakes()
+        rtts = handshakes.get("rtts")
+
+        runningStats = RunningStats().updateBatch(rtts)
+
+        stats = runningStats.getStats()
+        stats["rtts"] = rtts
+        stats["handshakes"] = handshakes.get("pairs")
+        stats["runningStats"] = runningStats # acumulador combinável com o de outras capturas ou partes
+        stats["sketch"] = QuantileSketch().updateBatch(rtts) # esboço de quantis, também combinável
+        stats["percentiles"] = stats["sketch"].getPercentiles()
+        stats["histogram"] = BinnedHistogram().updateBatch(rtts) # histograma de bins fixos, também combinável
+
+        return stats
+
+    # retorna estatísticas de RTT por segmento de dados: cada segmento é associado ao primeiro ACK que o cobre,
+    # sem amostras de segmentos retransmitidos (regra de Karn)
+    @cached
+    def getDataRttStats(self, maxSegmentsPerFlow=1024, maxSegments=1000000):
+        matcher = SegmentRttMatcher(maxSegmentsPerFlow, maxSegments, self.handshakeTimeout)
+        self.scanTables(matcher.updateTable)
+        rtts = matcher.getRtts()
+        runningStats = RunningStats().updateBatch(rtts)
+
+        stats = runningStats.getStats()
+        stats["rtts"] = rtts
+        stats["ackTimes"] = matcher.getAckTimes()
+        stats["discarded"] = matcher.discarded
+        stats["evicted"] = matcher.evicted
+        stats["runningStats"] = runningStats
+        stats["sketch"] = QuantileSketch().updateBatch(rtts)
+        stats["percentiles"] = stats["sketch"].getPercentiles()
+        stats["histogram"] = BinnedHistogram().updateBatch(rtts)
+
+        return stats
     
     # retorna estatísticas de intervalo de chegada entre pacotes SYN
     # override
+    @cached
     def getIntervalStats(self):
         if self.getTotalPackets() < 2:
             print("There is no way to measure interval with less than two packets")
             return None
 
-        syn_times = []
-        for pkt in self.getPackets():
-            if TCP in pkt and self.getTcpFlags(pkt) == "S":
-                syn_times.append(self.getTime(pkt))
+        if self.usesStreamResults():
+            return self.getStreamResults().get("tcpInterval")
 
-        intervals = np.diff(np.array(syn_times)) if len(syn_times) > 1 else np.array([])
-        mean = np.mean(intervals) if intervals.size > 0 else 0
-        std = np.std(intervals) if intervals.size > 0 else 0
-        maximum = np.max(intervals) if intervals.size > 0 else 0
-        minimum = np.min(intervals) if intervals.size > 0 else 0
-        error = std / np.sqrt(intervals.size) if intervals.size > 0 else 0
-        cv = (std / mean) * 100 if mean > 0 else 0
+        table = self.getTable()
+        syn_times = table.time[table.getTcpMask() & (table.flags == FLAG_SYN)]
 
-        return {
-            "intervals": intervals,
-            "mean": mean,
-            "std": std,
-            "max": maximum,
-            "min": minimum,
-            "error": error,
-            "cv": cv
-        }
+        intervals = np.diff(syn_times) if len(syn_times) > 1 else np.array([])
+        runningStats = RunningStats().updateBatch(intervals)
 
-    # retorna estatísticas de perda/retransmissão de pacotes TCP
+        stats = runningStats.getStats()
+        stats["intervals"] = intervals
+        stats["runningStats"] = runningStats
+        stats["sketch"] = QuantileSketch().updateBatch(intervals)
+        stats["percentiles"] = stats["sketch"].getPercentiles()
+        stats["histogram"] = BinnedHistogram().updateBatch(intervals)
+
+        return stats
+
+    # retorna estatísticas de perda/retransmissão de segmentos TCP com dados: total, únicos, retransmissões
+    # (incluindo espúrias) e fora de ordem; ACKs puros não são contados
     # override
+    @cached
     def getLossStats(self):
-        total = 0
-        seq_counts = {}
-        for pkt in self.getPackets():
-            if TCP in pkt:
-                total += 1
-                key = (
-                    IpAnalyzer.getSrcIp(pkt),
-                    IpAnalyzer.getDstIp(pkt),
-                    pkt[TCP].sport,
-                    pkt[TCP].dport,
-                    pkt[TCP].seq
-                )
-                seq_counts[key] = seq_counts.get(key, 0) + 1
-
-        # retransmissões ocorrem quando count > 1 para um mesmo key
-        retransmissions = sum(count - 1 for count in seq_counts.values() if count > 1)
-        received_unique = len(seq_counts)
-        loss_rate = (retransmissions * 100) / total if total > 0 else 0
+        if self.usesStreamResults():
+            return self.getStreamResults().get("tcpLoss")
+
+        detector = RetransmissionDetector(idleTimeout=self.handshakeTimeout)
+        detector.updateTable(self.getTable())
+        counters = detector.getCounters()
+
+        total = counters.get("dataSegments")
+        retransmissions = counters.get("retransmissions")
+        lossRate = (retransmissions * 100) / total if total > 0 else 0
 
         return {
             "totalPackets": total,
-            "uniquePackets": received_unique,
+            "uniquePackets": total - retransmissions,
             "retransmissions": retransmissions,
-            "lossRate": loss_rate
+            "spuriousRetransmissions": counters.get("spuriousRetransmissions"),
+            "outOfOrder": counters.get("outOfOrder"),
+            "tcpPackets": counters.get("tcpPackets"),
+            "lossRate": lossRate
         }
 
     # imprime métricas TCP
@@ -218,8 +232,24 @@ class TcpAnalyzer(PacketAnalyzer):
         minimum = stats.get("min")
         error = stats.get("error")
         cv = stats.get("cv")
+        percentiles = stats.get("percentiles")
 
-        return super().printRttMetrics(layer, mean, std, maximum, minimum, error, cv)
+        return super().printRttMetrics(layer, mean, std, maximum, minimum, error, cv, percentiles)
+
+    # imprime métricas de RTT por segmento de dados
+    def printDataRttMetrics(self):
+        layer = "TCP data"
+        stats = self.getDataRttStats()
+        mean = stats.get("mean")
+        std = stats.get("std")
+        maximum = stats.get("max")
+        minimum = stats.get("min")
+        error = stats.get("error")
+        cv = stats.get("cv")
+        percentiles = stats.get("percentiles")
+
+        print(f"TCP data RTT samples: {stats.get('count')} ({stats.get('discarded')} retransmitted segments discarded)")
+        return super().printRttMetrics(layer, mean, std, maximum, minimum, error, cv, percentiles)
 
     # override
     def printIntervalMetrics(self):
@@ -231,8 +261,9 @@ class TcpAnalyzer(PacketAnalyzer):
         minimum = stats.get("min")
         error = stats.get("error")
         cv = stats.get("cv")
+        percentiles = stats.get("percentiles")
 
-        return super().printIntervalMetrics(layer, mean, std, maximum, minimum, error, cv)
+        return super().printIntervalMetrics(layer, mean, std, maximum, minimum, error, cv, percentiles)
 
     # override
     def printLossMetrics(self):
@@ -243,6 +274,8 @@ class TcpAnalyzer(PacketAnalyzer):
         retrans = stats.get("retransmissions")
         lossRate = stats.get("lossRate")
 
+        print(f"{layer} spurious retransmissions: {stats.get('spuriousRetransmissions')}")
+        print(f"{layer} out-of-order segments: {stats.get('outOfOrder')}")
         return super().printLossMetrics(layer, total, unique, retrans, lossRate)
 
     # plotagem de gráficos TCP
@@ -259,10 +292,12 @@ class TcpAnalyzer(PacketAnalyzer):
     # override
     def plotRttGraph(self, path):
         id = self.getId()
-        xAxis = self.getTcpSeqsList()
-        rtts = self.getRttStats().get("rtts")
+        stats = self.getRttStats()
+        rtts = stats.get("rtts")
+        startTime = self.getTable().time[0] if self.getTotalPackets() > 0 else 0
+        xAxis = [synTime - startTime for _, synTime, _ in stats.get("handshakes")] # instante de cada SYN associado
         title = None
-        xLabel = "TCP sequence number"
+        xLabel = "Capture time (ms)"
         yLabel = "RTT (ms)"
         return super().plotRttGraph(path, id, xAxis, rtts, title, xLabel, yLabel)
 
@@ -279,20 +314,20 @@ class TcpAnalyzer(PacketAnalyzer):
     # override
     def plotRttHistogram(self, path):
         id = self.getId()
-        rtts = self.getRttStats().get("rtts")
+        histogram = self.getRttStats().get("histogram")
         title = None
         xLabel = "RTT (ms)"
         yLabel = "Frequency"
-        return super().plotRttHistogram(path, id, rtts, title, xLabel, yLabel)
+        return super().plotRttHistogram(path, id, histogram, title, xLabel, yLabel)
 
     # override
     def plotIntervalHistogram(self, path):
         id = self.getId()
-        intervals = self.getIntervalStats().get("intervals")
+        histogram = self.getIntervalStats().get("histogram")
         title = None
         xLabel = "Interval (ms)"
         yLabel = "Frequency"
-        return super().plotIntervalHistogram(path, id, intervals, title, xLabel, yLabel)
+        return super().plotIntervalHistogram(path, id, histogram, title, xLabel, yLabel)
 
     # override
     def plotLossGraph(self, path):
@@ -0,0 +1,116 @@
+import numpy as np
+from network_traffic_analyzer.packet_analyzer.table_stages import PipelineStage, getSampleStats, hashKeys
+from network_traffic_analyzer.packet_table.packet_table import FLAG_ACK, FLAG_SYN
+from network_traffic_analyzer.tcp_analyzer.handshake_matcher import HandshakeMatcher
+from network_traffic_analyzer.tcp_analyzer.retransmission_detector import RetransmissionDetector
+
+# retorna índices das linhas de mask e chave de partição da conexão de cada uma, igual nos dois sentidos
+def getConnectionKeys(table, mask):
+    rows = np.flatnonzero(mask)
+    source = (table.src[rows].astype(np.int64) << 16) | table.sport[rows]
+    destination = (table.dst[rows].astype(np.int64) << 16) | table.dport[rows]
+
+    return rows, hashKeys(np.minimum(source, destination), np.maximum(source, destination))
+
+# RTT TCP pelo handshake SYN ↔ SYN+ACK, com o estado do HandshakeMatcher mantido entre lotes
+class TcpRttStage(PipelineStage):
+    name = "tcpRtt"
+    parallel = "partition"
+
+    def __init__(self, timeout=60000):
+        self.matcher = HandshakeMatcher(timeout)
+        self.positions = [] # índice na captura do SYN+ACK de cada handshake, para ordenar partições em merge
+
+    # override
+    def update(self, table):
+        self.matcher.updateTable(table)
+
+    # override
+    def getResult(self):
+        stats = getSampleStats(self.matcher.getRtts(), "rtts")
+        stats["handshakes"] = self.matcher.getPairs()
+        stats["expired"] = self.matcher.expired
+
+        return stats
+
+    # override
+    def getPartitionKeys(self, table):
+        flags = table.flags
+
+        return getConnectionKeys(table, table.getTcpMask() & ((flags == FLAG_SYN) | (flags == (FLAG_SYN | FLAG_ACK))))
+
+    # override
+    def updatePartition(self, table, index, previous):
+        matcher = self.matcher
+        columns = (table.src, table.dst, table.sport, table.dport, table.seq, table.ack, table.flags, table.time)
+
+        for position, before, row in zip(index.tolist(), previous.tolist(), zip(*(column.tolist() for column in columns))):
+            matcher.evict(before) # SYN repetido só substitui o anterior se nenhum pacote de outra partição o expirou antes
+            count = len(matcher.pairs)
+            matcher.update(*row)
+            if len(matcher.pairs) > count:
+                self.positions.append(position)
+
+    # override
+    def finishPartition(self, lastTime):
+        self.matcher.evict(lastTime)
+
+    # override
+    def merge(self, other):
+        positions = self.positions + other.positions
+        pairs = self.matcher.pairs + other.matcher.pairs
+        order = np.argsort(positions, kind="stable").tolist()
+
+        self.positions = [positions[i] for i in order]
+        self.matcher.pairs = [pairs[i] for i in order]
+        self.matcher.expired += other.matcher.expired
+
+# retransmissões TCP por fluxo, com o estado do RetransmissionDetector mantido entre lotes
+class TcpLossStage(PipelineStage):
+    name = "tcpLoss"
+    parallel = "partition"
+
+    def __init__(self, idleTimeout=60000):
+        self.detector = RetransmissionDetector(idleTimeout=idleTimeout)
+
+    # override
+    def update(self, table):
+        self.detector.updateTable(table)
+
+    # override
+    def getResult(self):
+        counters = self.detector.getCounters()
+        total = counters.get("dataSegments")
+        retransmissions = counters.get("retransmissions")
+
+        return {"totalPackets": total,
+                "uniquePackets": total - retransmissions,
+                "retransmissions": retransmissions,
+                "spuriousRetransmissions": counters.get("spuriousRetransmissions"),
+                "outOfOrder": counters.get("outOfOrder"),
+                "tcpPackets": counters.get("tcpPackets"),
+                "lossRate": (retransmissions * 100) / total if total > 0 else 0
+                }
+
+    # override
+    def getPartitionKeys(self, table):
+        return getConnectionKeys(table, table.getTcpMask())
+
+    # override
+    def updatePartition(self, table, index, previous):
+        self.detector.updateTable(table)
+
+    # override
+    def finishPartition(self, lastTime):
+        self.detector.evict(lastTime)
+
+    # override
+    def merge(self, other):
+        detector, counters = self.detector, other.detector
+        detector.tcpPackets += counters.tcpPackets
+        detector.dataSegments += counters.dataSegments
+        detector.retransmissions += counters.retransmissions
+        detector.spurious += counters.spurious
+        detector.outOfOrder += counters.outOfOrder
+        detector.flows.update(counters.flows)
+        detector.closing.update(counters.closing)
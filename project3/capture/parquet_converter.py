@@ -1,34 +1,8 @@
-import pandas as pd
-from scapy.all import PcapReader
+from network_traffic_analyzer.parquet_converter import ParquetConverter
 
-# leitura PCAP e extração dos campos
-records = [] # lista de dicionarios com registros de pacotes
-packets = PcapReader("200701011800.dump")
+# leitura PCAP em fluxo e gravação em parquet com pyarrow, um row group por lote de pacotes
+converter = ParquetConverter("200701011800.dump", "capture.parquet", batchSize=65536, compression="snappy")
+result = converter.convert()
 
-for pkt in packets:
-    ts = pkt.time # timestamp
-    length = len(pkt) # tamanho do pacote em bytes
-    protoNum = pkt["IP"].proto if pkt.haslayer("IP") else None # número do protocolo
-
-    # mapeia número de protocolo para nome
-    protoMap = {6: "TCP", 17: "UDP", 1: "ICMP"}
-    protoName = protoMap.get(protoNum, str(protoNum) if protoNum is not None else None) # nome do protocolo
-
-    records.append({
-        "timestamp": ts,
-        "size": length,
-        "type": protoName,
-    })
-
-# cria DataFrame e converte timestamp
-df = pd.DataFrame(records) # converte em dataframe, cada dicionario é uma linha com valores e cada chave é uma coluna
-df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce') # converte string para float
-df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")  # converte de epoch
-
-# filtra somente pacotes que interessam
-#df = df[df["type"].isin(["TCP","UDP"])]
-
-# grava em parquet com pyarrow
-df.to_parquet("capture.parquet", engine="pyarrow", compression="snappy", index=False)
-
-packets.close()
+if result is not None:
+    print(f"Converted {result['totalPackets']} packets into {result['rowGroups']} row groups")
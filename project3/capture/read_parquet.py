@@ -1,79 +1,70 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
-import matplotlib.pyplot as plt
+from network_traffic_analyzer.capture_query import CaptureQuery
+from network_traffic_analyzer.capture_aggregator import CaptureAggregator
+from network_traffic_analyzer.graph_plotter import GraphPlotter
 
 # Ler o arquivo Parquet
 file = 'capture.parquet'
-df = pd.read_parquet(file, engine='pyarrow')
+query = CaptureQuery(file)
 
-# Mostrar informações básicas
-print(f"Quantidade total de registros: {len(df)}")
+# Mostrar informações básicas (contagem pelos metadados, sem ler as colunas)
+print(f"Quantidade total de registros: {query.count()}")
 print("\nPrimeiros 10 registros:")
-print(df.head(10))
+print(query.dataset.head(10))
 
 print("\nTipos de dados por coluna:")
-print(df.dtypes)
+print(query.dataset.schema)
 
-# Converter para datetime se ainda não estiver
-df['timestamp'] = pd.to_datetime(df['timestamp'])
+# Contagem de pacotes e bytes por protocolo
+protocols = CaptureAggregator(query.read(columns=['type', 'size'])).getProtocolCounts()
+for name, packets, nBytes in zip(protocols.get('protocols'), protocols.get('packets'), protocols.get('bytes')):
+    print(f"{name}: {packets} pacotes, {nBytes} bytes")
 '''
 # Criar gráfico de distribuição do tamanho dos pacotes por tipo de protocolo
-plt.figure(figsize=(10, 6), dpi=300)
+histogram = GraphPlotter(title="Distribuição do tamanho dos pacotes por tipo de protocolo", xLabel="Tamanho do pacote (bytes)", yLabel="Frequência")
 
 # Verificar se as colunas 'type' e 'size' existem e são válidas
-if 'type' in df.columns and 'size' in df.columns:
-    for t in df['type'].dropna().unique():
-        subset = df[df['type'] == t]
-        plt.hist(subset['size'], bins=50, alpha=0.6, label=str(t))
-
-    plt.title("Distribuição do tamanho dos pacotes por tipo de protocolo")
-    plt.xlabel("Tamanho do pacote (bytes)")
-    plt.ylabel("Frequência")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
+if 'type' in query.dataset.schema.names and 'size' in query.dataset.schema.names:
+    for t in protocols.get('protocols'):
+        if t is None:
+            continue
+        sizes = CaptureAggregator(query.read(columns=['size'], protocols=[t])).getSizeHistogram(bins=50)
+        histogram.plotHistogram(sizes.get('edges')[:-1], sizes.get('edges'), plotLabel=str(t), weights=sizes.get('counts'))
 
     # Salvar o gráfico em alta qualidade
     output_file = "distribuicao_tamanho_pacotes.png"
-    plt.savefig(output_file, dpi=300)
+    histogram.saveGraph(output_file, dpi=300)
     print(f"Gráfico salvo como: {output_file}")
 else:
     print("❌ As colunas 'type' ou 'size' não foram encontradas para gerar o gráfico.")
 '''
 
-def graficar_tcp(df, output_file='tcp_tamanho_distribuicao.png'):
+def graficar_tcp(query, output_file='tcp_tamanho_distribuicao.png'):
     """
-    Filtra apenas pacotes TCP e gera a distribuição do tamanho.
+    Lê apenas a coluna de tamanho dos pacotes TCP e gera a distribuição do tamanho.
 
     Args:
-        df (pd.DataFrame): DataFrame contendo as colunas 'type' e 'size'.
+        query (CaptureQuery): Consulta sobre o arquivo ou diretório Parquet.
         output_file (str): Caminho do arquivo PNG de saída.
     """
-    if 'type' not in df.columns or 'size' not in df.columns:
-        print("❌ O DataFrame não contém as colunas necessárias.")
+    if 'type' not in query.dataset.schema.names or 'size' not in query.dataset.schema.names:
+        print("❌ O arquivo Parquet não contém as colunas necessárias.")
         return
 
-    df_tcp = df[df['type'] == 'TCP']
+    sizes = CaptureAggregator(query.read(columns=['size'], protocols=['TCP'])).getSizeHistogram(bins=50)
 
-    if df_tcp.empty:
-        print("Nenhum pacote TCP encontrado no DataFrame.")
+    if sizes is None:
+        print("Nenhum pacote TCP encontrado no arquivo.")
         return
 
-    # Gerar gráfico
-    plt.figure(figsize=(10, 6), dpi=300)
-    plt.hist(df_tcp['size'], bins=50, color='skyblue', edgecolor='black', alpha=0.7)
-    plt.title("Distribuição do tamanho dos pacotes TCP")
-    plt.xlabel("Tamanho do pacote (bytes)")
-    plt.ylabel("Frequência")
-    plt.grid(True)
-    plt.tight_layout()
+    # Gerar gráfico a partir das contagens já agrupadas em bins
+    histogram = GraphPlotter(title="Distribuição do tamanho dos pacotes TCP", xLabel="Tamanho do pacote (bytes)", yLabel="Frequência",
+                             legendFlag=False)
+    histogram.plotHistogram(sizes.get('edges')[:-1], sizes.get('edges'), color='skyblue', weights=sizes.get('counts'))
 
-    plt.savefig(output_file, dpi=300)
+    histogram.saveGraph(output_file, dpi=300)
     print(f"Gráfico TCP salvo como: {output_file}")
 
 
-# Garantir que a coluna timestamp está no formato datetime, se necessário
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-
 # Chamar a função para gerar gráfico apenas para pacotes TCP
-#graficar_tcp(df)
+#graficar_tcp(query)
@@ -4,4 +4,9 @@ setup(
   name="network_traffic_analyzer",
   version="0.1",
   packages=find_packages(),
+  entry_points={
+    "console_scripts": [
+      "network-report=network_traffic_analyzer.report_engine.report_engine:main",
+    ],
+  },
 )
\ No newline at end of file
@@ -0,0 +1,66 @@
+from scapy.all import Ether, PcapReader
+import numpy as np
+import tempfile
+import time
+import sys
+import os
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import COLUMNS
+from network_traffic_analyzer.pcap_decoder import PcapDecoder
+from test_pcap_decoder import getIpPackets, writeCapture
+
+# pacotes por segundo dos decodificadores rápido e scapy em uma captura, com verificação de paridade das colunas
+# sem captura, gera uma com os pacotes de test_pcap_decoder repetidos até o total pedido
+# uso: python tests/bench_pcap_decoder.py [captura.pcap | total de pacotes]
+
+# retorna tabela decodificada e tempo gasto por cada decodificador
+def decodeTimed(path):
+    begin = time.perf_counter()
+    with PcapDecoder(path) as decoder:
+        if not decoder.isSupported():
+            return None
+        fastTable = decoder.decode()
+    fastTime = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    with PcapReader(path) as reader:
+        scapyTable = PacketTable.fromPackets(reader)
+    scapyTime = time.perf_counter() - begin
+
+    return fastTable, fastTime, scapyTable, scapyTime
+
+def main(argv):
+    arg = argv[1] if len(argv) > 1 else "100000"
+
+    with tempfile.TemporaryDirectory() as directory:
+        if arg.isdigit():
+            packets = getIpPackets()
+            packets = [Ether()/packets[i % len(packets)] for i in range(int(arg))]
+            path = writeCapture(os.path.join(directory, "bench.pcap"), packets)
+        else:
+            path = arg
+
+        result = decodeTimed(path)
+        if result is None:
+            print("Unsupported capture format or link type")
+            return 1
+
+    fastTable, fastTime, scapyTable, scapyTime = result
+    total = len(fastTable)
+    print(f"Packets: {total}")
+    print(f"Fast decoder: {total/fastTime:.0f} packets/s ({fastTime:.3f} s)")
+    print(f"Scapy decoder: {total/scapyTime:.0f} packets/s ({scapyTime:.3f} s)")
+    print(f"Speedup: {scapyTime/fastTime:.1f}x\n")
+
+    mismatched = [name for name in COLUMNS if name != "layerId" and
+                  (len(scapyTable) != total or not np.array_equal(getattr(fastTable, name), getattr(scapyTable, name)))]
+    print(f"Columns: {'ok' if not mismatched else 'mismatches in ' + ', '.join(mismatched)}")
+
+    # o decodificador rápido conta payloads de aplicação (DNS, HTTP...) como Raw
+    fastLayers, scapyLayers = fastTable.getLayers(), scapyTable.getLayers()
+    print(f"Layers: {'ok' if fastLayers == scapyLayers else f'fast {dict(fastLayers)} / scapy {dict(scapyLayers)}'}")
+
+    return 1 if mismatched else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,40 @@
+import numpy as np
+from network_traffic_analyzer.binned_histogram import BinnedHistogram
+
+def getSamples(size=10000, seed=3):
+    return np.random.default_rng(seed).lognormal(mean=3, sigma=2, size=size)
+
+def testMergeEqualsOnePass():
+    samples = getSamples()
+    merged = BinnedHistogram()
+    for part in np.array_split(samples, 9):
+        merged.merge(BinnedHistogram().updateBatch(part))
+
+    assert merged.getState() == BinnedHistogram().updateBatch(samples).getState()
+
+def testCountsMatchNumpyHistogram():
+    samples = getSamples()
+    for scale in ("log", "linear"):
+        histogram = BinnedHistogram(low=0.01, high=10000, bins=50, scale=scale).updateBatch(samples)
+        inside = samples[(samples >= 0.01) & (samples <= 10000)]
+
+        np.testing.assert_array_equal(histogram.counts[1:-1], np.histogram(inside, bins=histogram.edges)[0][1:-1])
+
+def testOutOfRangeValuesAreClamped():
+    histogram = BinnedHistogram(low=1, high=100, bins=2, scale="linear").updateBatch([0.5, 1, 50.5, 100, 200, np.nan])
+
+    np.testing.assert_array_equal(histogram.counts, [2, 3])
+    assert (histogram.underflow, histogram.overflow, histogram.count) == (1, 1, 5)
+
+def testIncompatibleMergeIsRejected():
+    histogram = BinnedHistogram().updateBatch([1.0])
+    histogram.merge(BinnedHistogram(bins=10).updateBatch([1.0]))
+
+    assert histogram.count == 1
+
+def testStateRoundTrip():
+    histogram = BinnedHistogram(scale="linear", low=0, high=500, bins=25).updateBatch(getSamples(1000))
+    restored = BinnedHistogram.fromState(histogram.getState())
+
+    assert restored.getState() == histogram.getState()
+    np.testing.assert_array_equal(restored.edges, histogram.edges)
@@ -0,0 +1,79 @@
+import numpy as np
+from network_traffic_analyzer.icmp_analyzer.echo_matcher import ECHO_REPLY, ECHO_REQUEST, EchoMatcher
+
+HOST = 167772161 # 10.0.0.1
+TARGET = 167772162 # 10.0.0.2
+OTHER = 167772163 # 10.0.0.3
+
+def request(matcher, seq, time, dst=TARGET, id=7):
+    matcher.update(HOST, dst, ECHO_REQUEST, id, seq, time)
+
+def reply(matcher, seq, time, src=TARGET, id=7):
+    matcher.update(src, HOST, ECHO_REPLY, id, seq, time)
+
+def testRepliesMatchRequestsByKey():
+    matcher = EchoMatcher()
+    request(matcher, 1, 0.0)
+    request(matcher, 2, 1.0)
+    reply(matcher, 2, 3.0) # fora de ordem
+    reply(matcher, 1, 5.0)
+    reply(matcher, 1, 6.0) # duplicado
+    reply(matcher, 3, 7.0, id=8) # sem request
+
+    np.testing.assert_array_equal(matcher.getRtts(), [2.0, 5.0])
+    assert (matcher.sent, matcher.received, matcher.lost, matcher.unmatched) == (2, 2, 0, 2)
+
+def testTimedOutRequestsAreLost():
+    matcher = EchoMatcher(timeout=100)
+    request(matcher, 1, 0.0)
+    request(matcher, 2, 50.0)
+    reply(matcher, 1, 101.0) # passou do timeout: request expirado, reply sem par
+    reply(matcher, 2, 150.0) # exatamente no timeout ainda associa
+
+    np.testing.assert_array_equal(matcher.getRtts(), [100.0])
+    assert (matcher.lost, matcher.expired, matcher.unmatched) == (1, 1, 1)
+    assert len(matcher.pending) == 0
+
+def testRepeatedRequestLosesPrevious():
+    matcher = EchoMatcher()
+    request(matcher, 1, 0.0)
+    request(matcher, 1, 10.0)
+    reply(matcher, 1, 12.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [2.0])
+    assert (matcher.sent, matcher.received, matcher.lost, matcher.expired) == (2, 1, 1, 0)
+
+def testFlushLosesPendingRequests():
+    matcher = EchoMatcher()
+    request(matcher, 1, 0.0)
+    request(matcher, 2, 1.0)
+    matcher.flush()
+
+    assert (matcher.lost, matcher.expired) == (2, 0)
+    assert len(matcher.pending) == 0
+
+def testTargetsKeepSeparateCounters():
+    matcher = EchoMatcher()
+    for seq in range(4):
+        request(matcher, seq, seq * 10.0)
+        request(matcher, seq, seq * 10.0, dst=OTHER)
+        reply(matcher, seq, seq * 10.0 + seq + 1)
+    matcher.flush()
+    targets = matcher.getTargets()
+
+    assert list(targets) == ["10.0.0.2", "10.0.0.3"]
+    assert (targets["10.0.0.2"]["sent"], targets["10.0.0.2"]["received"], targets["10.0.0.2"]["lost"]) == (4, 4, 0)
+    assert targets["10.0.0.2"]["mean"] == 2.5
+    assert (targets["10.0.0.3"]["sent"], targets["10.0.0.3"]["lost"], targets["10.0.0.3"]["lossRate"]) == (4, 4, 100)
+
+def testReturnedRttsAreCopies():
+    matcher = EchoMatcher()
+    request(matcher, 1, 0.0)
+    reply(matcher, 1, 4.0)
+    rtts = matcher.getRtts()
+
+    request(matcher, 2, 5.0) # com uma view do buffer, acrescentar levantaria BufferError
+    reply(matcher, 2, 6.0)
+
+    np.testing.assert_array_equal(rtts, [4.0])
+    np.testing.assert_array_equal(matcher.getRtts(), [4.0, 1.0])
@@ -0,0 +1,97 @@
+import numpy as np
+from network_traffic_analyzer.flow_table import FlowTable
+from network_traffic_analyzer.flow_table.flow_table import STATE_ESTABLISHED, STATE_FIN, STATE_RESET, STATE_SYN_SENT
+from network_traffic_analyzer.packet_table.packet_table import FLAG_ACK, FLAG_FIN, FLAG_RST, FLAG_SYN, PROTO_TCP, PROTO_UDP
+
+CLIENT = 167772161 # 10.0.0.1
+SERVER = 167772162 # 10.0.0.2
+
+def tcp(table, sport, flags, time, length=60):
+    table.update(CLIENT, SERVER, sport, 80, PROTO_TCP, length, flags, time)
+
+def udp(table, sport, time, length=100):
+    table.update(CLIENT, SERVER, sport, 53, PROTO_UDP, length, 0, time)
+
+def testCountersAndTcpState():
+    table = FlowTable()
+    tcp(table, 40000, FLAG_SYN, 0.0)
+    assert table.getFlow(table.index[(CLIENT, SERVER, 40000, 80, PROTO_TCP)])["state"] == STATE_SYN_SENT
+    tcp(table, 40000, FLAG_ACK, 1.0, length=1500)
+    udp(table, 50000, 2.0)
+    flow = table.getFlow(table.index[(CLIENT, SERVER, 40000, 80, PROTO_TCP)])
+
+    assert (flow["packets"], flow["bytes"], flow["synCount"], flow["ackCount"]) == (2, 1560, 1, 1)
+    assert (flow["firstTime"], flow["lastTime"], flow["state"]) == (0.0, 1.0, STATE_ESTABLISHED)
+    assert len(table) == 2
+
+def testIdleExpiry():
+    table = FlowTable(idleTimeout=100)
+    udp(table, 50000, 0.0)
+    udp(table, 50001, 50.0)
+    udp(table, 50002, 101.0) # remove só o primeiro
+    assert table.getCounters()["expiredIdle"] == 1
+    assert len(table) == 2
+
+    udp(table, 50002, 151.0) # segundo: 151 - 50 > 100
+    flows = table.getFlows()
+
+    np.testing.assert_array_equal(flows["sport"], [50000, 50001, 50002])
+    assert table.getCounters()["expiredIdle"] == 2
+
+def testCloseExpiryAfterFinOrRst():
+    table = FlowTable(closeTimeout=10)
+    tcp(table, 40000, FLAG_FIN | FLAG_ACK, 0.0)
+    tcp(table, 40001, FLAG_RST, 1.0)
+    udp(table, 50000, 5.0)
+    assert len(table) == 3
+
+    udp(table, 50000, 12.0)
+    flows = table.getFlows()
+
+    assert table.getCounters()["expiredClosed"] == 2
+    np.testing.assert_array_equal(flows["state"][:2], [STATE_FIN, STATE_RESET])
+
+def testSynReusesClosedTuple():
+    table = FlowTable()
+    tcp(table, 40000, FLAG_SYN, 0.0)
+    tcp(table, 40000, FLAG_FIN | FLAG_ACK, 1.0)
+    tcp(table, 40000, FLAG_SYN, 1.5) # nova conexão antes do closeTimeout
+    flows = table.getFlows()
+
+    np.testing.assert_array_equal(flows["packets"], [2, 1])
+    np.testing.assert_array_equal(flows["state"], [STATE_FIN, STATE_SYN_SENT])
+
+def testGrowAndReuseIds():
+    table = FlowTable(idleTimeout=10, capacity=2)
+    for sport in range(5):
+        udp(table, sport, 0.0)
+    assert table.getCounters()["capacity"] == 8
+
+    for sport in range(5, 10):
+        udp(table, sport, 20.0) # expira os cinco primeiros e reutiliza os ids
+    counters = table.getCounters()
+
+    assert (counters["active"], counters["finished"], counters["capacity"]) == (5, 5, 8)
+    np.testing.assert_array_equal(np.sort(table.getFlows()["sport"]), np.arange(10))
+
+def testFinishedFlowsAreCapped():
+    table = FlowTable(idleTimeout=0, maxFinished=4)
+    for i in range(20):
+        udp(table, i, float(i)) # cada pacote expira o fluxo anterior
+    flows = table.getFlows()
+    counters = table.getCounters()
+
+    np.testing.assert_array_equal(flows["sport"], [15, 16, 17, 18, 19])
+    assert len(table.finished["src"]) <= 4 + 4 // 2
+    assert (counters["finished"], counters["dropped"], counters["active"]) == (19, 15, 1)
+
+def testOnExpireReceivesRemovedFlows():
+    expired = []
+    table = FlowTable(idleTimeout=10, onExpire=expired.append)
+    udp(table, 50000, 0.0)
+    udp(table, 50001, 20.0)
+    table.flush()
+
+    assert [flow["sport"] for flow in expired] == [50000, 50001]
+    assert len(table.finished["src"]) == 0
+    assert table.getCounters()["dropped"] == 0
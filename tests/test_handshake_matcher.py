@@ -0,0 +1,75 @@
+import numpy as np
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import COLUMNS, FLAG_ACK, FLAG_SYN
+from network_traffic_analyzer.tcp_analyzer.handshake_matcher import HandshakeMatcher
+
+CLIENT = 167772161 # 10.0.0.1
+SERVER = 167772162 # 10.0.0.2
+
+def syn(matcher, sport, seq, time):
+    matcher.update(CLIENT, SERVER, sport, 80, seq, 0, FLAG_SYN, time)
+
+def synAck(matcher, sport, ack, time):
+    matcher.update(SERVER, CLIENT, 80, sport, 5000, ack, FLAG_SYN | FLAG_ACK, time)
+
+def testSynAckMatchesPendingSyn():
+    matcher = HandshakeMatcher()
+    syn(matcher, 40000, 1000, 0.0)
+    syn(matcher, 40001, 2000, 1.0)
+    synAck(matcher, 40001, 2001, 3.0)
+    synAck(matcher, 40000, 1001, 5.0)
+    synAck(matcher, 40000, 1001, 6.0) # SYN+ACK retransmitido, SYN já associado
+
+    np.testing.assert_array_equal(matcher.getRtts(), [2.0, 5.0])
+    assert matcher.getPairs() == [(("10.0.0.1", "10.0.0.2", 40001, 80), 1.0, 3.0), (("10.0.0.1", "10.0.0.2", 40000, 80), 0.0, 5.0)]
+
+def testRetransmittedSynReplacesTime():
+    matcher = HandshakeMatcher()
+    syn(matcher, 40000, 1000, 0.0)
+    syn(matcher, 40000, 1000, 3000.0)
+    synAck(matcher, 40000, 1001, 3010.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [10.0])
+    assert matcher.expired == 0
+
+def testAckMustMatchSequence():
+    matcher = HandshakeMatcher()
+    syn(matcher, 40000, 1000, 0.0)
+    synAck(matcher, 40000, 1000, 1.0) # ack deveria ser seq + 1
+    syn(matcher, 40001, 2**32 - 1, 2.0)
+    synAck(matcher, 40001, 0, 4.0) # seq + 1 volta em 2^32
+
+    np.testing.assert_array_equal(matcher.getRtts(), [2.0])
+    assert len(matcher.pending) == 1
+
+def testTimedOutSynsAreEvicted():
+    matcher = HandshakeMatcher(timeout=100)
+    syn(matcher, 40000, 1000, 0.0)
+    syn(matcher, 40001, 2000, 50.0)
+    synAck(matcher, 40001, 2001, 150.0) # exatamente no timeout ainda associa; o primeiro SYN expira
+    synAck(matcher, 40000, 1001, 151.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [100.0])
+    assert matcher.expired == 1
+    assert len(matcher.pending) == 0
+
+def testTableEqualsPacketUpdates():
+    rows = [(CLIENT, SERVER, 40000, 80, 1000, 0, FLAG_SYN, 0.0),
+            (CLIENT, SERVER, 40000, 80, 1001, 0, FLAG_ACK, 0.5), # ignorado
+            (SERVER, CLIENT, 80, 40000, 5000, 1001, FLAG_SYN | FLAG_ACK, 1.0),
+            (CLIENT, SERVER, 40001, 80, 7000, 0, FLAG_SYN, 2.0),
+            (SERVER, CLIENT, 80, 40001, 9000, 7001, FLAG_SYN | FLAG_ACK, 4.5)]
+    columns = {name: np.zeros(len(rows), dtype=dtype) for name, dtype in COLUMNS.items()}
+    for name, values in zip(("src", "dst", "sport", "dport", "seq", "ack", "flags", "time"), zip(*rows)):
+        columns[name][:] = values
+    columns["proto"][:] = 6
+    table = PacketTable(columns, [()])
+
+    fromTable = HandshakeMatcher()
+    fromTable.updateTable(table)
+    fromPackets = HandshakeMatcher()
+    for row in rows:
+        fromPackets.update(*row)
+
+    assert fromTable.pairs == fromPackets.pairs
+    np.testing.assert_array_equal(fromTable.getRtts(), [1.0, 2.5])
@@ -0,0 +1,67 @@
+from scapy.all import ICMP, IP, TCP, Ether, rdpcap
+import numpy as np
+from network_traffic_analyzer.icmp_analyzer import IcmpAnalyzer
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import FLAG_ACK, FLAG_PSH, PROTO_ICMP, PROTO_TCP
+from network_traffic_analyzer.tcp_analyzer import TcpAnalyzer
+from test_pcap_decoder import CLIENT, SERVER, getIpPackets, writeCapture
+
+# pacotes montados, com os campos calculados (comprimentos, checksums) preenchidos como numa captura
+def getBuiltPackets(packets):
+    return [pkt.__class__(bytes(pkt)) for pkt in packets]
+
+def testFromPacketsColumns():
+    table = PacketTable.fromPackets(getBuiltPackets(getIpPackets()))
+    data = 3 # segmento com 100 bytes
+
+    assert table.src[0] == PacketTable.ipToInt(CLIENT) and table.dst[0] == PacketTable.ipToInt(SERVER)
+    assert (table.proto[data], table.sport[data], table.dport[data], table.seq[data]) == (PROTO_TCP, 40000, 80, 1001)
+    assert (table.flags[data], table.payloadLen[data]) == (FLAG_PSH | FLAG_ACK, 100)
+    assert table.payloadLen[4] == 37 # com opções IP
+    assert (table.proto[7], table.icmpType[7], table.icmpId[7], table.icmpSeq[7]) == (PROTO_ICMP, 8, 7, 1)
+    assert table.proto[-1] == 47 # protocolo IP sem campos de transporte decodificados
+    assert PacketTable.fromPackets(getBuiltPackets([Ether()/ICMP()])).proto[0] == -1 # sem camada IP
+    assert np.count_nonzero(table.getTcpMask()) == 7 and np.count_nonzero(table.getIcmpMask()) == 3
+    assert PacketTable.intToIp(PacketTable.ipToInt("192.168.1.254")) == "192.168.1.254"
+
+def testSliceSharesColumns():
+    table = PacketTable.fromPackets(getBuiltPackets(getIpPackets()))
+    part = table.slice(2, 5)
+
+    assert len(part) == 3
+    assert np.shares_memory(part.time, table.time)
+    np.testing.assert_array_equal(part.seq, table.seq[2:5])
+
+def testConcatenateRemapsLayers():
+    tcp = PacketTable.fromPackets(getBuiltPackets([IP()/TCP(), IP()/TCP()]))
+    icmp = PacketTable.fromPackets(getBuiltPackets([IP()/ICMP(), IP()/TCP()]))
+    table = PacketTable.concatenate([tcp, icmp])
+
+    assert [table.layerSignatures[i] for i in table.layerId] == [("IP", "TCP")] * 2 + [("IP", "ICMP"), ("IP", "TCP")]
+    assert list(table.getLayers().items()) == [("IP", 4), ("TCP", 3), ("ICMP", 1)]
+    assert len(PacketTable.concatenate([])) == 0
+
+# métricas vetorizadas dos analisadores iguais às calculadas pacote a pacote com scapy
+def testAnalyzerMetricsMatchPacketLoops(tmp_path):
+    path = writeCapture(tmp_path / "metrics.pcap", [Ether()/pkt for pkt in getIpPackets() * 3])
+    packets = rdpcap(path)
+    times = [float(pkt.time * 1000) for pkt in packets]
+
+    for options in ({}, {"streaming": True, "decoder": "fast"}):
+        tcp = TcpAnalyzer(id="tcp", path=path, **options)
+        icmp = IcmpAnalyzer(id="icmp", path=path, **options)
+
+        assert tcp.getTotalPackets() == len(packets)
+        assert tcp.getTotalBytes() == sum(len(pkt) for pkt in packets)
+        assert tcp.getTotalTime() == times[-1] - times[0]
+        layers = tcp.getLayers()
+        assert dict(zip(layers["layers"], layers["nLayers"]))["TCP"] == sum(TCP in pkt for pkt in packets)
+
+        synTimes = [t for pkt, t in zip(packets, times) if TCP in pkt and pkt[TCP].flags == "S"]
+        np.testing.assert_array_equal(tcp.getIntervalStats()["intervals"], np.diff(synTimes))
+        synAcks = [t for pkt, t in zip(packets, times) if TCP in pkt and pkt[TCP].flags == "SA"]
+        np.testing.assert_array_equal(tcp.getRttStats()["rtts"], np.subtract(synAcks, synTimes))
+
+        requests = [t for pkt, t in zip(packets, times) if ICMP in pkt and pkt[ICMP].type == 8]
+        np.testing.assert_array_equal(icmp.getIntervalStats()["intervals"], np.diff(requests))
+        assert icmp.getLossStats()["sent"] == 6
@@ -0,0 +1,93 @@
+from scapy.all import ICMP, IP, TCP, Ether, Raw, wrpcap
+import numpy as np
+import pytest
+from network_traffic_analyzer.icmp_analyzer import IcmpAnalyzer
+from network_traffic_analyzer.packet_analyzer import ParallelPipeline
+from network_traffic_analyzer.tcp_analyzer import TcpAnalyzer
+from network_traffic_analyzer.tcp_analyzer.tcp_stages import TcpRttStage
+
+# conexões TCP e echoes ICMP intercalados, com handshakes, retransmissões e respostas que cruzam as divisões da captura
+def getFlowPackets(count=60):
+    packets = []
+    for i in range(count):
+        client, server = f"10.0.{i % 5}.{i % 7 + 1}", f"10.1.0.{i % 3 + 1}"
+        sport = 40000 + i
+        packets += [Ether()/IP(src=client, dst=server)/TCP(sport=sport, dport=80, flags="S", seq=1000),
+                    Ether()/IP(src=client, dst=server)/ICMP(type=8, id=i, seq=1)]
+        if i % 4 != 0:
+            packets.append(Ether()/IP(src=server, dst=client)/TCP(sport=80, dport=sport, flags="SA", seq=5000, ack=1001))
+        if i % 5 != 0:
+            packets.append(Ether()/IP(src=server, dst=client)/ICMP(type=0, id=i, seq=1))
+        packets += [Ether()/IP(src=client, dst=server)/TCP(sport=sport, dport=80, flags="PA", seq=1001, ack=5001)/Raw(b"x" * 50)]
+        if i % 3 == 0:
+            packets.append(Ether()/IP(src=client, dst=server)/TCP(sport=sport, dport=80, flags="PA", seq=1001, ack=5001)/Raw(b"x" * 50))
+
+    # pacotes de fluxos diferentes se alternam, e cada fluxo se estende por boa parte da captura
+    packets = packets[::2] + packets[1::2]
+    for i, pkt in enumerate(packets):
+        pkt.time = 1700000000 + i * 0.001 + (i // 10) * 0.0005
+
+    return packets
+
+@pytest.fixture
+def capture(tmp_path):
+    path = str(tmp_path / "flows.pcap")
+    wrpcap(path, getFlowPackets())
+
+    return path
+
+# analisador em modo paralelo e analisador de referência, em série sobre a tabela; options altera atributos como timeouts
+def getAnalyzers(cls, path, **options):
+    analyzer = cls(id="parallel", path=path, decoder="fast", workers=3)
+    reference = cls(id="serial", path=path, decoder="fast")
+    reference.getCaptureTable()
+
+    for name, value in options.items():
+        setattr(analyzer, name, value)
+        setattr(reference, name, value)
+
+    return analyzer, reference
+
+@pytest.mark.parametrize("timeout", [None, 3])
+def testParallelTcpMetrics(capture, timeout):
+    options = {"handshakeTimeout": timeout} if timeout else {}
+    analyzer, reference = getAnalyzers(TcpAnalyzer, capture, **options)
+
+    assert analyzer.isParallel() and not reference.usesStreamResults()
+    assert analyzer.getTotalPackets() == reference.getTotalPackets()
+    assert analyzer.getTotalBytes() == reference.getTotalBytes()
+    assert analyzer.getTotalTime() == reference.getTotalTime()
+    assert analyzer.getLayers() == reference.getLayers()
+    handshakes, expected = analyzer.getHandshakes(), reference.getHandshakes()
+    assert handshakes["pairs"] == expected["pairs"]
+    np.testing.assert_array_equal(handshakes["rtts"], expected["rtts"])
+    assert handshakes["expired"] == expected["expired"]
+    assert analyzer.getLossStats() == reference.getLossStats()
+    np.testing.assert_array_equal(analyzer.getIntervalStats()["intervals"], reference.getIntervalStats()["intervals"])
+    assert analyzer.captureTable is None # as métricas não montaram a tabela da captura
+
+@pytest.mark.parametrize("timeout", [None, 4])
+def testParallelIcmpMetrics(capture, timeout):
+    options = {"echoTimeout": timeout} if timeout else {}
+    analyzer, reference = getAnalyzers(IcmpAnalyzer, capture, **options)
+    echoes, expected = analyzer.getEchoes(), reference.getEchoes()
+
+    np.testing.assert_array_equal(echoes["rtts"], expected["rtts"])
+    for key in ("sent", "received", "lost", "expired", "unmatched"):
+        assert echoes[key] == expected[key], key
+    assert list(echoes["targets"]) == list(expected["targets"])
+    assert analyzer.getLossStats() == reference.getLossStats()
+    np.testing.assert_array_equal(analyzer.getIntervalStats()["intervals"], reference.getIntervalStats()["intervals"])
+    assert analyzer.captureTable is None
+
+def testNonMonotonicCaptureFallsBack(tmp_path):
+    packets = getFlowPackets(20)
+    packets[-5].time = packets[0].time - 1
+    path = str(tmp_path / "jitter.pcap")
+    wrpcap(path, packets)
+
+    assert ParallelPipeline(path, [TcpRttStage()], workers=3).run() is None
+
+    analyzer, reference = getAnalyzers(TcpAnalyzer, path)
+    assert analyzer.getHandshakes()["pairs"] == reference.getHandshakes()["pairs"]
+    assert analyzer.getLossStats() == reference.getLossStats()
@@ -0,0 +1,104 @@
+from scapy.all import ARP, ICMP, IP, TCP, UDP, CookedLinux, Dot1Q, Dot11, Ether, Raw, RadioTap, rdpcap, wrpcap
+import numpy as np
+import pytest
+from network_traffic_analyzer.packet_analyzer import PacketAnalyzer
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.packet_table.packet_table import COLUMNS
+from network_traffic_analyzer.pcap_decoder import PcapDecoder
+
+CLIENT = "10.0.0.1"
+SERVER = "10.0.0.2"
+
+# handshake, dados e encerramento TCP, echo ICMP, UDP com payload e pacote IP sem transporte conhecido
+def getIpPackets():
+    return [IP(src=CLIENT, dst=SERVER)/TCP(sport=40000, dport=80, flags="S", seq=1000),
+            IP(src=SERVER, dst=CLIENT)/TCP(sport=80, dport=40000, flags="SA", seq=5000, ack=1001),
+            IP(src=CLIENT, dst=SERVER)/TCP(sport=40000, dport=80, flags="A", seq=1001, ack=5001),
+            IP(src=CLIENT, dst=SERVER)/TCP(sport=40000, dport=80, flags="PA", seq=1001, ack=5001)/Raw(b"x" * 100),
+            IP(src=CLIENT, dst=SERVER, options=[b"\x01\x01\x01\x00"])/TCP(sport=40000, dport=80, flags="PA", seq=1101, ack=5001)/Raw(b"y" * 37),
+            IP(src=SERVER, dst=CLIENT)/TCP(sport=80, dport=40000, flags="A", seq=5001, ack=1138),
+            IP(src=CLIENT, dst=SERVER)/TCP(sport=40000, dport=80, flags="FA", seq=1138, ack=5001),
+            IP(src=CLIENT, dst=SERVER)/ICMP(type=8, id=7, seq=1)/Raw(b"ping"),
+            IP(src=SERVER, dst=CLIENT)/ICMP(type=0, id=7, seq=1)/Raw(b"ping"),
+            IP(src=CLIENT, dst=SERVER)/ICMP(type=8, id=7, seq=2),
+            IP(src=CLIENT, dst=SERVER)/UDP(sport=40001, dport=40002)/Raw(b"z" * 20),
+            IP(src=CLIENT, dst=SERVER, proto=47)/Raw(b"gre")]
+
+# grava pacotes em path com tempos crescentes em microssegundos
+def writeCapture(path, packets, linktype=None):
+    for i, pkt in enumerate(packets):
+        pkt.time = 1700000000 + i * 0.001234
+
+    wrpcap(str(path), packets, linktype=linktype)
+
+    return str(path)
+
+# verifica que todas as colunas, inclusive as camadas de cada pacote, são iguais
+def assertTablesEqual(table, reference):
+    assert len(table) == len(reference)
+
+    for name in COLUMNS:
+        if name != "layerId":
+            np.testing.assert_array_equal(getattr(table, name), getattr(reference, name), err_msg=name)
+
+    assert [table.layerSignatures[i] for i in table.layerId] == [reference.layerSignatures[i] for i in reference.layerId]
+
+# decodifica captura com o decodificador rápido e com scapy
+def decodeBoth(path):
+    with PcapDecoder(path) as decoder:
+        assert decoder.isSupported()
+        table = decoder.decode()
+
+    return table, PacketTable.fromPackets(rdpcap(path))
+
+def testEthernetParity(tmp_path):
+    packets = [Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02")/pkt for pkt in getIpPackets()]
+    packets.append(Ether(dst="ff:ff:ff:ff:ff:ff")/ARP(psrc=CLIENT, pdst=SERVER))
+
+    assertTablesEqual(*decodeBoth(writeCapture(tmp_path / "ethernet.pcap", packets)))
+
+def testVlanParity(tmp_path):
+    packets = [Ether()/Dot1Q(vlan=10)/pkt for pkt in getIpPackets()]
+
+    assertTablesEqual(*decodeBoth(writeCapture(tmp_path / "vlan.pcap", packets)))
+
+@pytest.mark.parametrize("linktype", [12, 101])
+def testRawIpParity(tmp_path, linktype):
+    path = writeCapture(tmp_path / "raw.pcap", getIpPackets(), linktype=linktype)
+
+    assertTablesEqual(*decodeBoth(path))
+
+def testLinuxCookedParity(tmp_path):
+    packets = [CookedLinux(proto=0x0800)/pkt for pkt in getIpPackets()]
+
+    assertTablesEqual(*decodeBoth(writeCapture(tmp_path / "sll.pcap", packets, linktype=113)))
+
+def testRecordRegionsParity(tmp_path):
+    packets = [Ether()/pkt for pkt in getIpPackets() * 20]
+    path = writeCapture(tmp_path / "regions.pcap", packets)
+
+    with PcapDecoder(path) as decoder:
+        tables = [decoder.decode(decoder.getRecords(start, stop)) for start, stop in decoder.getChunkBounds(4)]
+
+    assertTablesEqual(PacketTable.concatenate(tables), PacketTable.fromPackets(rdpcap(path)))
+
+def testTruncatedCapture(tmp_path):
+    path = writeCapture(tmp_path / "truncated.pcap", [Ether()/pkt for pkt in getIpPackets()])
+    with open(path, "r+b") as file:
+        file.truncate(file.seek(0, 2) - 10) # último registro incompleto
+
+    with PcapDecoder(path) as decoder:
+        table = decoder.decode()
+
+    assertTablesEqual(table, PacketTable.fromPackets(rdpcap(path)[:len(table)]))
+    assert len(table) == len(getIpPackets()) - 1
+
+def testUnsupportedLinktypeFallsBackToScapy(tmp_path):
+    packets = [RadioTap()/Dot11(addr1="02:00:00:00:00:02", addr2="02:00:00:00:00:01", addr3="02:00:00:00:00:02")]
+    path = writeCapture(tmp_path / "wifi.pcap", packets)
+
+    with PcapDecoder(path) as decoder:
+        assert not decoder.isSupported()
+
+    analyzer = PacketAnalyzer(id="wifi", path=path, streaming=True, decoder="fast")
+    assertTablesEqual(analyzer.getTable(), PacketTable.fromPackets(rdpcap(path)))
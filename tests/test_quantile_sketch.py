@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from network_traffic_analyzer.quantile_sketch import QuantileSketch
+
+# amostras de RTT em ms com cauda longa
+def getSamples(size=20000, seed=1):
+    return np.random.default_rng(seed).lognormal(mean=3, sigma=1, size=size)
+
+@pytest.mark.parametrize("relativeAccuracy", [0.01, 0.05])
+def testQuantilesWithinRelativeAccuracy(relativeAccuracy):
+    samples = getSamples()
+    sketch = QuantileSketch(relativeAccuracy=relativeAccuracy).updateBatch(samples)
+    ordered = np.sort(samples)
+
+    for q in (0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1):
+        expected = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.getQuantile(q) - expected) <= relativeAccuracy * expected + 1e-12
+
+def testQuantilesClampedToObservedRange():
+    sketch = QuantileSketch(relativeAccuracy=0.05).updateBatch([324.0, 324.0, 324.0])
+
+    assert sketch.getPercentiles() == {50: 324.0, 95: 324.0, 99: 324.0, 99.9: 324.0}
+    assert sketch.getQuantile(0) == sketch.min == 324.0
+
+def testMergeEqualsOnePass():
+    samples = getSamples()
+    merged = QuantileSketch()
+    for part in np.array_split(samples, 7):
+        merged.merge(QuantileSketch().updateBatch(part))
+    single = QuantileSketch().updateBatch(samples)
+
+    assert (merged.positive, merged.count, merged.min, merged.max) == (single.positive, single.count, single.min, single.max)
+    assert merged.getPercentiles() == single.getPercentiles()
+
+def testStateRoundTrip():
+    sketch = QuantileSketch().updateBatch(np.concatenate((getSamples(1000), [0.0, -2.5])))
+    restored = QuantileSketch.fromState(sketch.getState())
+
+    assert restored.getState() == sketch.getState()
+    assert restored.getPercentiles() == sketch.getPercentiles()
+    assert QuantileSketch.fromState(QuantileSketch().getState()).getQuantile(0.5) == 0
+
+def testMaxBinsCollapsesLowestBins():
+    sketch = QuantileSketch(maxBins=64).updateBatch(np.geomspace(1e-6, 1e6, 5000))
+
+    assert len(sketch.positive) == 64
+    assert sketch.count == 5000
+    assert sketch.getQuantile(0.99) == pytest.approx(np.quantile(np.geomspace(1e-6, 1e6, 5000), 0.99), rel=0.02)
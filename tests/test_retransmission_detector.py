@@ -0,0 +1,90 @@
+from network_traffic_analyzer.packet_table.packet_table import FLAG_ACK, FLAG_FIN, FLAG_PSH
+from network_traffic_analyzer.tcp_analyzer.retransmission_detector import RetransmissionDetector
+
+CLIENT = 167772161 # 10.0.0.1
+SERVER = 167772162 # 10.0.0.2
+
+# segmento de dados do cliente
+def send(detector, seq, payloadLen, time, flags=FLAG_PSH | FLAG_ACK):
+    detector.update(CLIENT, SERVER, 40000, 80, seq, 0, flags, payloadLen, time)
+
+# ACK cumulativo do servidor
+def ack(detector, ack, time):
+    detector.update(SERVER, CLIENT, 80, 40000, 0, ack, FLAG_ACK, 0, time)
+
+def getClassification(detector):
+    counters = detector.getCounters()
+    return counters["dataSegments"], counters["retransmissions"], counters["spuriousRetransmissions"], counters["outOfOrder"]
+
+def testInOrderDataIsNew():
+    detector = RetransmissionDetector()
+    for i in range(3):
+        send(detector, 1000 + 100 * i, 100, float(i))
+    ack(detector, 1300, 5.0)
+
+    assert getClassification(detector) == (3, 0, 0, 0)
+    assert detector.getCounters()["tcpPackets"] == 4
+
+def testRetransmissionOfUnackedData():
+    detector = RetransmissionDetector()
+    send(detector, 1000, 100, 0.0)
+    send(detector, 1100, 100, 1.0)
+    send(detector, 1000, 100, 200.0)
+
+    assert getClassification(detector) == (3, 1, 0, 0)
+
+def testSpuriousRetransmissionOfAckedData():
+    detector = RetransmissionDetector()
+    send(detector, 1000, 100, 0.0)
+    send(detector, 1100, 100, 1.0)
+    ack(detector, 1100, 10.0) # confirma só o primeiro
+    send(detector, 1000, 100, 200.0) # espúria
+    send(detector, 1100, 100, 201.0) # retransmissão necessária
+
+    assert getClassification(detector) == (4, 2, 1, 0)
+
+def testGapFilledSoonIsOutOfOrder():
+    detector = RetransmissionDetector(outOfOrderThreshold=3)
+    send(detector, 1000, 100, 0.0)
+    send(detector, 1200, 100, 1.0) # deixa lacuna [1100, 1200)
+    send(detector, 1100, 50, 2.0)
+    send(detector, 1150, 50, 3.5) # ainda dentro de 3 ms da abertura da lacuna
+
+    assert getClassification(detector) == (4, 0, 0, 2)
+
+def testGapFilledLateIsRetransmission():
+    detector = RetransmissionDetector(outOfOrderThreshold=3)
+    send(detector, 1000, 100, 0.0)
+    send(detector, 1200, 100, 1.0)
+    send(detector, 1100, 100, 50.0)
+
+    assert getClassification(detector) == (3, 1, 0, 0)
+
+def testPartialAndStraddlingRetransmissions():
+    detector = RetransmissionDetector()
+    send(detector, 1000, 100, 0.0)
+    send(detector, 1100, 100, 1.0)
+    send(detector, 1050, 100, 100.0) # fim do primeiro e início do segundo
+    send(detector, 1150, 100, 101.0) # fim do segundo e 50 bytes novos
+    send(detector, 1250, 100, 102.0)
+
+    assert getClassification(detector) == (5, 2, 0, 0)
+
+def testSequenceWraparound():
+    detector = RetransmissionDetector()
+    send(detector, 2**32 - 50, 100, 0.0)
+    send(detector, 50, 100, 1.0)
+    send(detector, 2**32 - 50, 100, 100.0)
+
+    assert getClassification(detector) == (3, 1, 0, 0)
+
+def testClosedAndIdleFlowsAreForgotten():
+    detector = RetransmissionDetector(idleTimeout=1000, closeTimeout=10)
+    send(detector, 1000, 100, 0.0, flags=FLAG_PSH | FLAG_FIN | FLAG_ACK)
+    assert len(detector.closing) == 1
+    send(detector, 1000, 100, 20.0) # estado descartado após closeTimeout: conta como dados novos
+
+    send(detector, 1000, 100, 2000.0) # estado descartado após idleTimeout
+
+    assert getClassification(detector) == (3, 0, 0, 0)
+    assert detector.getCounters()["activeFlows"] == 1
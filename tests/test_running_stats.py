@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from network_traffic_analyzer.running_stats import RunningStats
+
+def getSamples(size=10000, seed=2):
+    return np.random.default_rng(seed).lognormal(mean=2, sigma=0.5, size=size)
+
+# estatísticas calculadas diretamente pelo NumPy, no formato de getStats
+def getExpected(samples):
+    std = np.std(samples)
+    return {"count": len(samples), "mean": np.mean(samples), "std": std, "max": np.max(samples), "min": np.min(samples),
+            "error": std / np.sqrt(len(samples)), "cv": std / np.mean(samples) * 100}
+
+def assertStatsClose(stats, expected):
+    assert stats["count"] == expected["count"]
+    for name in ("mean", "std", "max", "min", "error", "cv"):
+        assert stats[name] == pytest.approx(expected[name], rel=1e-12), name
+
+def testUpdateAndBatchMatchNumpy():
+    samples = getSamples()
+    single = RunningStats()
+    for value in samples.tolist():
+        single.update(value)
+
+    assertStatsClose(single.getStats(), getExpected(samples))
+    assertStatsClose(RunningStats().updateBatch(samples).getStats(), getExpected(samples))
+
+def testMergeEqualsOnePass():
+    samples = getSamples()
+    merged = RunningStats()
+    for part in np.array_split(samples, 13):
+        merged.merge(RunningStats().updateBatch(part))
+
+    assertStatsClose(merged.getStats(), RunningStats().updateBatch(samples).getStats())
+
+def testMergeWithEmpty():
+    stats = RunningStats().updateBatch([1.0, 2.0, 3.0])
+    before = stats.getStats()
+
+    assert stats.merge(RunningStats()).getStats() == before
+    assert RunningStats().merge(stats).getStats() == before
+    assert RunningStats().getStats() == {"count": 0, "mean": 0, "std": 0, "max": 0, "min": 0, "error": 0, "cv": 0}
+
+def testStateRoundTrip():
+    stats = RunningStats().updateBatch(getSamples(100))
+    restored = RunningStats.fromState(stats.getState())
+
+    assert restored.getStats() == stats.getStats()
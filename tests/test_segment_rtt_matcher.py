@@ -0,0 +1,114 @@
+import numpy as np
+from network_traffic_analyzer.packet_table.packet_table import FLAG_ACK, FLAG_PSH, FLAG_SYN
+from network_traffic_analyzer.tcp_analyzer.segment_rtt_matcher import SegmentRttMatcher
+
+CLIENT = 167772161 # 10.0.0.1
+SERVER = 167772162 # 10.0.0.2
+
+# segmento de dados do cliente
+def send(matcher, seq, payloadLen, time):
+    matcher.update(CLIENT, SERVER, 40000, 80, seq, 0, FLAG_PSH | FLAG_ACK, payloadLen, time)
+
+# ACK cumulativo do servidor
+def ack(matcher, ack, time):
+    matcher.update(SERVER, CLIENT, 80, 40000, 0, ack, FLAG_ACK, 0, time)
+
+def testCumulativeAckSamplesEveryCoveredSegment():
+    matcher = SegmentRttMatcher()
+    send(matcher, 1000, 100, 0.0)
+    send(matcher, 1100, 100, 1.0)
+    send(matcher, 1200, 100, 2.0)
+    ack(matcher, 1200, 10.0) # cobre os dois primeiros
+    ack(matcher, 1250, 11.0) # não cobre o fim do terceiro
+    ack(matcher, 1300, 12.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [10.0, 9.0, 10.0])
+    np.testing.assert_array_equal(matcher.getAckTimes(), [10.0, 10.0, 12.0])
+    assert matcher.pending == 0
+
+def testFullRetransmissionYieldsNoSample():
+    matcher = SegmentRttMatcher()
+    send(matcher, 1000, 100, 0.0)
+    send(matcher, 1000, 100, 200.0)
+    ack(matcher, 1100, 210.0)
+
+    assert len(matcher.getRtts()) == 0
+    assert matcher.discarded == 1
+
+def testPartialRetransmissionYieldsNoSample():
+    matcher = SegmentRttMatcher()
+    send(matcher, 1000, 100, 0.0)
+    send(matcher, 1100, 100, 1.0)
+    send(matcher, 1150, 20, 200.0) # reenvia só o meio do segundo segmento
+    ack(matcher, 1200, 210.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [210.0])
+    assert matcher.discarded == 1
+
+def testStraddlingRetransmissionYieldsNoSample():
+    matcher = SegmentRttMatcher()
+    send(matcher, 1000, 100, 0.0)
+    send(matcher, 1100, 100, 1.0)
+    send(matcher, 1200, 100, 2.0)
+    send(matcher, 1050, 100, 200.0) # fim do primeiro e início do segundo
+    ack(matcher, 1300, 210.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [208.0])
+    assert matcher.discarded == 2
+
+def testRetransmissionExtendingPastHighestKeepsNewData():
+    matcher = SegmentRttMatcher()
+    send(matcher, 1000, 100, 0.0)
+    send(matcher, 1050, 100, 5.0) # reenvia metade e envia 50 bytes novos
+    ack(matcher, 1150, 15.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [10.0])
+    assert matcher.discarded == 1
+
+def testSequenceWraparound():
+    matcher = SegmentRttMatcher()
+    send(matcher, 2**32 - 50, 100, 0.0)
+    send(matcher, 50, 100, 1.0)
+    ack(matcher, 150, 4.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [4.0, 3.0])
+
+def testSynAndPureAcksAreIgnored():
+    matcher = SegmentRttMatcher()
+    matcher.update(CLIENT, SERVER, 40000, 80, 999, 0, FLAG_SYN, 0, 0.0)
+    matcher.update(SERVER, CLIENT, 80, 40000, 5000, 1000, FLAG_SYN | FLAG_ACK, 0, 1.0)
+    ack(matcher, 1000, 2.0)
+
+    assert len(matcher.getRtts()) == 0
+    assert len(matcher.flows) == 0
+
+def testMemoryLimitsEvictOldestSegments():
+    matcher = SegmentRttMatcher(maxSegmentsPerFlow=2)
+    for i in range(4):
+        send(matcher, 1000 + 100 * i, 100, float(i))
+    ack(matcher, 1400, 10.0)
+
+    np.testing.assert_array_equal(matcher.getRtts(), [8.0, 7.0])
+    assert matcher.evicted == 2
+
+def testIdleFlowsAreEvicted():
+    matcher = SegmentRttMatcher(idleTimeout=100)
+    send(matcher, 1000, 100, 0.0)
+    ack(matcher, 1100, 150.0)
+
+    assert len(matcher.getRtts()) == 0
+    assert matcher.evicted == 1
+    assert matcher.pending == 0
+
+def testReturnedSamplesAreCopies():
+    matcher = SegmentRttMatcher()
+    send(matcher, 1000, 100, 0.0)
+    ack(matcher, 1100, 5.0)
+    rtts, ackTimes = matcher.getRtts(), matcher.getAckTimes()
+
+    send(matcher, 1100, 100, 6.0) # com uma view do buffer, acrescentar levantaria BufferError
+    ack(matcher, 1200, 8.0)
+
+    np.testing.assert_array_equal(rtts, [5.0])
+    np.testing.assert_array_equal(ackTimes, [5.0])
+    np.testing.assert_array_equal(matcher.getRtts(), [5.0, 2.0])
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from network_traffic_analyzer.stats_cache import StatsCache, cached
+
+# analisador mínimo com um método memoizado que conta as execuções
+class CountingAnalyzer():
+    cacheState = ("margin",)
+
+    def __init__(self):
+        self.statsCache = StatsCache()
+        self.margin = None
+        self.calls = 0
+
+    @cached
+    def getStats(self, binWidth=1000, groupBy=None):
+        self.calls += 1
+        return {"binWidth": binWidth, "groupBy": groupBy, "values": np.arange(5.0), "nested": {"values": np.ones(3)}}
+
+def testPositionalKeywordAndDefaultArgumentsShareEntry():
+    analyzer = CountingAnalyzer()
+    first = analyzer.getStats(1000)
+
+    assert analyzer.getStats() is first
+    assert analyzer.getStats(binWidth=1000) is first
+    assert analyzer.getStats(1000, None) is first
+    assert analyzer.getStats(groupBy=None, binWidth=1000) is first
+    assert analyzer.calls == 1
+
+    assert analyzer.getStats(10)["binWidth"] == 10
+    assert analyzer.getStats(binWidth=10, groupBy="protocol")["groupBy"] == "protocol"
+    assert analyzer.calls == 3
+    assert analyzer.statsCache.getCounters() == {"hits": 4, "misses": 3, "entries": 3}
+
+def testResultsAreSharedWithReadOnlyArrays():
+    analyzer = CountingAnalyzer()
+    stats = analyzer.getStats()
+
+    with pytest.raises(ValueError):
+        stats["values"][0] = 1
+    with pytest.raises(ValueError):
+        stats["nested"]["values"] *= 2
+
+    np.testing.assert_array_equal(analyzer.getStats()["values"], np.arange(5.0))
+    assert analyzer.getStats() is stats # o dicionário é compartilhado, sem cópia
+
+def testStateChangeInvalidates():
+    analyzer = CountingAnalyzer()
+    analyzer.getStats()
+    analyzer.margin = 5
+    analyzer.getStats()
+
+    assert analyzer.calls == 2
+    assert analyzer.statsCache.getCounters()["entries"] == 1
+
+def testUnhashableArgumentsAreNotCached():
+    analyzer = CountingAnalyzer()
+    analyzer.getStats(groupBy=["protocol"])
+    analyzer.getStats(groupBy=["protocol"])
+
+    assert analyzer.calls == 2
+    assert analyzer.statsCache.getCounters()["entries"] == 0
+
+def testInvalidArgumentsRaise():
+    with pytest.raises(TypeError):
+        CountingAnalyzer().getStats(unknown=1)
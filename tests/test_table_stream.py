@@ -0,0 +1,122 @@
+from scapy.all import Ether, wrpcap
+import numpy as np
+import pytest
+from network_traffic_analyzer.icmp_analyzer import IcmpAnalyzer
+from network_traffic_analyzer.packet_analyzer import TableStream
+from network_traffic_analyzer.packet_table import PacketTable
+from network_traffic_analyzer.tcp_analyzer import TcpAnalyzer
+from test_pcap_decoder import assertTablesEqual, getIpPackets
+
+MARGINS = [{}, {"packetsMargin": 5}, {"timeMargin": 0.01}, {"packetsMargin": 3, "timeMargin": 0.002}, {"packetsMargin": 1000}]
+
+# grava pacotes de test_pcap_decoder repetidos, com tempos fora de ordem em alguns pontos
+@pytest.fixture
+def capture(tmp_path):
+    packets = [Ether()/pkt for pkt in getIpPackets() * 8]
+    for i, pkt in enumerate(packets):
+        pkt.time = 1700000000 + i * 0.001234 - (0.004 if i % 17 == 5 else 0)
+
+    path = str(tmp_path / "stream.pcap")
+    wrpcap(path, packets)
+
+    return path
+
+# analisador cujos lotes têm poucos pacotes, para que margens, handshakes e echoes cruzem lotes
+def getSmallBatchAnalyzer(cls, path, decoder, **margins):
+    analyzer = cls(id="stream", path=path, streaming=True, decoder=decoder, **margins)
+    analyzer.getTableStream = lambda: TableStream(path, decoder, analyzer.packetsMargin, analyzer.timeMargin, batchBytes=700, batchPackets=7)
+
+    return analyzer
+
+# analisador com a tabela da captura carregada, fora do modo incremental
+def getTableAnalyzer(cls, path, decoder, **margins):
+    analyzer = cls(id="table", path=path, streaming=True, decoder=decoder, **margins)
+    analyzer.getCaptureTable()
+
+    return analyzer
+
+@pytest.mark.parametrize("decoder", ["scapy", "fast"])
+@pytest.mark.parametrize("margins", MARGINS)
+def testStreamMatchesTableWindow(capture, decoder, margins):
+    reference = getTableAnalyzer(TcpAnalyzer, capture, decoder, **margins)
+    stream = getSmallBatchAnalyzer(TcpAnalyzer, capture, decoder, **margins).getTableStream()
+    batches = list(stream)
+
+    assert len(batches) > 1 or len(reference.getTable()) == 0
+    assertTablesEqual(PacketTable.concatenate(batches), reference.getTable())
+    assert stream.bounds == reference.getBounds()
+
+@pytest.mark.parametrize("decoder", ["scapy", "fast"])
+@pytest.mark.parametrize("margins", MARGINS)
+def testIncrementalTcpMetrics(capture, decoder, margins):
+    analyzer = getSmallBatchAnalyzer(TcpAnalyzer, capture, decoder, **margins)
+    reference = getTableAnalyzer(TcpAnalyzer, capture, decoder, **margins)
+
+    assert analyzer.isIncremental() and not reference.isIncremental()
+    assert analyzer.getBounds() == reference.getBounds()
+    assert analyzer.getTotalPackets() == reference.getTotalPackets()
+    assert analyzer.getTotalBytes() == reference.getTotalBytes()
+    assert analyzer.getTotalTime() == reference.getTotalTime()
+    assert analyzer.getLayers() == reference.getLayers()
+    assert analyzer.getHandshakes()["pairs"] == reference.getHandshakes()["pairs"]
+    assert analyzer.getLossStats() == reference.getLossStats()
+    np.testing.assert_array_equal(analyzer.getDataRttStats()["rtts"], reference.getDataRttStats()["rtts"])
+    assert analyzer.getFlowTable().getCounters() == reference.getFlowTable().getCounters()
+    if reference.getIntervalStats() is not None:
+        np.testing.assert_array_equal(analyzer.getIntervalStats()["intervals"], reference.getIntervalStats()["intervals"])
+    assert analyzer.captureTable is None # nenhuma métrica montou a tabela da captura
+
+@pytest.mark.parametrize("decoder", ["scapy", "fast"])
+@pytest.mark.parametrize("margins", MARGINS)
+def testIncrementalIcmpMetrics(capture, decoder, margins):
+    analyzer = getSmallBatchAnalyzer(IcmpAnalyzer, capture, decoder, **margins)
+    reference = getTableAnalyzer(IcmpAnalyzer, capture, decoder, **margins)
+    echoes, expected = analyzer.getEchoes(), reference.getEchoes()
+
+    counters = ["sent", "received", "lost", "expired", "unmatched"]
+
+    np.testing.assert_array_equal(echoes["rtts"], expected["rtts"])
+    assert [echoes[key] for key in counters] == [expected[key] for key in counters]
+    assert echoes["targets"].keys() == expected["targets"].keys()
+    assert analyzer.getLossStats() == reference.getLossStats()
+    if reference.getIntervalStats() is not None:
+        np.testing.assert_array_equal(analyzer.getIntervalStats()["intervals"], reference.getIntervalStats()["intervals"])
+    assert analyzer.captureTable is None
+
+def testLoadedTableLeavesIncrementalMode(capture):
+    analyzer = TcpAnalyzer(id="stream", path=capture, streaming=True)
+    assert analyzer.isIncremental()
+
+    analyzer.getTable()
+    assert not analyzer.isIncremental()
+    assert not TcpAnalyzer(id="memory", path=capture).isIncremental()
+
+@pytest.mark.parametrize("decoder", ["scapy", "fast"])
+@pytest.mark.parametrize("groupBy", [None, "protocol", "flow"])
+def testIncrementalThroughputSeries(capture, decoder, groupBy):
+    analyzer = getSmallBatchAnalyzer(TcpAnalyzer, capture, decoder, packetsMargin=2)
+    reference = getTableAnalyzer(TcpAnalyzer, capture, decoder, packetsMargin=2)
+    series, expected = analyzer.getThroughputSeries(5, groupBy, 3), reference.getThroughputSeries(5, groupBy, 3)
+
+    assert series["groups"] == expected["groups"]
+    for name in ("times", "throughput", "packetRate"):
+        np.testing.assert_array_equal(series[name], expected[name])
+    assert analyzer.captureTable is None
+
+def testThroughputSeriesBins(tmp_path):
+    packets = [Ether()/pkt for pkt in getIpPackets() * 8]
+    for i, pkt in enumerate(packets):
+        pkt.time = 1700000000 + i * 0.001234
+    packets[1].time = packets[0].time - 0.025 # anterior ao primeiro pacote: entra no primeiro intervalo
+    path = str(tmp_path / "series.pcap")
+    wrpcap(path, packets)
+
+    analyzer = TcpAnalyzer(id="table", path=path)
+    table = analyzer.getTable()
+    series = analyzer.getThroughputSeries(10, "protocol", 1)
+    bins = np.maximum((table.time - table.time[0]) // 10, 0).astype(np.int64)
+
+    assert series["groups"] == ["TCP", "other"]
+    assert series["times"][0] == 0 and len(series["times"]) == bins.max() + 1
+    np.testing.assert_array_equal(series["packetRate"].sum(axis=0) / 100, np.bincount(bins))
+    assert series["packetRate"][0].sum() / 100 == np.count_nonzero(table.getTcpMask())